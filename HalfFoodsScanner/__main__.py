@@ -1,6 +1,22 @@
-from HalfFoodsScanner.classes.purchaseinfo import PurchaseInfo
-from HalfFoodsScanner.dataloaders.textloader import TextLoader
+import json
 import os
+import sys
+from typing import TYPE_CHECKING
+
+# The loaders and jobs are imported by the functions that use them, so each command only pays for what it runs
+if TYPE_CHECKING:
+    import argparse
+    from HalfFoodsScanner.classes.purchaseinfo import PurchaseInfo
+    from HalfFoodsScanner.storage.catalog import CatalogReloader
+
+# Lines of each report printed by --profile and --tracemalloc
+PROFILE_LINES = 20
+
+# Environment variable naming the catalog source used when --catalog is not given, and by the interactive menu
+CATALOG_ENV = "HALFFOODS_CATALOG"
+
+# ANSI escapes that move the cursor home and clear the screen, written directly instead of running a clear command
+CLEAR_SCREEN = "\033[H\033[2J"
 
 def init_product_key() -> dict[str, str]:
     """Creates a default product lookup key that contains the default product codes and descriptions.
@@ -26,11 +42,23 @@ def main():
     The entry point of the program.
     """
 
-    product_key = init_product_key()
+    # With a catalog source, the catalog is reloaded when the source changes and added product types are saved to it
+    reloader = None
+    if catalog_path := os.environ.get(CATALOG_ENV):
+        from HalfFoodsScanner.storage.catalog import CatalogReloader
+
+        try:
+            reloader = CatalogReloader(catalog_path)
+        except (OSError, ValueError) as e:
+            print(f"Could not read the catalog: {e}")
+            return
+    product_key = init_product_key() if reloader is None else reloader.catalog
 
     # Main menu
     while True:
-        os.system('cls' if os.name == 'nt' else 'clear')
+        if reloader is not None:
+            product_key = reloader.current()
+        clear_screen()
         print("""
         1: Print basic data summary
         2: Detailed Menu
@@ -45,13 +73,22 @@ def main():
             case "2":
                 show_detailed_menu(product_key)
             case "3":
-                product_key = add_product_type(product_key)
+                product_key = add_product_type(product_key, reloader)
             case "9":
                 print("Quitting...")
                 break
             case _:
                 input("Invalid selection. Press Enter to retry...")
                 
+def clear_screen() -> None:
+    """
+    Clears the terminal. Does nothing when the output is not a terminal, so piped output is not cluttered.
+    """
+    if sys.stdout.isatty():
+        sys.stdout.write(CLEAR_SCREEN)
+        sys.stdout.flush()
+
+
 def print_basic_data(product_key: dict[str, str]) -> None:
     """
     Prints basic customer information: The customer name, the date of purchase, and the total number of items purchased.
@@ -67,6 +104,8 @@ def print_basic_data(product_key: dict[str, str]) -> None:
         input("\n Press Enter to Return...")
     except FileNotFoundError:
         input("File not found! Press Enter to Return...")
+    except ValueError as e:  # Malformed headers, and files no loader can read
+        input(f"{e}. Press Enter to Return...")
 
 
 def show_detailed_menu(product_key: dict[str, str]) -> None:
@@ -82,9 +121,12 @@ def show_detailed_menu(product_key: dict[str, str]) -> None:
     except FileNotFoundError:
         input("File not found! Press Enter to Return...")
         return
+    except ValueError as e:  # Malformed headers, and files no loader can read
+        input(f"{e}. Press Enter to Return...")
+        return
 
     while True:
-        os.system("cls" if os.name == "nt" else "clear")
+        clear_screen()
         print("""
         1: Print detailed order summary
         2: View subtypes
@@ -95,8 +137,10 @@ def show_detailed_menu(product_key: dict[str, str]) -> None:
         selection = input()
         match selection:
             case "1":
-                info, _ = purchase_info.get_advanced_purchase_information(product_key)
-                print(info)
+                # Written a piece at a time, so the IDs of a huge purchase are never joined into one string
+                for piece in purchase_info.iter_advanced_purchase_information(product_key):
+                    sys.stdout.write(piece)
+                print()
                 input("\n Press Enter to Return...")
             case "2":
                 print("Type one of the listed product types:")
@@ -119,7 +163,7 @@ def show_detailed_menu(product_key: dict[str, str]) -> None:
                 break
 
 
-def load_data(product_key: dict[str, str]) -> PurchaseInfo:
+def load_data(product_key: dict[str, str]) -> "PurchaseInfo":
     """
     Prompts user for a path, and then loads data.
 
@@ -127,19 +171,24 @@ def load_data(product_key: dict[str, str]) -> PurchaseInfo:
     :returns PurchaseInfo: The data extracted from the file.
     
     """
+    from HalfFoodsScanner.dataloaders.cachedloader import CachedLoader
+    from HalfFoodsScanner.dataloaders.registry import default_registry
+
     path_to_data = input("Input path to data: ")
 
-    # Placeholder in case a different format is needed, in which case a factory will be needed.
-    datareader = TextLoader()
+    # The registry picks the loader from the file's contents and name, including compressed files and formats
+    # added by plugins. Parsed files are cached, so opening the menus again for the same file does not parse it again.
+    datareader = CachedLoader(default_registry())
     purchase_info = datareader.load_data(product_key, path_to_data)
     return purchase_info
 
 
-def add_product_type(product_key: dict[str, str]) -> dict[str, str]:
+def add_product_type(product_key: dict[str, str], reloader: "CatalogReloader | None" = None) -> dict[str, str]:
     """
     Function to add additional product types to the lookup key.
 
     :product_key: Product lookup key
+    :reloader: The catalog source the product type is saved to, or None to only add it to the lookup key.
     :returns: The lookup key with the additional entry.
     """
     product_key_id = input("Input four letter product abbreivation: ")
@@ -147,9 +196,387 @@ def add_product_type(product_key: dict[str, str]) -> dict[str, str]:
         input("Product key is not four letters. Press Enter to Return...")
         return product_key
     product_key_def = input("Input description of product: ")
-    product_key[product_key_id] = product_key_def
-    return product_key
+    if reloader is None:
+        product_key[product_key_id] = product_key_def
+        return product_key
+
+    from HalfFoodsScanner.storage.catalog import add_catalog_entry
+
+    try:
+        add_catalog_entry(reloader.path, product_key_id, product_key_def)
+    except ValueError as e:
+        input(f"{e}. Press Enter to Return...")
+        return product_key
+    reloader.reload_if_changed()
+    return reloader.catalog
+
+
+def run_command(argv: list[str]) -> int:
+    """
+    Non-interactive entry point, used when the program is run with arguments.
+
+    :argv: The command line arguments, without the program name.
+    :returns: The exit code.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m HalfFoodsScanner")
+    parser.add_argument("--profile", metavar="PATH", default=None,
+                        help="Profile the command with cProfile, save the stats to PATH and print the slowest functions. Worker processes are not profiled, use --workers 1.")
+    parser.add_argument("--tracemalloc", action="store_true", help="Trace memory allocations and print the peak and the largest allocation sites.")
+    parser.add_argument("--catalog", metavar="PATH", default=None, help=f"Read the product key from a catalog: a JSON object of product types to descriptions, a SQLite database with a product_types table, or a file written by compile-catalog. Defaults to ${CATALOG_ENV}.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    scan_parser = subparsers.add_parser("scan", help="Summarise every customer file in a directory or glob pattern.")
+    scan_parser.add_argument("target", help="Directory of customer files, or a glob pattern.")
+    scan_parser.add_argument("--workers", type=int, default=None, help="Number of worker processes. Defaults to the CPU count.")
+    scan_parser.add_argument("--pattern", default="*.txt", help="Glob pattern customer file names in a directory must match.")
+    scan_parser.add_argument("--stats", action="store_true", help="Add load timings and line counts to each summary.")
+
+    follow_parser = subparsers.add_parser("follow", help="Summarise a customer file again each time lines are appended to it.")
+    follow_parser.add_argument("path", help="Path to the customer file.")
+    follow_parser.add_argument("--interval", type=float, default=1.0, help="Seconds between checks for new lines.")
+
+    aggregate_parser = subparsers.add_parser("aggregate", help="Print store-wide totals over every customer file under a directory.")
+    aggregate_parser.add_argument("root", help="Top of the directory tree of customer files.")
+    aggregate_parser.add_argument("--workers", type=int, default=None, help="Number of worker processes. Defaults to the CPU count.")
+    aggregate_parser.add_argument("--pattern", default="*.txt", help="Glob pattern customer file names must match.")
+    aggregate_parser.add_argument("--approximate", action="store_true", help="Estimate distinct subtypes and IDs in fixed memory.")
+    aggregate_parser.add_argument("--top", type=int, default=None, help="Number of top product types to print. Defaults to all.")
+
+    report_parser = subparsers.add_parser("report", help="Write the detailed order summary of a customer file.")
+    report_parser.add_argument("path", help="Path to the customer file.")
+    report_parser.add_argument("--output", default=None, help="Write the summary to this file instead of printing it.")
+
+    repair_parser = subparsers.add_parser("repair", help="Correct corrupted product types in every customer file under a directory.")
+    repair_parser.add_argument("root", help="Top of the directory tree of customer files.")
+    repair_parser.add_argument("--workers", type=int, default=None, help="Number of worker processes. Defaults to the CPU count.")
+    repair_parser.add_argument("--checkpoint", default=None, help="Checkpoint file, so an interrupted sweep resumes where it stopped.")
+    repair_parser.add_argument("--report", default=None, help="Append the corruption report to this file instead of printing it.")
+    repair_parser.add_argument("--pattern", default="*.txt", help="Glob pattern customer file names must match.")
+    repair_parser.add_argument("--dry-run", action="store_true", help="Report corrections without changing any file. Use a different checkpoint than the real sweep.")
+
+    serve_parser = subparsers.add_parser("serve", help="Read customer file paths from standard input, one per line, and print one JSON summary per line.")
+    serve_parser.add_argument("--cache", action="store_true", help="Keep parsed files in the on-disk cache.")
+
+    compile_parser = subparsers.add_parser("compile-catalog", help="Compile a catalog and its correction index into a file for --catalog.")
+    compile_parser.add_argument("output", help="The compiled catalog to write.")
+    compile_parser.add_argument("--source", default=None, help="The catalog to compile. Defaults to the built-in product key.")
+
+    args = parser.parse_args(argv)
+    if args.profile or args.tracemalloc:
+        return run_profiled(lambda: run_parsed_command(args), args.profile, args.tracemalloc)
+    return run_parsed_command(args)
+
+
+def run_parsed_command(args: "argparse.Namespace") -> int:
+    """
+    Runs the subcommand chosen on the command line.
+
+    :args: The parsed command line arguments.
+    :returns: The exit code.
+    """
+    if args.command == "compile-catalog":
+        return compile_catalog(args.output, args.source)
+
+    catalog = args.catalog or os.environ.get(CATALOG_ENV)
+    reloader = None
+    try:
+        # serve runs for a long time, so it picks up changes to the catalog while it runs
+        if args.command == "serve" and catalog:
+            from HalfFoodsScanner.storage.catalog import CatalogReloader
+
+            reloader = CatalogReloader(catalog)
+            product_key = reloader.catalog
+        else:
+            product_key = load_product_key(catalog)
+    except (OSError, ValueError) as e:
+        print(f"Could not read the catalog: {e}", file=sys.stderr)
+        return 1
+
+    match args.command:
+        case "scan":
+            return scan(product_key, args.target, args.workers, args.stats, args.pattern)
+        case "follow":
+            return follow(product_key, args.path, args.interval)
+        case "aggregate":
+            return aggregate(product_key, args.root, args.workers, args.pattern, args.approximate, args.top)
+        case "report":
+            return report(product_key, args.path, args.output)
+        case "repair":
+            return repair_files(product_key, args.root, args.workers, args.checkpoint, args.report,
+                                args.pattern, args.dry_run)
+        case "serve":
+            return serve(product_key, args.cache, reloader)
+    return 2
+
+
+def load_product_key(catalog: str | None) -> dict[str, str]:
+    """
+    Loads the product lookup key from a catalog, validated and with its correction index compiled.
+
+    :catalog: Path to the catalog, or None for the default product key.
+    :returns: The product lookup key.
+    :raises ValueError: When the catalog is invalid or not in a catalog format.
+    """
+    if catalog is None:
+        return init_product_key()
+    from HalfFoodsScanner.storage.catalog import load_catalog
+
+    return load_catalog(catalog)
+
+
+def compile_catalog(output: str, source: str | None) -> int:
+    """
+    Compiles a catalog and its correction index into a file read with --catalog.
+
+    :output: The compiled catalog to write.
+    :source: The catalog to compile, or None for the default product key.
+    :returns: The exit code.
+    """
+    from HalfFoodsScanner.storage.compiledcatalog import write_compiled_catalog
+
+    try:
+        product_key = load_product_key(source)
+    except (OSError, ValueError) as e:
+        print(f"Could not read the catalog: {e}", file=sys.stderr)
+        return 1
+    count = write_compiled_catalog(output, product_key)
+    print(f"Compiled {count} product types to {output}", file=sys.stderr)
+    return 0
+
+
+def run_profiled(command, profile_path: str | None, trace_memory: bool) -> int:
+    """
+    Runs a command under cProfile and/or tracemalloc and prints a report of each to standard error.
+
+    :command: Function running the command and returning its exit code.
+    :profile_path: Where to save the cProfile stats, for pstats or a viewer. None to not profile.
+    :trace_memory: Trace memory allocations.
+    :returns: The exit code of the command.
+    """
+    import cProfile
+    import pstats
+    import tracemalloc
+
+    profiler = cProfile.Profile() if profile_path else None
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        if profiler is not None:
+            exit_code = profiler.runcall(command)
+        else:
+            exit_code = command()
+    finally:
+        if profiler is not None:
+            profiler.dump_stats(profile_path)
+            pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(PROFILE_LINES)
+        if trace_memory:
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"Peak traced memory: {peak} bytes", file=sys.stderr)
+            for statistic in snapshot.statistics("lineno")[:PROFILE_LINES]:
+                print(statistic, file=sys.stderr)
+    return exit_code
+
+
+def scan(product_key: dict[str, str], target: str, workers: int | None, stats: bool = False,
+         pattern: str = "*.txt") -> int:
+    """
+    Scans a batch of customer files and prints one JSON summary per line as each file finishes.
+
+    :product_key: The product lookup key.
+    :target: Directory of customer files, or a glob pattern.
+    :workers: Number of worker processes.
+    :stats: Add load timings and line counts to each summary.
+    :pattern: Glob pattern customer file names in a directory must match.
+    :returns: The exit code, 1 if any file could not be loaded.
+    """
+    from HalfFoodsScanner.jobs import batch
+
+    data_paths = batch.find_customer_files(target, pattern)
+    if not data_paths:
+        print(f"No customer files found in {target}", file=sys.stderr)
+        return 1
+
+    exit_code = 0
+    for summary in batch.scan_files(product_key, data_paths, workers, stats):
+        if "error" in summary:
+            exit_code = 1
+        print(json.dumps(summary), flush=True)
+    return exit_code
+
+
+def follow(product_key: dict[str, str], path: str, interval: float) -> int:
+    """
+    Prints a JSON summary of a customer file, then a new one each time product lines are appended, until interrupted.
+
+    :product_key: The product lookup key.
+    :path: Path to the customer file.
+    :interval: Seconds between checks for new lines.
+    :returns: The exit code.
+    """
+    from HalfFoodsScanner.dataloaders.helpers import MalformedHeaderError
+    from HalfFoodsScanner.dataloaders.tailloader import TailLoader
+    from HalfFoodsScanner.jobs import batch
+
+    loader = TailLoader()
+    try:
+        purchase_info = loader.load_data(product_key, path)
+        print(json.dumps(batch.summarize(product_key, path, purchase_info)), flush=True)
+        for purchase_info in loader.follow(interval):
+            print(json.dumps(batch.summarize(product_key, path, purchase_info)), flush=True)
+    except FileNotFoundError:
+        print(f"File not found: {path}", file=sys.stderr)
+        return 1
+    except MalformedHeaderError as e:
+        print(f"{path}: {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def aggregate(product_key: dict[str, str], root: str, workers: int | None, pattern: str, approximate: bool,
+              top: int | None) -> int:
+    """
+    Aggregates every customer file under a directory and prints the store-wide totals as JSON.
+
+    :product_key: The product lookup key.
+    :root: Top of the directory tree of customer files.
+    :workers: Number of worker processes.
+    :pattern: Glob pattern customer file names must match.
+    :approximate: Estimate distinct subtypes and IDs in fixed memory.
+    :top: Number of top product types to print, or None for all.
+    :returns: The exit code, 1 if any file could not be loaded.
+    """
+    from HalfFoodsScanner.jobs import aggregate as jobs_aggregate
+    from HalfFoodsScanner.jobs import repair
+
+    if not os.path.isdir(root):
+        print(f"Directory not found: {root}", file=sys.stderr)
+        return 1
+
+    data_paths = repair.iter_customer_files(root, pattern)
+    totals = jobs_aggregate.aggregate_files(product_key, data_paths, workers, approximate)
+    print(json.dumps(totals.summary(top), indent=2))
+    return 1 if totals.failed_files else 0
+
+
+def report(product_key: dict[str, str], path: str, output: str | None) -> int:
+    """
+    Writes the detailed order summary of a customer file a piece at a time, so huge purchases are never held in
+    memory as one string.
+
+    :product_key: The product lookup key.
+    :path: Path to the customer file.
+    :output: File to write the summary to, or None to print it.
+    :returns: The exit code.
+    """
+    from HalfFoodsScanner.dataloaders.cachedloader import CachedLoader
+    from HalfFoodsScanner.dataloaders.registry import default_registry
+
+    try:
+        purchase_info = CachedLoader(default_registry()).load_data(product_key, path)
+    except FileNotFoundError:
+        print(f"File not found: {path}", file=sys.stderr)
+        return 1
+    except ValueError as e:  # Malformed headers, and files no loader can read
+        print(f"{path}: {e}", file=sys.stderr)
+        return 1
+
+    pieces = purchase_info.iter_advanced_purchase_information(product_key)
+    if output is None:
+        sys.stdout.writelines(pieces)
+        sys.stdout.write("\n")
+    else:
+        with open(output, "w") as f:
+            f.writelines(pieces)
+            f.write("\n")
+    return 0
+
+
+def serve(product_key: dict[str, str], cache: bool, reloader: "CatalogReloader | None" = None) -> int:
+    """
+    Reads customer file paths from standard input, one per line, and prints one JSON summary per line as each file
+    is loaded, until the input ends. The process stays up between files, so the cost of starting Python and
+    importing the loaders is paid once rather than per file.
+
+    :product_key: The product lookup key.
+    :cache: Keep parsed files in the on-disk cache.
+    :reloader: The catalog source, checked for changes before each file. The catalog in use when a file starts is
+        used for the whole file.
+    :returns: The exit code, 1 if any file could not be loaded.
+    """
+    from HalfFoodsScanner.dataloaders.cachedloader import CachedLoader
+    from HalfFoodsScanner.dataloaders.registry import default_registry
+    from HalfFoodsScanner.jobs import batch
+
+    loader = CachedLoader(default_registry()) if cache else default_registry()
+    exit_code = 0
+    for line in sys.stdin:
+        # Only the line ending is removed, since paths may start or end with spaces
+        path = line.rstrip("\r\n")
+        if not path:
+            continue
+        if reloader is not None:
+            product_key = reloader.current()
+        try:
+            summary = batch.summarize(product_key, path, loader.load_data(product_key, path))
+        except Exception as e:
+            summary = {"path": path, "error": f"{type(e).__name__}: {e}"}
+            exit_code = 1
+        sys.stdout.write(json.dumps(summary) + "\n")
+        sys.stdout.flush()
+    return exit_code
+
+
+def repair_files(product_key: dict[str, str], root: str, workers: int | None, checkpoint: str | None,
+                 report: str | None, pattern: str, dry_run: bool) -> int:
+    """
+    Corrects the product types of every customer file under a directory and writes one JSON report per file,
+    then prints the totals to standard error.
+
+    :product_key: The product lookup key.
+    :root: Top of the directory tree of customer files.
+    :workers: Number of worker processes.
+    :checkpoint: Checkpoint file, or None to scan every file.
+    :report: File the reports are appended to, or None to print them.
+    :pattern: Glob pattern customer file names must match.
+    :dry_run: Report corrections without changing any file.
+    :returns: The exit code, 1 if any file could not be repaired.
+    """
+    from HalfFoodsScanner.jobs import repair
+
+    if not os.path.isdir(root):
+        print(f"Directory not found: {root}", file=sys.stderr)
+        return 1
+
+    report_file = open(report, "a") if report else sys.stdout
+    reports = repair.repair_tree(product_key, root, checkpoint, workers, pattern, dry_run)
+
+    def write_reports():
+        # Each report is written out before the sweep records its file in the checkpoint
+        for file_report in reports:
+            report_file.write(json.dumps(file_report) + "\n")
+            report_file.flush()
+            yield file_report
+
+    try:
+        totals = repair.summarize_reports(write_reports())
+    except KeyboardInterrupt:
+        print("Interrupted, run again with the same checkpoint to resume.", file=sys.stderr)
+        return 130
+    finally:
+        if report_file is not sys.stdout:
+            report_file.close()
+
+    print(json.dumps(totals), file=sys.stderr)
+    return 1 if totals["failed_files"] else 0
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(run_command(sys.argv[1:]))
     main()
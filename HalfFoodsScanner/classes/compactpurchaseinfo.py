@@ -0,0 +1,299 @@
+import sys
+from array import array
+from collections.abc import Iterator, MutableMapping, MutableSet, Sequence
+from datetime import datetime
+from typing import Optional
+
+from HalfFoodsScanner.classes.purchaseinfo import PurchaseInfo
+
+# Encoding of the strings held in the compact buffers
+ENCODING = "utf-8"
+
+
+class CompactPurchaseInfo:
+    """A PurchaseInfo that keeps its items in contiguous buffers, for very large purchases.
+
+    Unique IDs are packed into one bytes buffer per product type instead of one string object per item,
+    product type codes are interned, and each distinct subtype is stored once and referred to by number.
+    product_type_history and subtype_lookup are views that decode on access, so the report methods and
+    loaders that work with a PurchaseInfo work with this class too.
+
+    customer_name: Name of the customer
+    purchase_date: Date when purchase was made
+    quantity: Total quantity of purchase. (Note: includes items purchased with an invalid product type.)
+    product_type_history: For each product type, contains a list of IDs.
+    subtype_lookup: For each product type, a list of subtypes.
+    """
+
+    __slots__ = ("customer_name", "purchase_date", "quantity", "_ids", "_subtype_numbers", "_subtypes",
+                 "_subtype_values", "_history_view", "_subtype_view", "_most_common", "_tracked_quantity")
+
+    def __init__(self, customer_name: str, purchase_date: datetime, quantity: int = 0):
+        self.customer_name = customer_name
+        self.purchase_date = purchase_date
+        self.quantity = quantity
+
+        # Product type -> Unique IDs of that type
+        self._ids: dict[str, _Column] = {}
+        # Every distinct subtype, stored once, and its number
+        self._subtype_values = _Column()
+        self._subtype_numbers: dict[str, int] = {}
+        # Product type -> numbers of the distinct subtypes of that type
+        self._subtypes: dict[str, set[int]] = {}
+
+        self._history_view = _HistoryView(self)
+        self._subtype_view = _SubtypeLookupView(self)
+
+        # The most common product type, valid while the quantity is _tracked_quantity
+        self._most_common: Optional[str] = None
+        self._tracked_quantity: Optional[int] = None
+
+    most_common_product_type = PurchaseInfo.most_common_product_type
+    most_common_description = PurchaseInfo.most_common_description
+    get_basic_purchase_information = PurchaseInfo.get_basic_purchase_information
+    get_advanced_purchase_information = PurchaseInfo.get_advanced_purchase_information
+    iter_advanced_purchase_information = PurchaseInfo.iter_advanced_purchase_information
+    get_subtypes = PurchaseInfo.get_subtypes
+
+    def clear(self) -> None:
+        """
+        Removes every item and sets the quantity back to zero, keeping the customer name and date. The stored
+        subtypes are dropped as well, so a purchase cleared and loaded again holds only the subtypes it uses.
+        """
+        self.quantity = 0
+        self._ids = {}
+        self._subtype_values = _Column()
+        self._subtype_numbers = {}
+        self._subtypes = {}
+        self._most_common = None
+        self._tracked_quantity = None
+
+    @property
+    def product_type_history(self) -> "_HistoryView":
+        return self._history_view
+
+    @property
+    def subtype_lookup(self) -> "_SubtypeLookupView":
+        return self._subtype_view
+
+    @classmethod
+    def from_purchase_info(cls, purchase_info: PurchaseInfo) -> "CompactPurchaseInfo":
+        """Copies a PurchaseInfo into compact storage.
+
+        Args:
+            purchase_info (PurchaseInfo): The purchase information to copy.
+
+        Returns:
+            CompactPurchaseInfo: The same purchase information in compact storage.
+        """
+        compact = cls(purchase_info.customer_name, purchase_info.purchase_date, purchase_info.quantity)
+        for product_type, id_list in purchase_info.product_type_history.items():
+            compact.product_type_history[product_type].extend(id_list)
+        for product_type, subtypes in purchase_info.subtype_lookup.items():
+            compact.subtype_lookup[product_type].update(subtypes)
+        return compact
+
+    def to_purchase_info(self) -> PurchaseInfo:
+        """Copies the purchase information out of compact storage.
+
+        Returns:
+            PurchaseInfo: The same purchase information with plain lists and sets.
+        """
+        return PurchaseInfo(
+            self.customer_name,
+            self.purchase_date,
+            self.quantity,
+            {product_type: list(id_list) for product_type, id_list in self.product_type_history.items()},
+            {product_type: set(subtypes) for product_type, subtypes in self.subtype_lookup.items()},
+        )
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, (CompactPurchaseInfo, PurchaseInfo)):
+            return NotImplemented
+        return (self.customer_name == other.customer_name
+                and self.purchase_date == other.purchase_date
+                and self.quantity == other.quantity
+                and dict(self.product_type_history.items()) == dict(other.product_type_history.items())
+                and dict(self.subtype_lookup.items()) == dict(other.subtype_lookup.items()))
+
+    def __repr__(self) -> str:
+        item_count = sum(len(column) for column in self._ids.values())
+        return (f"CompactPurchaseInfo(customer_name={self.customer_name!r}, purchase_date={self.purchase_date!r}, "
+                f"quantity={self.quantity!r}, product_types={len(self._ids)}, items={item_count})")
+
+
+class _Column(Sequence):
+    """A list of strings packed into one bytes buffer.
+
+    While every string has the same encoded width, which is the normal case for Unique IDs and subtypes,
+    no offsets are stored at all. Offsets are only created once a string of a different width is added.
+    """
+
+    __slots__ = ("data", "width", "count", "ends")
+
+    def __init__(self):
+        self.data = bytearray()
+        self.width: Optional[int] = None
+        self.count = 0
+        self.ends: Optional[array] = None
+
+    def append(self, value: str) -> None:
+        encoded = value.encode(ENCODING)
+        if self.ends is None:
+            if self.width is None:
+                self.width = len(encoded)
+            elif len(encoded) != self.width:
+                self.ends = array("Q", (self.width * (i + 1) for i in range(self.count)))
+        self.data += encoded
+        if self.ends is not None:
+            self.ends.append(len(self.data))
+        self.count += 1
+
+    def extend(self, values) -> None:
+        for value in values:
+            self.append(value)
+
+    def pop(self) -> str:
+        value = self[-1]
+        self.count -= 1
+        if self.ends is None:
+            del self.data[self.count * self.width:]
+        else:
+            self.ends.pop()
+            del self.data[self.ends[-1] if self.ends else 0:]
+        return value
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("column index out of range")
+        if self.ends is None:
+            start = index * self.width
+            end = start + self.width
+        else:
+            start = self.ends[index - 1] if index else 0
+            end = self.ends[index]
+        return self.data[start:end].decode(ENCODING)
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(self.count):
+            yield self[index]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, _Column)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+class _HistoryView(MutableMapping):
+    """product_type_history of a CompactPurchaseInfo. Missing product types are added on access, like a defaultdict."""
+
+    __slots__ = ("_info",)
+
+    def __init__(self, info: CompactPurchaseInfo):
+        self._info = info
+
+    def __getitem__(self, product_type: str) -> _Column:
+        ids = self._info._ids
+        if product_type not in ids:
+            ids[sys.intern(product_type)] = _Column()
+        return ids[product_type]
+
+    def __setitem__(self, product_type: str, id_list) -> None:
+        column = _Column()
+        column.extend(id_list)
+        self._info._ids[sys.intern(product_type)] = column
+
+    def __delitem__(self, product_type: str) -> None:
+        del self._info._ids[product_type]
+
+    def __contains__(self, product_type) -> bool:
+        return product_type in self._info._ids
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._info._ids)
+
+    def __len__(self) -> int:
+        return len(self._info._ids)
+
+
+class _SubtypeSet(MutableSet):
+    """The subtypes of one product type in a CompactPurchaseInfo."""
+
+    __slots__ = ("_info", "_numbers")
+
+    def __init__(self, info: CompactPurchaseInfo, numbers: set[int]):
+        self._info = info
+        self._numbers = numbers
+
+    def add(self, subtype: str) -> None:
+        info = self._info
+        number = info._subtype_numbers.get(subtype)
+        if number is None:
+            number = len(info._subtype_values)
+            info._subtype_values.append(subtype)
+            info._subtype_numbers[sys.intern(subtype)] = number
+        self._numbers.add(number)
+
+    def update(self, subtypes) -> None:
+        for subtype in subtypes:
+            self.add(subtype)
+
+    def discard(self, subtype: str) -> None:
+        number = self._info._subtype_numbers.get(subtype)
+        if number is not None:
+            self._numbers.discard(number)
+
+    def __contains__(self, subtype) -> bool:
+        return self._info._subtype_numbers.get(subtype) in self._numbers
+
+    def __iter__(self) -> Iterator[str]:
+        values = self._info._subtype_values
+        for number in self._numbers:
+            yield values[number]
+
+    def __len__(self) -> int:
+        return len(self._numbers)
+
+    def __repr__(self) -> str:
+        return repr(set(self))
+
+
+class _SubtypeLookupView(MutableMapping):
+    """subtype_lookup of a CompactPurchaseInfo. Missing product types are added on access, like a defaultdict."""
+
+    __slots__ = ("_info",)
+
+    def __init__(self, info: CompactPurchaseInfo):
+        self._info = info
+
+    def __getitem__(self, product_type: str) -> _SubtypeSet:
+        subtypes = self._info._subtypes
+        if product_type not in subtypes:
+            subtypes[sys.intern(product_type)] = set()
+        return _SubtypeSet(self._info, subtypes[product_type])
+
+    def __setitem__(self, product_type: str, subtypes) -> None:
+        self._info._subtypes[sys.intern(product_type)] = set()
+        self[product_type].update(subtypes)
+
+    def __delitem__(self, product_type: str) -> None:
+        del self._info._subtypes[product_type]
+
+    def __contains__(self, product_type) -> bool:
+        return product_type in self._info._subtypes
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._info._subtypes)
+
+    def __len__(self) -> int:
+        return len(self._info._subtypes)
@@ -0,0 +1,78 @@
+import math
+from hashlib import blake2b
+from typing import Iterable
+
+# Default number of index bits, which gives 4096 registers and a typical error of about 1.6%
+DEFAULT_PRECISION = 12
+
+
+class HyperLogLog:
+    """An approximate count of distinct strings in a fixed amount of memory.
+
+    Each string is hashed, the first bits of the hash pick a register, and the register keeps the longest run of
+    leading zero bits seen in the rest of the hash. Sketches with the same precision merge by taking the larger
+    value of each register, so counts can be combined across files and processes without keeping the strings.
+    """
+
+    __slots__ = ("precision", "registers")
+
+    def __init__(self, precision: int = DEFAULT_PRECISION):
+        """
+        Args:
+            precision (int): Number of index bits, from 4 to 16. The sketch uses 2**precision bytes and its typical
+                relative error is 1.04 / sqrt(2**precision).
+
+        Raises:
+            ValueError: When the precision is out of range.
+        """
+        if not 4 <= precision <= 16:
+            raise ValueError(f"Precision must be from 4 to 16, not {precision}")
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, value: str) -> None:
+        """Adds a string to the sketch."""
+        hashed = int.from_bytes(blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+        index = hashed >> (64 - self.precision)
+        # Leading zeros of the remaining bits, plus one, capped when the remaining bits are all zero
+        remaining = hashed & ((1 << (64 - self.precision)) - 1)
+        rank = 64 - self.precision - remaining.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def update(self, values: Iterable[str]) -> None:
+        """Adds every string to the sketch."""
+        for value in values:
+            self.add(value)
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """Merges another sketch into this one, which then counts the strings added to either.
+
+        Returns:
+            HyperLogLog: This sketch.
+
+        Raises:
+            ValueError: When the sketches have different precisions.
+        """
+        if other.precision != self.precision:
+            raise ValueError(f"Cannot merge sketches of precision {self.precision} and {other.precision}")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def count(self) -> int:
+        """Returns the estimated number of distinct strings added."""
+        register_count = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / register_count)
+        estimate = alpha * register_count * register_count / sum(2.0 ** -register for register in self.registers)
+        # Small counts are estimated more accurately from the number of empty registers
+        if estimate <= 2.5 * register_count and (empty := self.registers.count(0)):
+            estimate = register_count * math.log(register_count / empty)
+        return round(estimate)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, HyperLogLog):
+            return NotImplemented
+        return self.precision == other.precision and self.registers == other.registers
+
+    def __repr__(self) -> str:
+        return f"HyperLogLog(precision={self.precision}, count={self.count()})"
@@ -0,0 +1,52 @@
+from typing import Iterable, Optional
+
+from HalfFoodsScanner.dataloaders.productindex import ProductKeyIndex, get_product_key_index
+
+
+class ProductCatalog(dict):
+    """A read-only product key whose correction index is compiled once, when the catalog is created.
+
+    It is a dict of product types to descriptions, so it can be passed anywhere a product key is expected, and
+    exact matches are dict lookups as before. get_product_key_index returns the compiled index directly instead
+    of looking it up by the product types on every file.
+
+    A catalog never changes after it is created. A newer version of the catalog is a new ProductCatalog, so
+    scans that are already running keep the version they started with. Use a plain dict for a product key that
+    is edited in place.
+    """
+
+    def __init__(self, entries: Iterable[tuple[str, str]] = (), source: Optional[str] = None,
+                 product_key_index: Optional[ProductKeyIndex] = None):
+        """
+        Args:
+            entries (Iterable[tuple[str, str]]): The product types and their descriptions, in product key order,
+                which decides which product type a corrupted product type is corrected to.
+            source (Optional[str]): Where the catalog was loaded from.
+            product_key_index (Optional[ProductKeyIndex]): An index built earlier for the same product types, such
+                as one read from a compiled catalog. If not given, the index is found or built.
+
+        Raises:
+            ValueError: When the index is for other product types.
+        """
+        super().__init__(entries)
+        self.source = source
+        if product_key_index is None:
+            # Shared with every catalog and product key that has the same product types, in this process
+            product_key_index = get_product_key_index(self)
+        elif product_key_index.product_keys != tuple(self):
+            raise ValueError("The product key index was built for other product types")
+        self.product_key_index: ProductKeyIndex = product_key_index
+
+    def __reduce__(self):
+        # Sent to worker processes as its entries, and the index is found or built there once per process, since
+        # it is larger than the entries
+        return type(self), (list(self.items()), self.source)
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("A ProductCatalog is read-only, load a new one to change it")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __repr__(self) -> str:
+        return f"ProductCatalog({len(self)} product types, source={self.source!r})"
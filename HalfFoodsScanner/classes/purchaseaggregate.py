@@ -0,0 +1,154 @@
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Optional
+
+from HalfFoodsScanner.classes.hyperloglog import DEFAULT_PRECISION, HyperLogLog
+from HalfFoodsScanner.classes.purchaseinfo import PurchaseInfo
+
+
+@dataclass
+class PurchaseAggregate:
+    """Store-wide totals over many purchases, which can be merged in any order or grouping.
+
+    The memory used grows with the number of distinct product types, subtypes and days, not with the number of
+    items. In approximate mode subtypes and unique IDs are counted with HyperLogLog sketches instead of sets, so
+    memory stays fixed even for the highest-cardinality columns.
+
+    approximate: Whether distinct subtypes and IDs are counted with sketches.
+    purchases: Number of purchases added.
+    failed_files: Number of files that could not be loaded, for drivers that count them.
+    quantity: Total quantity of the purchases. (Note: includes items purchased with an invalid product type.)
+    product_type_counts: For each product type, the number of items.
+    daily_quantity: For each purchase date, as YYYY-MM-DD, the total quantity.
+    subtypes: For each product type, its distinct subtypes. Empty in approximate mode.
+    subtype_sketches: For each product type, a sketch of its distinct subtypes. Only in approximate mode.
+    id_sketch: A sketch of the distinct unique IDs. Only in approximate mode.
+    """
+
+    approximate: bool = False
+    purchases: int = 0
+    failed_files: int = 0
+    quantity: int = 0
+    product_type_counts: Counter = field(default_factory=Counter)
+    daily_quantity: Counter = field(default_factory=Counter)
+    subtypes: dict[str, set[str]] = field(default_factory=dict)
+    subtype_sketches: dict[str, HyperLogLog] = field(default_factory=dict)
+    id_sketch: Optional[HyperLogLog] = None
+
+    def __post_init__(self):
+        if self.approximate and self.id_sketch is None:
+            self.id_sketch = HyperLogLog(DEFAULT_PRECISION)
+
+    @classmethod
+    def from_purchase_info(cls, purchase_info: PurchaseInfo, approximate: bool = False) -> "PurchaseAggregate":
+        """Builds the aggregate of a single purchase.
+
+        Args:
+            purchase_info (PurchaseInfo): The purchase information, which may also be a CompactPurchaseInfo.
+            approximate (bool): Count distinct subtypes and IDs with sketches.
+
+        Returns:
+            PurchaseAggregate: The aggregate of the purchase.
+        """
+        aggregate = cls(approximate)
+        aggregate.add(purchase_info)
+        return aggregate
+
+    def add(self, purchase_info: PurchaseInfo) -> None:
+        """Adds a single purchase to the totals.
+
+        Args:
+            purchase_info (PurchaseInfo): The purchase information, which may also be a CompactPurchaseInfo.
+        """
+        self.purchases += 1
+        self.quantity += purchase_info.quantity
+        if purchase_info.purchase_date is not None:
+            self.daily_quantity[purchase_info.purchase_date.date().isoformat()] += purchase_info.quantity
+        for product_type, id_list in purchase_info.product_type_history.items():
+            self.product_type_counts[product_type] += len(id_list)
+            if self.approximate:
+                self.id_sketch.update(id_list)
+        for product_type, subtypes in purchase_info.subtype_lookup.items():
+            if self.approximate:
+                if product_type not in self.subtype_sketches:
+                    self.subtype_sketches[product_type] = HyperLogLog(self.id_sketch.precision)
+                self.subtype_sketches[product_type].update(subtypes)
+            else:
+                self.subtypes.setdefault(product_type, set()).update(subtypes)
+
+    def merge(self, other: "PurchaseAggregate") -> "PurchaseAggregate":
+        """Adds the totals of another aggregate to this one. Merging is associative and commutative, so partial
+        aggregates can be combined in any grouping.
+
+        Args:
+            other (PurchaseAggregate): The aggregate to add, which is left unchanged.
+
+        Returns:
+            PurchaseAggregate: This aggregate.
+
+        Raises:
+            ValueError: When one aggregate is approximate and the other is not.
+        """
+        if other.approximate != self.approximate:
+            raise ValueError("Cannot merge an approximate aggregate with an exact one")
+        self.purchases += other.purchases
+        self.failed_files += other.failed_files
+        self.quantity += other.quantity
+        self.product_type_counts.update(other.product_type_counts)
+        self.daily_quantity.update(other.daily_quantity)
+        for product_type, subtypes in other.subtypes.items():
+            self.subtypes.setdefault(product_type, set()).update(subtypes)
+        for product_type, sketch in other.subtype_sketches.items():
+            if product_type in self.subtype_sketches:
+                self.subtype_sketches[product_type].merge(sketch)
+            else:
+                self.subtype_sketches[product_type] = HyperLogLog(sketch.precision).merge(sketch)
+        if self.approximate:
+            self.id_sketch.merge(other.id_sketch)
+        return self
+
+    def top_product_types(self, count: Optional[int] = None) -> list[tuple[str, int]]:
+        """Returns the product types with the most items, most first. Ties are listed in product type order, so
+        the result does not depend on the order aggregates were merged in.
+
+        Args:
+            count (Optional[int]): The number of product types to return. Returns all of them if not given.
+
+        Returns:
+            list[tuple[str, int]]: The product types and their item counts.
+        """
+        ranked = sorted(self.product_type_counts.items(), key=lambda item: (-item[1], item[0]))
+        return ranked if count is None else ranked[:count]
+
+    def distinct_subtypes(self) -> dict[str, int]:
+        """Returns the number of distinct subtypes of each product type, estimated in approximate mode.
+
+        Returns:
+            dict[str, int]: The distinct subtype count per product type.
+        """
+        if self.approximate:
+            return {product_type: sketch.count() for product_type, sketch in sorted(self.subtype_sketches.items())}
+        return {product_type: len(subtypes) for product_type, subtypes in sorted(self.subtypes.items())}
+
+    def distinct_ids(self) -> Optional[int]:
+        """Returns the estimated number of distinct unique IDs, or None if the aggregate is not approximate."""
+        return self.id_sketch.count() if self.approximate else None
+
+    def summary(self, top: Optional[int] = None) -> dict:
+        """Summarises the aggregate as plain values, ready to be written as JSON.
+
+        Args:
+            top (Optional[int]): The number of top product types to include. Includes all of them if not given.
+
+        Returns:
+            dict: The totals, top product types, distinct counts and quantity per day.
+        """
+        return {
+            "purchases": self.purchases,
+            "failed_files": self.failed_files,
+            "quantity": self.quantity,
+            "top_product_types": dict(self.top_product_types(top)),
+            "distinct_subtypes": self.distinct_subtypes(),
+            "distinct_ids": self.distinct_ids(),
+            "daily_quantity": dict(sorted(self.daily_quantity.items())),
+        }
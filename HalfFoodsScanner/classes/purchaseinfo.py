@@ -1,6 +1,9 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Tuple
+from typing import Iterator, Optional, Tuple
+
+# Largest number of IDs in one piece of iter_advanced_purchase_information
+REPORT_PAGE_SIZE = 1000
 
 
 @dataclass
@@ -20,6 +23,10 @@ class PurchaseInfo:
     product_type_history: dict[str, list[str]]
     subtype_lookup: dict[str, set[str]]
 
+    # The most common product type, valid while the quantity is _tracked_quantity
+    _most_common: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _tracked_quantity: Optional[int] = field(default=None, init=False, repr=False, compare=False)
+
     def get_basic_purchase_information(self) -> str:
         """
         Returns the purchase information required by Question 1 as a formattted string.
@@ -32,31 +39,76 @@ class PurchaseInfo:
             Quantity: {self.quantity}
             """
 
+    def clear(self) -> None:
+        """
+        Removes every item and sets the quantity back to zero, keeping the customer name and date.
+        """
+        self.quantity = 0
+        self.product_type_history.clear()
+        self.subtype_lookup.clear()
+        self._tracked_quantity = None
+
+    def most_common_product_type(self) -> Optional[str]:
+        """
+        Returns the product type with the most items, without touching the IDs. Ties go to the product type that was
+        purchased first.
+
+        The loaders append to product_type_history directly, so the answer is worked out from the length of each
+        product type's IDs, which costs one step per product type rather than per item. It is kept until the
+        quantity changes.
+
+        :return: The most common product type, or None if there are no items with a product type.
+        """
+        if self._tracked_quantity != self.quantity:
+            self._most_common = None
+            max_count = 0
+            for product_type, id_list in self.product_type_history.items():
+                if (id_count := len(id_list)) > max_count:
+                    max_count = id_count
+                    self._most_common = product_type
+            self._tracked_quantity = self.quantity
+        return self._most_common
+
     def get_advanced_purchase_information(
             self, product_key: dict[str, str]) -> Tuple[str, str]:
         """
         Returns the additional information required by Question 2 as a formattted string.
-        Note: This assumes there is one most common product type and there are no ties.
+        Note: For very large purchases, iter_advanced_purchase_information produces the same text without holding
+        it all in memory.
 
         :return: Tuple of the formatted string of the additional purchasing information, and the most common product type as a string
         """
-        str_ret = []
-        max_count = 0
-        max_str = "None"
+        return ("".join(self.iter_advanced_purchase_information(product_key)),
+                self.most_common_description(product_key))
+
+    def iter_advanced_purchase_information(
+            self, product_key: dict[str, str], page_size: int = REPORT_PAGE_SIZE) -> Iterator[str]:
+        """
+        Yields the text of get_advanced_purchase_information a piece at a time, so it can be written to a terminal or
+        file without building the whole string. Each piece holds at most page_size IDs.
 
-        # While formatting string, search for most common product type
+        :product_key: The product lookup key.
+        :page_size: The largest number of IDs in one piece.
+        :return: Pieces of the text, which joined together are the text of get_advanced_purchase_information.
+        """
         for product_type, id_list in self.product_type_history.items():
-            item_list = ", ".join(id_list)
-            str_ret.append(
-                f"{product_key[product_type]} -- {len(id_list)} items: {item_list}"
-            )
-            if (id_count := len(id_list)) > max_count:
-                max_count = id_count
-                max_str = product_key[product_type]
-        str_ret.append("\n")
-        str_ret.append(f"Most common product type: {max_str}")
-
-        return ("\n".join(str_ret), max_str)
+            yield f"{product_key[product_type]} -- {len(id_list)} items: "
+            for start in range(0, len(id_list), page_size):
+                page = ", ".join(id_list[start:start + page_size])
+                yield page if start == 0 else ", " + page
+            yield "\n"
+        yield "\n\n"
+        yield f"Most common product type: {self.most_common_description(product_key)}"
+
+    def most_common_description(self, product_key: dict[str, str]) -> str:
+        """
+        Returns the description of the most common product type.
+
+        :product_key: The product lookup key.
+        :return: The description, or "None" if there are no items with a product type.
+        """
+        most_common = self.most_common_product_type()
+        return "None" if most_common is None else product_key[most_common]
 
     def get_subtypes(self, product_type: str) -> str:
         """
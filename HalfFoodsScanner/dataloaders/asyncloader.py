@@ -0,0 +1,114 @@
+import asyncio
+from abc import ABC, abstractmethod
+from concurrent.futures import Executor
+from typing import AsyncIterator, Iterable, Optional, Union
+
+from HalfFoodsScanner.dataloaders.dataloader import DataLoader
+from HalfFoodsScanner.dataloaders.textloader import TextLoader
+from HalfFoodsScanner.classes.purchaseinfo import PurchaseInfo
+
+# Default limit on the number of files loaded at the same time
+DEFAULT_MAX_CONCURRENCY = 32
+# Files iter_load keeps started per file loaded at the same time, so the next file is ready when one finishes
+QUEUE_DEPTH = 2
+
+
+class AsyncDataLoader(ABC):
+    """An abstract class for loaders used from asyncio code, such as a web service.
+    """
+
+    # The largest number of files loaded at the same time, which bounds the files iter_load has in progress
+    max_concurrency = DEFAULT_MAX_CONCURRENCY
+
+    @abstractmethod
+    async def load_data_async(self, product_key: dict[str, str], data_path: str) -> PurchaseInfo:
+        """Abstract asynchronous loading method
+
+        Args:
+            product_key (dict[str, str]): A key containing all product types and a description of each.
+            data_path (str): Path to the data
+
+        Returns:
+            PurchaseInfo: After data is parsed, return purchase info
+        """
+        pass
+
+    async def iter_load(self, product_key: dict[str, str], data_paths: Iterable[str],
+                        return_exceptions: bool = False) -> AsyncIterator[tuple[str, Union[PurchaseInfo, Exception]]]:
+        """Loads many files concurrently and yields each one as soon as it is loaded.
+
+        The paths are read as files finish, and at most QUEUE_DEPTH * max_concurrency files are in progress at a
+        time, so a long or slow iterable of paths is never read all at once.
+
+        Args:
+            product_key (dict[str, str]): A key containing all product types and a description of each.
+            data_paths (Iterable[str]): Paths to the data.
+            return_exceptions (bool): Yield the exception of a file that fails to load in place of its
+                PurchaseInfo, instead of raising it, so the other files are still loaded.
+
+        Yields:
+            tuple[str, Union[PurchaseInfo, Exception]]: The path and its purchase info, in completion order.
+        """
+        async def load(data_path: str):
+            try:
+                return data_path, await self.load_data_async(product_key, data_path)
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                return data_path, e
+
+        max_pending = self.max_concurrency * QUEUE_DEPTH
+        tasks = set()
+        try:
+            for data_path in data_paths:
+                tasks.add(asyncio.ensure_future(load(data_path)))
+                if len(tasks) >= max_pending:
+                    done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        yield task.result()
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+class AsyncTextLoader(AsyncDataLoader):
+    """Loads files from asyncio code without blocking the event loop.
+
+    Each load, which reads and parses the file, runs in an executor, so the event loop keeps serving other
+    requests while files are read and parsed. A semaphore limits how many loads run at once so a burst of
+    requests cannot queue unbounded work on the executor. Parsing is CPU-bound, so pass a
+    ProcessPoolExecutor for loads to run in parallel; the default thread pool keeps the event loop
+    responsive but parses one file at a time.
+    """
+
+    def __init__(self, loader: Optional[DataLoader] = None, executor: Optional[Executor] = None,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY):
+        """
+        Args:
+            loader (Optional[DataLoader]): The loader run in the executor. Defaults to TextLoader. Must be picklable
+                when using a ProcessPoolExecutor.
+            executor (Optional[Executor]): Where loads run. Defaults to the event loop's default thread pool.
+            max_concurrency (int): The largest number of files loaded at the same time.
+        """
+        self.loader = loader or TextLoader()
+        self.executor = executor
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def load_data_async(self, product_key: dict[str, str], data_path: str) -> PurchaseInfo:
+        """Loads data from a text file in the executor and returns the customer's purchase information.
+
+        Args:
+            product_key (dict[str, str]): A key containing all product types and a description of each.
+            data_path (str): A path to the text file.
+
+        Returns:
+            PurchaseInfo: All data needed to print the customer's information.
+        """
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, self.loader.load_data, product_key, data_path)
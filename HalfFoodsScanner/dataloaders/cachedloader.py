@@ -0,0 +1,163 @@
+import hashlib
+import marshal
+import os
+import tempfile
+from collections import defaultdict
+from datetime import datetime
+from typing import Optional
+
+from HalfFoodsScanner.dataloaders.dataloader import DataLoader
+from HalfFoodsScanner.classes.compactpurchaseinfo import CompactPurchaseInfo
+from HalfFoodsScanner.classes.purchaseinfo import PurchaseInfo
+
+# Bumped whenever the layout of a cache entry changes, so old entries are never read back
+FORMAT_VERSION = 1
+
+# Default limit on the total size of the cache directory, in bytes
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+CACHE_SUFFIX = ".hfcache"
+
+
+def default_cache_dir() -> str:
+    """Returns the cache directory, HALFFOODS_CACHE_DIR if set, otherwise under the user's cache directory."""
+    if cache_dir := os.environ.get("HALFFOODS_CACHE_DIR"):
+        return cache_dir
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "HalfFoodsScanner")
+
+
+class CachedLoader(DataLoader):
+    """Wraps another loader and keeps its parsed results in an on-disk cache.
+
+    Entries are keyed by the file's path, size and modification time (and optionally a hash of its contents)
+    together with the contents of the product key and the wrapped loader's describe(), so editing the file,
+    adding a product type or configuring the loader differently makes a new entry instead of returning a stale
+    one. Entries are stored with marshal, which is compact and fast to
+    read back. Reading an entry marks it as recently used, and the least recently used entries are removed
+    once the cache grows past its size limit.
+
+    Problems with the cache itself never fail a load; the file is parsed as normal instead.
+    """
+
+    def __init__(self, loader: DataLoader, cache_dir: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES,
+                 hash_contents: bool = False):
+        """
+        Args:
+            loader (DataLoader): The loader used when a file is not in the cache.
+            cache_dir (Optional[str]): Where the cache entries are kept. Defaults to default_cache_dir().
+            max_bytes (int): Size limit of the cache directory, in bytes.
+            hash_contents (bool): Also key entries on a hash of the file's contents, for filesystems where the
+                modification time cannot be trusted. This reads the whole file on every load.
+
+        Raises:
+            ValueError: When the loader cannot describe itself, so its results cannot be cached safely.
+        """
+        self.loader_description = loader.describe()
+        if self.loader_description is None:
+            raise ValueError(f"{type(loader).__name__} results depend on more than the file and its settings, "
+                             "and cannot be cached")
+        self.loader = loader
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.hash_contents = hash_contents
+
+    def load_data(self, product_key: dict[str, str], data_path: str) -> PurchaseInfo:
+        """Returns the cached purchase information for a file, parsing and caching it on a miss.
+
+        Args:
+            product_key (dict[str, str]): A key containing all product types and a description of each.
+            data_path (str): A path to the text file.
+
+        Returns:
+            PurchaseInfo: All data needed to print the customer's information.
+        """
+        entry_path = os.path.join(self.cache_dir, self.cache_key(product_key, data_path) + CACHE_SUFFIX)
+
+        purchase_info = self._read_entry(entry_path)
+        if purchase_info is None:
+            purchase_info = self.loader.load_data(product_key, data_path)
+            self._write_entry(entry_path, purchase_info)
+
+        if getattr(self.loader, "compact", False) and not isinstance(purchase_info, CompactPurchaseInfo):
+            purchase_info = CompactPurchaseInfo.from_purchase_info(purchase_info)
+        return purchase_info
+
+    def cache_key(self, product_key: dict[str, str], data_path: str) -> str:
+        """Returns the name of the cache entry for a file and product key.
+
+        Raises:
+            FileNotFoundError: When the file is unable to be found.
+        """
+        data_path = os.path.abspath(data_path)
+        stat = os.stat(data_path)
+
+        key = hashlib.sha256()
+        key.update(marshal.dumps((FORMAT_VERSION, marshal.version, data_path, stat.st_size, stat.st_mtime_ns,
+                                  list(product_key.items()), self.loader_description)))
+        if self.hash_contents:
+            with open(data_path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    key.update(chunk)
+        return key.hexdigest()
+
+    def _read_entry(self, entry_path: str) -> Optional[PurchaseInfo]:
+        try:
+            with open(entry_path, "rb") as f:
+                customer_name, purchase_date, quantity, history, subtypes = marshal.load(f)
+            purchase_info = PurchaseInfo(
+                customer_name,
+                datetime.fromisoformat(purchase_date),
+                quantity,
+                defaultdict(list, history),
+                defaultdict(set, {product_type: set(subtype_list) for product_type, subtype_list in subtypes.items()}),
+            )
+            # Mark the entry as recently used
+            os.utime(entry_path)
+        except (OSError, EOFError, ValueError, TypeError, AttributeError):
+            return None
+        return purchase_info
+
+    def _write_entry(self, entry_path: str, purchase_info: PurchaseInfo) -> None:
+        entry = (
+            purchase_info.customer_name,
+            purchase_info.purchase_date.isoformat(),
+            purchase_info.quantity,
+            {product_type: list(id_list) for product_type, id_list in purchase_info.product_type_history.items()},
+            {product_type: list(subtypes) for product_type, subtypes in purchase_info.subtype_lookup.items()},
+        )
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Written to a temporary file first so a reader never sees a partial entry
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    marshal.dump(entry, f)
+                os.replace(temp_path, entry_path)
+            except BaseException:
+                os.remove(temp_path)
+                raise
+            self._evict()
+        except OSError:
+            pass
+
+    def _evict(self) -> None:
+        """Removes the least recently used entries until the cache is within its size limit."""
+        entries = []
+        total_bytes = 0
+        with os.scandir(self.cache_dir) as it:
+            for dir_entry in it:
+                if dir_entry.name.endswith(CACHE_SUFFIX):
+                    stat = dir_entry.stat()
+                    entries.append((stat.st_mtime_ns, stat.st_size, dir_entry.path))
+                    total_bytes += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_bytes -= size
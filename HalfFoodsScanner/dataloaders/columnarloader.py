@@ -0,0 +1,43 @@
+from typing import Optional
+
+from HalfFoodsScanner.dataloaders.dataloader import DataLoader
+from HalfFoodsScanner.classes.purchaseinfo import PurchaseInfo
+from HalfFoodsScanner.storage.columnar import ColumnarFile
+
+
+class ColumnarLoader(DataLoader):
+    """Loads a purchase from a binary columnar file written by storage.columnar.write_purchases.
+
+    Product types were already corrected when the file was written, so the product key is not consulted.
+    """
+
+    def __init__(self, index: Optional[int] = None):
+        """
+        Args:
+            index (Optional[int]): The purchase to load from the file. If not given, the file must hold exactly one
+                purchase.
+        """
+        self.index = index
+
+    def describe(self) -> Optional[tuple]:
+        """Describes the loader and the purchase it loads."""
+        return super().describe() + (self.index,)
+
+    def load_data(self, product_key: dict[str, str], data_path: str) -> PurchaseInfo:
+        """Loads a purchase from a columnar file.
+
+        Args:
+            product_key (dict[str, str]): A key containing all product types and a description of each. Unused.
+            data_path (str): A path to the columnar file.
+
+        Returns:
+            PurchaseInfo: All data needed to print the customer's information.
+
+        Raises:
+            ValueError: When the file is not a columnar file, or no index was given and the file does not hold
+                exactly one purchase.
+        """
+        with ColumnarFile(data_path) as columnar_file:
+            if self.index is None and len(columnar_file) != 1:
+                raise ValueError(f"{data_path} holds {len(columnar_file)} purchases, pick one with an index")
+            return columnar_file[self.index or 0].to_purchase_info()
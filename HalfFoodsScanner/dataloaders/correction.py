@@ -0,0 +1,200 @@
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Mapping, Optional
+
+from HalfFoodsScanner.dataloaders.productindex import get_product_key_index
+from HalfFoodsScanner.classes.purchaseinfo import PurchaseInfo
+
+
+@dataclass
+class CorrectionStats:
+    """Counts of the product lines whose product type was not in the product key.
+
+    corrected: Lines corrected to the only product type close enough.
+    ambiguous: Lines close enough to several product types, resolved by subtype and frequency.
+    dropped: Lines close to no product type, which only count toward the quantity.
+    """
+
+    corrected: int = 0
+    ambiguous: int = 0
+    dropped: int = 0
+
+    def __iadd__(self, other: "CorrectionStats") -> "CorrectionStats":
+        self.corrected += other.corrected
+        self.ambiguous += other.ambiguous
+        self.dropped += other.dropped
+        return self
+
+
+def classify_products(product_key: dict[str, str], lines: Iterable[str]) -> Iterator[tuple[bool, tuple[str, ...], str, str]]:
+    """Splits product lines into their fields and finds the product types each line may belong to. This is the
+    one place product lines are matched against the product key for correction, shared by
+    TextLoader.iter_products and CorrectionEngine.
+
+    Args:
+        product_key (dict[str, str]): A key containing all product types and a description of each.
+        lines (Iterable[str]): The product lines, such as an open file positioned after the header.
+
+    Yields:
+        tuple[bool, tuple[str, ...], str, str]: Whether the product type is in the product key, the product
+            types the line may belong to in product key order, the subtype and the unique ID of each line. The
+            product types are the line's own when it is in the product key, and empty when no entry is close
+            enough.
+    """
+    product_key_index = get_product_key_index(product_key)
+    # Line format: [ProductType][Subtype][UniqueID]
+    for line in lines:
+        product_type = line[:4]
+        if product_type in product_key:
+            yield True, (product_type,), line[4:10], line[10:].strip()
+        else:
+            yield False, product_key_index.candidates(product_type), line[4:10], line[10:].strip()
+
+
+class CorrectionEngine:
+    """Corrects corrupted product types, resolving ambiguous ones by how likely each product type is.
+
+    TextLoader corrects a corrupted product type to the first close enough entry in the product key. When
+    several entries are close enough, this engine instead prefers the product type whose known subtypes
+    include the line's subtype, and then the product type seen most often. Frequencies are counted from
+    the lines that needed no guessing while they are parsed, so ambiguous lines are set aside and resolved
+    once the rest of the lines have been read, and are then inserted where they appeared in the file.
+    Only the ambiguous lines are kept in memory and the file is read once.
+
+    With global frequencies, counts carry over between files parsed by the same engine, so a product type
+    that is common across the whole database wins ties in files where it is rare.
+    """
+
+    def __init__(self, subtype_catalog: Optional[Mapping[str, Iterable[str]]] = None,
+                 frequencies: Optional[Mapping[str, int]] = None, global_frequencies: bool = False):
+        """
+        Args:
+            subtype_catalog (Optional[Mapping[str, Iterable[str]]]): The known subtypes of each product type.
+                Product types missing from the catalog are not ruled out by their subtypes.
+            frequencies (Optional[Mapping[str, int]]): Product type counts to start from, such as the counts of
+                a previous sweep.
+            global_frequencies (bool): Add the counts of every parsed file to the frequencies, instead of
+                using each file's own counts on top of the starting frequencies.
+        """
+        self.subtype_catalog = {product_type: frozenset(subtypes)
+                                for product_type, subtypes in (subtype_catalog or {}).items()}
+        self.frequencies = Counter(frequencies or {})
+        self.global_frequencies = global_frequencies
+        self.stats = CorrectionStats()
+
+    def describe(self) -> Optional[tuple]:
+        """Describes the subtype catalog and starting frequencies, for caches of corrected results.
+
+        Returns:
+            Optional[tuple]: The settings, or None with global frequencies, where the corrections depend on the files
+                parsed earlier.
+        """
+        if self.global_frequencies:
+            return None
+        subtype_catalog = tuple(sorted((product_type, tuple(sorted(subtypes)))
+                                       for product_type, subtypes in self.subtype_catalog.items()))
+        return "CorrectionEngine", subtype_catalog, tuple(sorted(self.frequencies.items()))
+
+    def parse_products(self, product_key: dict[str, str], lines: Iterable[str],
+                       purchase_info: PurchaseInfo) -> CorrectionStats:
+        """Parses product lines one at a time and adds them to the purchase information, correcting corrupted
+        product types.
+
+        Args:
+            product_key (dict[str, str]): A key containing all product types and a description of each.
+            lines (Iterable[str]): The product lines, such as an open file positioned after the header.
+            purchase_info (PurchaseInfo): The purchase information to update in place.
+
+        Returns:
+            CorrectionStats: The counts for these lines. The engine's stats hold the totals of every call.
+        """
+        product_type_history = purchase_info.product_type_history
+        subtype_lookup = purchase_info.subtype_lookup
+        initial_lengths = {product_type: len(id_list) for product_type, id_list in product_type_history.items()}
+        stats = CorrectionStats()
+        # Line number, candidates, subtype and ID of each ambiguous line, along with the number of product types
+        # seen and the length of each candidate's ID list when the line was read, which is where the line's ID
+        # goes if that candidate wins
+        deferred = []
+
+        product_count = 0
+        for exact, candidates, subtype, product_id in classify_products(product_key, lines):
+            if exact:
+                product_type_history[candidates[0]].append(product_id)
+                subtype_lookup[candidates[0]].add(subtype)
+            elif len(candidates) == 1:
+                stats.corrected += 1
+                product_type_history[candidates[0]].append(product_id)
+                subtype_lookup[candidates[0]].add(subtype)
+            elif candidates:
+                stats.ambiguous += 1
+                positions = [len(product_type_history[candidate]) if candidate in product_type_history else 0
+                             for candidate in candidates]
+                deferred.append((product_count, candidates, len(product_type_history), positions, subtype,
+                                 product_id))
+            else:
+                stats.dropped += 1
+
+            product_count += 1
+
+        purchase_info.quantity += product_count
+        self.stats += stats
+        if not deferred:
+            return stats
+
+        # The lines of each product type in this file are the growth of its ID list
+        counts = {product_type: len(id_list) - initial_lengths.get(product_type, 0)
+                  for product_type, id_list in product_type_history.items()}
+        if self.global_frequencies:
+            self.frequencies.update(counts)
+            frequencies = self.frequencies
+        else:
+            frequencies = Counter(counts) + self.frequencies
+
+        # Product types are ranked by first appearance: the dict order, with an ambiguous line placed after the
+        # product types seen before it
+        ranks = {product_type: (order, 0, 0) for order, product_type in enumerate(product_type_history)}
+        insertions = defaultdict(list)
+        for line_number, candidates, seen, positions, subtype, product_id in deferred:
+            choice = self._choose(candidates, subtype, frequencies)
+            # The ambiguous line may come before the first line that named the product type exactly
+            rank = (seen - 1, 1, line_number)
+            ranks[choice] = min(ranks[choice], rank) if choice in ranks else rank
+            insertions[choice].append((positions[candidates.index(choice)], product_id))
+            subtype_lookup[choice].add(subtype)
+
+        # Each ID list is rebuilt once with its ambiguous lines merged in, rather than inserting them one by one
+        for product_type, inserted in insertions.items():
+            id_list = product_type_history[product_type]
+            merged = []
+            start = 0
+            for position, product_id in inserted:
+                merged.extend(id_list[start:position])
+                merged.append(product_id)
+                start = position
+            merged.extend(id_list[start:])
+            id_list[:] = merged
+
+        # A product type may first appear on an ambiguous line, so restore the order of first appearance
+        _reorder(product_type_history, ranks)
+        _reorder(subtype_lookup, ranks)
+        return stats
+
+    def _choose(self, candidates: tuple[str, ...], subtype: str, frequencies: Mapping[str, int]) -> str:
+        """Picks the most likely candidate: one whose known subtypes include the subtype, then the most
+        frequent, then the first in product key order."""
+        catalog = self.subtype_catalog
+        if catalog:
+            matching = [candidate for candidate in candidates
+                        if candidate not in catalog or subtype in catalog[candidate]]
+            if matching:
+                candidates = matching
+        # max keeps the first of equally frequent candidates, which is product key order
+        return max(candidates, key=lambda candidate: frequencies.get(candidate, 0))
+
+
+def _reorder(mapping: dict, ranks: dict[str, tuple]) -> None:
+    """Reorders a dict in place so its keys are in the order they first appeared in the file."""
+    items = sorted(mapping.items(), key=lambda item: ranks[item[0]])
+    mapping.clear()
+    mapping.update(items)
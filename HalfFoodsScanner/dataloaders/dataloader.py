@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Optional
 from HalfFoodsScanner.classes.purchaseinfo import PurchaseInfo
 
 class DataLoader(ABC):
@@ -17,3 +18,13 @@ class DataLoader(ABC):
             PurchaseInfo: After data is parsed, return purchase info
         """
         pass
+
+    def describe(self) -> Optional[tuple]:
+        """Describes the loader and every setting that changes what it returns, so caches of its results can tell
+        differently configured loaders apart. Loaders with such settings must override this.
+
+        Returns:
+            Optional[tuple]: The class and settings, built from strings, numbers, None, lists and tuples. None when
+                the results depend on more than the file and settings, such as on files loaded earlier.
+        """
+        return type(self).__module__, type(self).__qualname__
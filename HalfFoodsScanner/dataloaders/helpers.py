@@ -1,3 +1,11 @@
+import locale
+from datetime import datetime
+from functools import lru_cache
+from typing import Tuple
+
+# Encoding used when a loader decodes raw bytes itself, the same default open() uses in text mode
+FILE_ENCODING = locale.getpreferredencoding(False)
+
 
 def error_checker(str_one: str, str_two: str) -> bool:
     """Compares two strings and returns True if they match or differ by a single character,
@@ -19,3 +27,43 @@ def error_checker(str_one: str, str_two: str) -> bool:
         if error_count > 2:
             return False
     return True
+
+
+class MalformedHeaderError(ValueError):
+    """Raised when the first line of a customer file does not start with a date in MMDDYYYY format."""
+
+
+# Number of distinct header dates remembered by parse_header
+DATE_CACHE_SIZE = 4096
+
+
+def parse_header(first_line: str) -> Tuple[datetime, str]:
+    """Parses the customer information from the first line of a customer file.
+
+    Line format: [MMDDYYYY][Name]
+
+    Args:
+        first_line (str): The first line of the customer file.
+
+    Returns:
+        Tuple[datetime, str]: The date of purchase and the customer's name.
+
+    Raises:
+        MalformedHeaderError: When the line does not start with a valid date.
+    """
+    purchase_date = _parse_date(first_line[:8])
+    customer_name = first_line[8:].strip()
+    return purchase_date, customer_name
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _parse_date(date_string: str) -> datetime:
+    """Parses an MMDDYYYY date by slicing it into integers, which is much faster than datetime.strptime. Files of
+    the same day share the cached datetime, which is immutable."""
+    # Only ASCII digits, as with strptime, and not the signs and spaces that int() would allow
+    if len(date_string) == 8 and date_string.isascii() and date_string.isdigit():
+        try:
+            return datetime(int(date_string[4:]), int(date_string[:2]), int(date_string[2:4]))
+        except ValueError:
+            pass
+    raise MalformedHeaderError(f"Header does not start with a date in MMDDYYYY format: {date_string!r}")
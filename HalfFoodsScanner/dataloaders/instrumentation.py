@@ -0,0 +1,62 @@
+import heapq
+from dataclasses import asdict, dataclass, field
+
+# Number of slowest files LoaderStats keeps
+SLOWEST_FILES = 10
+
+
+@dataclass
+class LoaderStats:
+    """Counters and timings collected by a loader, totalled over every file it loads.
+
+    Collecting them is opt-in: a loader only fills in a LoaderStats that it was given, and does no extra work
+    on the hot path without one.
+
+    files: Number of files loaded.
+    bytes_read: Bytes read from the files.
+    lines: Product lines parsed, not counting headers.
+    exact_lines: Lines whose product type is in the product key.
+    corrected_lines: Lines whose product type was corrected to a product key entry.
+    dropped_lines: Lines whose product type is close to no product key entry.
+    correction_computations: Corrections worked out against the product key, rather than answered from the
+        product key index's memo. This is the fuzzy matching work, which was one error_checker call per
+        product key entry before the index existed.
+    header_seconds: Time spent opening files and parsing their headers. Streams opened by the caller, such as
+        decompressing readers, only count the header.
+    parse_seconds: Time spent reading and parsing product lines.
+    slowest_files: The (seconds, path) of the slowest files, slowest first.
+    """
+
+    files: int = 0
+    bytes_read: int = 0
+    lines: int = 0
+    exact_lines: int = 0
+    corrected_lines: int = 0
+    dropped_lines: int = 0
+    correction_computations: int = 0
+    header_seconds: float = 0.0
+    parse_seconds: float = 0.0
+    slowest_files: list[tuple[float, str]] = field(default_factory=list)
+
+    def record_lines(self, lines: int, corrected: int, dropped: int, correction_computations: int) -> None:
+        """Adds the counts of one batch of parsed product lines."""
+        self.lines += lines
+        self.exact_lines += lines - corrected - dropped
+        self.corrected_lines += corrected
+        self.dropped_lines += dropped
+        self.correction_computations += correction_computations
+
+    def record_file(self, data_path: str, bytes_read: int, header_seconds: float, parse_seconds: float) -> None:
+        """Adds the size and timings of one loaded file."""
+        self.files += 1
+        self.bytes_read += bytes_read
+        self.header_seconds += header_seconds
+        self.parse_seconds += parse_seconds
+
+        # slowest_files is kept sorted, and only ever holds SLOWEST_FILES entries
+        seconds = header_seconds + parse_seconds
+        self.slowest_files = heapq.nlargest(SLOWEST_FILES, self.slowest_files + [(seconds, data_path)])
+
+    def as_dict(self) -> dict:
+        """Returns the stats as a dict of plain values, ready to be written as JSON."""
+        return asdict(self)
@@ -0,0 +1,102 @@
+import mmap
+import os
+import re
+from collections import defaultdict
+
+from HalfFoodsScanner.dataloaders.dataloader import DataLoader
+from HalfFoodsScanner.dataloaders.helpers import FILE_ENCODING, parse_header
+from HalfFoodsScanner.dataloaders.productindex import get_product_key_index
+from HalfFoodsScanner.dataloaders.textloader import TextLoader
+from HalfFoodsScanner.classes.purchaseinfo import PurchaseInfo
+
+# Marks product types that have not been looked up yet, since None marks product types that match nothing
+_UNSEEN = object()
+
+# A carriage return that is not followed by a newline
+_LONE_CARRIAGE_RETURN = re.compile(rb"\r(?!\n)")
+
+
+class MmapLoader(DataLoader):
+    """Loads and parses a memory-mapped text file and returns the customer's purchasing information.
+
+    Product lines are read straight out of the mapped file as bytes, and only the fields stored in the
+    PurchaseInfo are decoded: the UniqueID of each line and each distinct subtype once. The file is never
+    copied into read buffers or decoded as a whole, and repeated scans of the same file share the pages
+    already in the OS page cache.
+
+    Product lines are expected to be ASCII, as their fixed layout requires. Files with old Mac style
+    carriage return line endings are parsed with TextLoader instead.
+    """
+
+    def load_data(self, product_key: dict[str, str], data_path: str) -> PurchaseInfo:
+        """Loads data from a text file and returns the customer's purchase information. Also performs error checking.
+
+        Args:
+            product_key (dict[str, str]): A key containing all product types and a description of each.
+            data_path (str): A path to the text file.
+
+        Returns:
+            PurchaseInfo: All data needed to print the customer's information.
+        """
+        with open(data_path, "rb") as f:
+            # Empty files cannot be mapped, TextLoader reports them the usual way
+            if os.fstat(f.fileno()).st_size == 0:
+                return TextLoader().load_data(product_key, data_path)
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if _has_carriage_returns(mm):
+                    return TextLoader().load_data(product_key, data_path)
+
+                purchase_date, customer_name = parse_header(mm.readline().decode(FILE_ENCODING))
+                purchase_info = PurchaseInfo(customer_name, purchase_date, 0, defaultdict(list), defaultdict(set))
+                self.parse_products(product_key, mm, purchase_info)
+
+        return purchase_info
+
+    def parse_products(self, product_key: dict[str, str], mm: mmap.mmap, purchase_info: PurchaseInfo) -> None:
+        """Parses the product lines of a mapped file from its current position and adds them to the purchase
+        information. Also performs error checking.
+
+        Args:
+            product_key (dict[str, str]): A key containing all product types and a description of each.
+            mm (mmap.mmap): The mapped file, positioned at the first product line.
+            purchase_info (PurchaseInfo): The purchase information to update in place.
+        """
+        product_key_index = get_product_key_index(product_key)
+        product_type_history = purchase_info.product_type_history
+
+        # Product types as raw bytes mapped to the (corrected) product type, or None if nothing matches
+        type_lookup = {product_key_id.encode(FILE_ENCODING): product_key_id for product_key_id in product_key}
+        # Subtypes are kept as bytes until the end, so each distinct subtype is only decoded once
+        raw_subtypes = defaultdict(set)
+
+        product_count = 0
+
+        # Line format: [ProductType][Subtype][UniqueID]
+        for line in iter(mm.readline, b""):
+            product_count += 1
+
+            raw_type = line[:4]
+            product_type = type_lookup.get(raw_type, _UNSEEN)
+            if product_type is _UNSEEN:
+                # For Question 3, if the product type is off by one character
+                product_type = product_key_index.correct(raw_type.decode(FILE_ENCODING))
+                type_lookup[raw_type] = product_type
+            if product_type is None:
+                continue
+
+            product_type_history[product_type].append(line[10:].decode(FILE_ENCODING).strip())
+            raw_subtypes[product_type].add(line[4:10])
+
+        for product_type, subtypes in raw_subtypes.items():
+            purchase_info.subtype_lookup[product_type].update(subtype.decode(FILE_ENCODING) for subtype in subtypes)
+        purchase_info.quantity += product_count
+
+
+def _has_carriage_returns(mm: mmap.mmap) -> bool:
+    """Checks for carriage returns that end a line on their own, which TextLoader's universal newlines
+    treat as line endings. Windows newlines only leave a carriage return on the end of the UniqueID, which
+    is stripped anyway.
+    """
+    # One search in C over the whole map, rather than a step in Python for every Windows newline
+    return _LONE_CARRIAGE_RETURN.search(mm) is not None
@@ -0,0 +1,139 @@
+import io
+from collections import defaultdict
+from typing import Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from HalfFoodsScanner.dataloaders.dataloader import DataLoader
+from HalfFoodsScanner.dataloaders.helpers import FILE_ENCODING, parse_header
+from HalfFoodsScanner.dataloaders.productindex import get_product_key_index
+from HalfFoodsScanner.dataloaders.textloader import TextLoader
+from HalfFoodsScanner.classes.purchaseinfo import PurchaseInfo
+
+# Characters before the UniqueID in a product line: Product Type (4) and Subtype (6)
+ID_OFFSET = 10
+
+
+class NumpyLoader(DataLoader):
+    """Loads and parses a text file using NumPy and returns the customer's purchasing information.
+
+    Product lines all have the same width, so the file is viewed as an array of fixed-width records and
+    the product types are looked up, counted and grouped with vectorized operations. Files whose product
+    lines are not all the same width are parsed line by line with TextLoader instead.
+
+    Requires numpy to be installed.
+    """
+
+    def __init__(self):
+        if np is None:
+            raise ImportError("NumpyLoader requires numpy, install it with 'pip install numpy'")
+
+    def load_data(self, product_key: dict[str, str], data_path: str) -> PurchaseInfo:
+        """Loads data from a text file and returns the customer's purchase information. Also performs error checking.
+
+        Args:
+            product_key (dict[str, str]): A key containing all product types and a description of each.
+            data_path (str): A path to the text file.
+
+        Returns:
+            PurchaseInfo: All data needed to print the customer's information.
+        """
+        with open(data_path, "rb") as f:
+            first_line = f.readline()
+            body = f.read()
+
+        purchase_date, customer_name = parse_header(first_line.decode(FILE_ENCODING))
+        purchase_info = PurchaseInfo(customer_name, purchase_date, 0, defaultdict(list), defaultdict(set))
+
+        records = self._as_records(body)
+        if records is None:
+            lines = io.StringIO(body.decode(FILE_ENCODING), newline=None)
+            TextLoader().parse_products(product_key, lines, purchase_info)
+        else:
+            self.parse_records(product_key, records, purchase_info)
+        return purchase_info
+
+    def parse_records(self, product_key: dict[str, str], records: "np.ndarray", purchase_info: PurchaseInfo) -> None:
+        """Adds fixed-width product records to the purchase information. Also performs error checking.
+
+        Args:
+            product_key (dict[str, str]): A key containing all product types and a description of each.
+            records (np.ndarray): A 2D uint8 array with one product line per row, including the newline.
+            purchase_info (PurchaseInfo): The purchase information to update in place.
+        """
+        record_count, width = records.shape
+        purchase_info.quantity += record_count
+        if record_count == 0:
+            return
+
+        # Correct each distinct product type once, then map every record to its corrected product type.
+        # Product types are compared as 4-byte integers, and those that match nothing map to -1 so they
+        # only count toward the quantity.
+        product_key_index = get_product_key_index(product_key)
+        type_codes = np.ascontiguousarray(records[:, :4]).view("<u4").ravel()
+        unique_types, first_seen, inverse = np.unique(type_codes, return_index=True, return_inverse=True)
+        corrected_types: dict[str, int] = {}
+        corrected_codes = np.empty(len(unique_types), dtype=np.int16 if len(product_key) < 2**15 else np.intp)
+        for i, type_code in enumerate(unique_types.tolist()):
+            product_type = type_code.to_bytes(4, "little").decode(FILE_ENCODING)
+            if product_type not in product_key:
+                product_type = product_key_index.correct(product_type)
+            if product_type is None:
+                corrected_codes[i] = -1
+            else:
+                corrected_codes[i] = corrected_types.setdefault(product_type, len(corrected_types))
+        record_codes = corrected_codes[inverse.reshape(-1)]
+
+        # Group records by corrected product type. The sort is stable so IDs keep their file order.
+        order = np.argsort(record_codes, kind="stable")
+        bounds = np.searchsorted(record_codes[order], np.arange(len(corrected_types) + 1))
+
+        ids = np.ascontiguousarray(records[:, ID_OFFSET:width - 1]).view(f"S{width - ID_OFFSET - 1}").ravel()
+        if (records[:, ID_OFFSET:width - 1] <= ord(" ")).any():
+            ids = np.char.strip(ids)
+
+        # Subtypes are padded to 8 bytes so they can be deduplicated as integers
+        subtypes = np.zeros((record_count, 8), dtype=np.uint8)
+        subtypes[:, :6] = records[:, 4:ID_OFFSET]
+        subtypes = subtypes.view("<u8").ravel()
+
+        # Product types are added in order of first appearance, the same order TextLoader adds them in
+        groups = []
+        for product_type, code in corrected_types.items():
+            matched = order[bounds[code]:bounds[code + 1]]
+            groups.append((first_seen[corrected_codes == code].min(), product_type, matched))
+        groups.sort(key=lambda group: group[0])
+
+        for _, product_type, matched in groups:
+            purchase_info.product_type_history[product_type].extend(ids[matched].astype(str).tolist())
+            unique_subtypes = np.fromiter(set(subtypes[matched].tolist()), dtype="<u8").view("S8")
+            purchase_info.subtype_lookup[product_type].update(unique_subtypes.astype(str).tolist())
+
+    def _as_records(self, body: bytes) -> Optional["np.ndarray"]:
+        """Views the product lines as fixed-width records without copying them.
+
+        Args:
+            body (bytes): The contents of the file after the header line.
+
+        Returns:
+            Optional[np.ndarray]: A 2D uint8 array with one product line per row, or None if the lines do not
+                all have the same layout.
+        """
+        if not body:
+            return np.empty((0, ID_OFFSET + 2), dtype=np.uint8)
+        if not body.isascii() or b"\r" in body:
+            return None
+        if not body.endswith(b"\n"):
+            body += b"\n"
+
+        width = body.index(b"\n") + 1
+        if width <= ID_OFFSET + 1 or len(body) % width or body.count(b"\n") != len(body) // width:
+            return None
+
+        records = np.frombuffer(body, dtype=np.uint8).reshape(-1, width)
+        if not (records[:, -1] == ord("\n")).all():
+            return None
+        return records
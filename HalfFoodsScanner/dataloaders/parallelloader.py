@@ -0,0 +1,136 @@
+import io
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Optional
+
+from HalfFoodsScanner.dataloaders.helpers import FILE_ENCODING, parse_header
+from HalfFoodsScanner.dataloaders.textloader import TextLoader
+from HalfFoodsScanner.classes.compactpurchaseinfo import CompactPurchaseInfo
+from HalfFoodsScanner.classes.purchaseinfo import PurchaseInfo
+
+# Ranges smaller than this are not worth the cost of a worker process
+MIN_RANGE_BYTES = 4 * 1024 * 1024
+
+# Bytes read and decoded at a time inside a range, so a worker's memory stays bounded
+CHUNK_BYTES = 1024 * 1024
+
+
+class ParallelTextLoader(TextLoader):
+    """Loads and parses one large text file using several processes.
+
+    The product lines after the header are split into byte ranges that start and end on line boundaries,
+    each range is parsed in a worker process, and the partial results are merged in file order. Merging in
+    file order keeps the IDs of each product type, and the order product types first appear in, the same as
+    parsing the file from start to end with TextLoader.
+    """
+
+    def __init__(self, workers: Optional[int] = None, min_range_bytes: int = MIN_RANGE_BYTES, compact: bool = False):
+        """
+        Args:
+            workers (Optional[int]): The number of worker processes. Defaults to the number of CPUs.
+            min_range_bytes (int): The smallest byte range given to a worker. Files too small to split are parsed
+                in the current process.
+            compact (bool): Store the purchase information in a CompactPurchaseInfo, for very large files.
+        """
+        super().__init__(compact)
+        self.workers = workers or os.cpu_count() or 1
+        self.min_range_bytes = min_range_bytes
+
+    def load_data(self, product_key: dict[str, str], data_path: str) -> PurchaseInfo:
+        """Loads data from a text file and returns the customer's purchase information. Also performs error checking.
+
+        Args:
+            product_key (dict[str, str]): A key containing all product types and a description of each.
+            data_path (str): A path to the text file.
+
+        Returns:
+            PurchaseInfo: All data needed to print the customer's information.
+        """
+        with open(data_path, "rb") as f:
+            first_line = f.readline()
+            header_end = f.tell()
+            size = os.fstat(f.fileno()).st_size
+            bounds = self.split_ranges(f, header_end, size)
+
+        purchase_date, customer_name = parse_header(first_line.decode(FILE_ENCODING))
+        if self.compact:
+            purchase_info = CompactPurchaseInfo(customer_name, purchase_date)
+        else:
+            purchase_info = PurchaseInfo(customer_name, purchase_date, 0, defaultdict(list), defaultdict(set))
+
+        starts, ends = bounds[:-1], bounds[1:]
+        if len(starts) <= 1:
+            partials = [parse_range(product_key, data_path, start, end) for start, end in zip(starts, ends)]
+            self._merge(purchase_info, partials)
+        else:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(starts))) as executor:
+                # map returns the partial results in range order, which keeps the merge deterministic
+                partials = executor.map(parse_range, repeat(product_key), repeat(data_path), starts, ends)
+                self._merge(purchase_info, partials)
+        return purchase_info
+
+    def split_ranges(self, f: io.BufferedReader, start: int, size: int) -> list[int]:
+        """Splits the product lines into byte ranges that each start at the beginning of a line.
+
+        Args:
+            f (io.BufferedReader): The file, opened in binary mode.
+            start (int): The offset of the first product line.
+            size (int): The size of the file.
+
+        Returns:
+            list[int]: The range boundaries in increasing order, from start to size.
+        """
+        range_count = max(1, min(self.workers, (size - start) // self.min_range_bytes))
+        bounds = [start]
+        for i in range(1, range_count):
+            f.seek(start + (size - start) * i // range_count)
+            # Move the boundary forward to the start of the next line
+            f.readline()
+            boundary = f.tell()
+            if bounds[-1] < boundary < size:
+                bounds.append(boundary)
+        bounds.append(size)
+        return bounds
+
+    def _merge(self, purchase_info: PurchaseInfo, partials) -> None:
+        product_type_history = purchase_info.product_type_history
+        subtype_lookup = purchase_info.subtype_lookup
+        for quantity, partial_history, partial_subtypes in partials:
+            purchase_info.quantity += quantity
+            for product_type, id_list in partial_history.items():
+                product_type_history[product_type].extend(id_list)
+            for product_type, subtypes in partial_subtypes.items():
+                subtype_lookup[product_type].update(subtypes)
+
+
+def parse_range(product_key: dict[str, str], data_path: str, start: int,
+                end: int) -> tuple[int, dict[str, list[str]], dict[str, set[str]]]:
+    """Parses the product lines in one byte range of a file. Runs in a worker process.
+
+    Args:
+        product_key (dict[str, str]): A key containing all product types and a description of each.
+        data_path (str): A path to the text file.
+        start (int): The offset of the first line in the range.
+        end (int): The offset just past the last line in the range.
+
+    Returns:
+        tuple[int, dict[str, list[str]], dict[str, set[str]]]: The quantity, product type history and subtype
+            lookup of the range.
+    """
+    partial = PurchaseInfo(None, None, 0, defaultdict(list), defaultdict(set))
+    loader = TextLoader()
+    with open(data_path, "rb") as f:
+        f.seek(start)
+        position = start
+        while position < end:
+            chunk = f.read(min(CHUNK_BYTES, end - position))
+            if not chunk:
+                break
+            # Finish the last line of the chunk, boundaries are always at the start of a line
+            if not chunk.endswith(b"\n") and position + len(chunk) < end:
+                chunk += f.readline()
+            position += len(chunk)
+            loader.parse_products(product_key, io.StringIO(chunk.decode(FILE_ENCODING), newline=None), partial)
+    return partial.quantity, dict(partial.product_type_history), dict(partial.subtype_lookup)
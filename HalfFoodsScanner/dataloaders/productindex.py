@@ -0,0 +1,136 @@
+from functools import lru_cache
+from itertools import combinations
+from typing import Optional
+
+# Number of characters error_checker allows to differ between a product type and a product key entry
+MAX_ERRORS = 2
+
+# Upper bound on remembered corrections so a stream of random corruption cannot grow the memo forever
+MEMO_LIMIT = 1 << 16
+
+
+class ProductKeyIndex:
+    """A precomputed lookup for correcting corrupted product types against a product key.
+
+    Every product key entry is stored once under each of its wildcard patterns, where a pattern
+    replaces MAX_ERRORS positions with a wildcard. A code is within MAX_ERRORS characters of an entry
+    exactly when they share a pattern, so a lookup only checks a fixed number of patterns instead of
+    comparing against every entry. When several entries match, the one listed first in the product key
+    wins, the same as scanning the product key in order with error_checker.
+    """
+
+    def __init__(self, product_keys: tuple[str, ...],
+                 patterns: Optional[dict[tuple[Optional[str], ...], list[int]]] = None):
+        """
+        Args:
+            product_keys (tuple[str, ...]): The product types in product key order.
+            patterns (Optional[dict[tuple[Optional[str], ...], list[int]]]): The patterns of an index built
+                earlier for the same product types, such as one read from a compiled catalog, so they are not
+                computed again.
+        """
+        self.product_keys = product_keys
+        self._patterns: dict[tuple[Optional[str], ...], list[int]] = {}
+        self._memo: dict[str, Optional[str]] = {}
+        self._candidate_memo: dict[str, tuple[str, ...]] = {}
+        # Number of corrections not answered from the memo, for LoaderStats
+        self.misses = 0
+
+        if patterns is not None:
+            self._patterns = patterns
+            return
+        for order, product_key_id in enumerate(product_keys):
+            for pattern in _patterns(product_key_id):
+                # Entries are added in product key order, so the first entry of each pattern wins ties
+                self._patterns.setdefault(pattern, []).append(order)
+
+    def correct(self, product_type: str) -> Optional[str]:
+        """Returns the product key entry a corrupted product type should be corrected to.
+
+        Args:
+            product_type (str): The product type read from the file.
+
+        Returns:
+            Optional[str]: The first matching product key entry, or None if no entry is close enough.
+        """
+        try:
+            return self._memo[product_type]
+        except KeyError:
+            pass
+
+        self.misses += 1
+        patterns = self._patterns
+        best = None
+        for pattern in _patterns(product_type):
+            orders = patterns.get(pattern)
+            if orders is not None and (best is None or orders[0] < best):
+                best = orders[0]
+        corrected = None if best is None else self.product_keys[best]
+
+        if len(self._memo) >= MEMO_LIMIT:
+            self._memo.clear()
+        self._memo[product_type] = corrected
+        return corrected
+
+    def candidates(self, product_type: str) -> tuple[str, ...]:
+        """Returns every product key entry within MAX_ERRORS characters of a corrupted product type.
+
+        Args:
+            product_type (str): The product type read from the file.
+
+        Returns:
+            tuple[str, ...]: The matching product key entries in product key order, empty if none is close enough.
+        """
+        try:
+            return self._candidate_memo[product_type]
+        except KeyError:
+            pass
+
+        self.misses += 1
+        patterns = self._patterns
+        orders = set()
+        for pattern in _patterns(product_type):
+            orders.update(patterns.get(pattern, ()))
+        candidates = tuple(self.product_keys[order] for order in sorted(orders))
+
+        if len(self._candidate_memo) >= MEMO_LIMIT:
+            self._candidate_memo.clear()
+        self._candidate_memo[product_type] = candidates
+        return candidates
+
+
+def _patterns(code: str) -> list[tuple[Optional[str], ...]]:
+    """Returns every pattern of the code with MAX_ERRORS positions replaced by a wildcard.
+
+    The length of the code is kept in each pattern through the tuple length, so codes of different
+    lengths never match.
+    """
+    wildcard_count = min(MAX_ERRORS, len(code))
+    patterns = []
+    for positions in combinations(range(len(code)), wildcard_count):
+        pattern = list(code)
+        for position in positions:
+            pattern[position] = None
+        patterns.append(tuple(pattern))
+    return patterns
+
+
+@lru_cache(maxsize=8)
+def _build_index(product_keys: tuple[str, ...]) -> ProductKeyIndex:
+    return ProductKeyIndex(product_keys)
+
+
+def get_product_key_index(product_key: dict[str, str]) -> ProductKeyIndex:
+    """Returns the index for a product key, building it only when the product types have changed.
+
+    Args:
+        product_key (dict[str, str]): A key containing all product types and a description of each.
+
+    Returns:
+        ProductKeyIndex: The index for the product types currently in the key.
+    """
+    # A ProductCatalog carries the index compiled when it was loaded
+    compiled = getattr(product_key, "product_key_index", None)
+    if compiled is not None:
+        return compiled
+    product_keys = tuple(product_key)
+    return _build_index(product_keys)
@@ -0,0 +1,254 @@
+import bz2
+import gzip
+import io
+import lzma
+import os
+import warnings
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import BinaryIO, Callable, Optional
+
+from HalfFoodsScanner.dataloaders.columnarloader import ColumnarLoader
+from HalfFoodsScanner.dataloaders.dataloader import DataLoader
+from HalfFoodsScanner.dataloaders.helpers import FILE_ENCODING
+from HalfFoodsScanner.dataloaders.textloader import TextLoader
+from HalfFoodsScanner.classes.purchaseinfo import PurchaseInfo
+from HalfFoodsScanner.storage import columnar
+
+# Entry point group searched for loader plugins. Each entry point names a callable that takes a LoaderRegistry
+# and registers its formats on it, for example in a plugin's setup.py:
+#   entry_points={"HalfFoodsScanner.loaders": ["json = halffoods_json:register"]}
+ENTRY_POINT_GROUP = "HalfFoodsScanner.loaders"
+
+# Number of leading bytes read to recognise a file, enough for every registered magic
+SNIFF_BYTES = 16
+
+
+@dataclass(frozen=True)
+class Compression:
+    """A compression format that is decompressed while the file is read.
+
+    name: Name of the compression format.
+    magic: Bytes every compressed file starts with.
+    extension: Extension of compressed files, removed before the inner format is matched by extension.
+    open: Opens a compressed file as a binary stream of the decompressed bytes.
+    """
+
+    name: str
+    magic: bytes
+    extension: str
+    open: Callable[[str], BinaryIO]
+
+
+COMPRESSIONS = (
+    Compression("gzip", b"\x1f\x8b", ".gz", gzip.open),
+    Compression("bz2", b"BZh", ".bz2", bz2.open),
+    Compression("xz", b"\xfd7zXZ\x00", ".xz", lzma.open),
+)
+
+
+@dataclass(frozen=True)
+class LoaderFormat:
+    """A file format and the loader that reads it.
+
+    name: Name of the format, unique within a registry.
+    factory: Creates the loader. Called once per registry, the first time a file of the format is loaded.
+    extensions: Lower-case file extensions of the format, such as ".txt".
+    magic: Byte strings a file of the format may start with. Matched before extensions.
+    streaming: Whether the loader has a load_stream(product_key, f, name) method that reads an open text stream,
+        which is needed to read the format from compressed files.
+    """
+
+    name: str
+    factory: Callable[[], DataLoader]
+    extensions: tuple[str, ...] = ()
+    magic: tuple[bytes, ...] = ()
+    streaming: bool = False
+
+
+class LoaderRegistry(DataLoader):
+    """Picks the loader for each file from its contents and name, and decompresses gzip, bz2 and xz files while
+    they are read.
+
+    A file's format is recognised by the magic bytes it starts with, then by its extension, falling back to the
+    default format. Compressed files are recognised by their magic bytes, then their decompressed contents and
+    their name without the compression extension are matched the same way. The decompressed bytes are decoded
+    and parsed a buffered chunk at a time, so a compressed file is never inflated to disk or into memory as a
+    whole.
+    """
+
+    def __init__(self, default: str = "text"):
+        """
+        Args:
+            default (str): Name of the format used for files that match no magic bytes or extension.
+        """
+        self.default = default
+        self._formats: dict[str, LoaderFormat] = {}
+        self._loaders: dict[str, DataLoader] = {}
+
+    def register(self, name: str, factory: Callable[[], DataLoader], extensions: tuple[str, ...] = (),
+                 magic: tuple[bytes, ...] = (), streaming: bool = False) -> LoaderFormat:
+        """Registers a file format.
+
+        Args:
+            name (str): Name of the format, unique within the registry.
+            factory (Callable[[], DataLoader]): Creates the loader, such as the loader class.
+            extensions (tuple[str, ...]): File extensions of the format, such as ".txt".
+            magic (tuple[bytes, ...]): Byte strings a file of the format may start with, at most SNIFF_BYTES long.
+            streaming (bool): Whether the loader has a load_stream method and can read compressed files.
+
+        Returns:
+            LoaderFormat: The registered format.
+
+        Raises:
+            ValueError: When a format with the same name is already registered, or a magic is too long.
+        """
+        if name in self._formats:
+            raise ValueError(f"A loader for the {name!r} format is already registered")
+        if any(len(prefix) > SNIFF_BYTES for prefix in magic):
+            raise ValueError(f"Magic bytes of the {name!r} format are longer than {SNIFF_BYTES} bytes")
+        loader_format = LoaderFormat(name, factory, tuple(extension.lower() for extension in extensions),
+                                     tuple(magic), streaming)
+        self._formats[name] = loader_format
+        return loader_format
+
+    @property
+    def formats(self) -> list[LoaderFormat]:
+        """The registered formats, in registration order."""
+        return list(self._formats.values())
+
+    def load_entry_points(self, group: str = ENTRY_POINT_GROUP) -> None:
+        """Registers the formats of every installed plugin. A plugin that fails to load is skipped with a warning,
+        so one broken plugin does not stop the built-in formats from loading.
+
+        Args:
+            group (str): The entry point group to search.
+        """
+        # Slow to import, and only needed once per registry
+        from importlib.metadata import entry_points
+
+        for entry_point in entry_points(group=group):
+            try:
+                entry_point.load()(self)
+            except Exception as e:
+                warnings.warn(f"Could not load the {entry_point.name!r} loader plugin: {e}")
+
+    def describe(self) -> Optional[tuple]:
+        """Describes every registered format and the settings of its loader, creating the loaders if needed.
+
+        Returns:
+            Optional[tuple]: The formats, or None if any loader cannot describe itself.
+        """
+        formats = []
+        for loader_format in self._formats.values():
+            loader = self.get_loader(loader_format)
+            description = loader.describe() if isinstance(loader, DataLoader) else None
+            if description is None:
+                return None
+            formats.append((loader_format.name, loader_format.extensions, loader_format.magic, description))
+        return super().describe() + (self.default, tuple(formats))
+
+    def detect(self, data_path: str) -> tuple[Optional[Compression], LoaderFormat]:
+        """Recognises the compression and format of a file from its first bytes and its name.
+
+        Args:
+            data_path (str): A path to the file.
+
+        Returns:
+            tuple[Optional[Compression], LoaderFormat]: The compression, or None if the file is not compressed,
+                and the format of the (decompressed) contents.
+
+        Raises:
+            ValueError: When no format matches and the default format is not registered.
+        """
+        with open(data_path, "rb") as f:
+            head = f.read(SNIFF_BYTES)
+
+        compression = next((c for c in COMPRESSIONS if head.startswith(c.magic)), None)
+        name = os.path.basename(data_path).lower()
+        if compression is not None:
+            name = name.removesuffix(compression.extension)
+            # Only the first block is decompressed to sniff the contents
+            with compression.open(data_path) as f:
+                head = f.read(SNIFF_BYTES)
+
+        return compression, self._match(head, name)
+
+    def _match(self, head: bytes, name: str) -> LoaderFormat:
+        for loader_format in self._formats.values():
+            if any(head.startswith(prefix) for prefix in loader_format.magic):
+                return loader_format
+        for loader_format in self._formats.values():
+            if name.endswith(loader_format.extensions):
+                return loader_format
+        if self.default not in self._formats:
+            raise ValueError(f"No loader is registered for {name}")
+        return self._formats[self.default]
+
+    def get_loader(self, loader_format: LoaderFormat) -> DataLoader:
+        """Returns the loader of a format, creating it on first use."""
+        loader = self._loaders.get(loader_format.name)
+        if loader is None:
+            loader = self._loaders[loader_format.name] = loader_format.factory()
+        return loader
+
+    def with_loader(self, name: str, loader: DataLoader) -> "LoaderRegistry":
+        """Returns a copy of the registry that loads one format with the given loader, such as a loader that
+        records LoaderStats. The formats and the other loaders are shared with this registry.
+
+        Args:
+            name (str): Name of the format.
+            loader (DataLoader): The loader to use for that format.
+
+        Returns:
+            LoaderRegistry: The copy.
+
+        Raises:
+            ValueError: When no format of that name is registered.
+        """
+        if name not in self._formats:
+            raise ValueError(f"No loader is registered for {name}")
+        registry = LoaderRegistry(self.default)
+        registry._formats = self._formats
+        registry._loaders = {**self._loaders, name: loader}
+        return registry
+
+    def load_data(self, product_key: dict[str, str], data_path: str) -> PurchaseInfo:
+        """Loads a file with the loader of its format, decompressing it while it is read.
+
+        Args:
+            product_key (dict[str, str]): A key containing all product types and a description of each.
+            data_path (str): A path to the file.
+
+        Returns:
+            PurchaseInfo: All data needed to print the customer's information.
+
+        Raises:
+            ValueError: When the file is compressed and its format cannot be read from a stream.
+        """
+        compression, loader_format = self.detect(data_path)
+        loader = self.get_loader(loader_format)
+        if compression is None:
+            return loader.load_data(product_key, data_path)
+
+        if not loader_format.streaming:
+            raise ValueError(f"{data_path}: {loader_format.name} files cannot be read {compression.name}-compressed")
+        # Decoded the same way open() decodes an uncompressed file in text mode
+        with compression.open(data_path) as raw, io.TextIOWrapper(raw, encoding=FILE_ENCODING) as f:
+            return loader.load_stream(product_key, f, data_path)
+
+
+def register_builtin_loaders(registry: LoaderRegistry) -> None:
+    """Registers the formats that ship with the scanner: text customer files and binary columnar files."""
+    registry.register("text", TextLoader, extensions=(".txt",), streaming=True)
+    # Columnar files are memory-mapped, so they cannot be read from a decompressing stream
+    registry.register("columnar", ColumnarLoader, extensions=(".hfcol",), magic=(columnar.MAGIC,))
+
+
+@lru_cache(maxsize=None)
+def default_registry() -> LoaderRegistry:
+    """Returns the shared registry of the built-in formats and every installed plugin, created on first use."""
+    registry = LoaderRegistry()
+    register_builtin_loaders(registry)
+    registry.load_entry_points()
+    return registry
@@ -0,0 +1,190 @@
+import io
+import os
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Callable, Iterator, Optional
+
+from HalfFoodsScanner.dataloaders.helpers import FILE_ENCODING, parse_header
+from HalfFoodsScanner.dataloaders.textloader import TextLoader
+from HalfFoodsScanner.classes.compactpurchaseinfo import CompactPurchaseInfo
+from HalfFoodsScanner.classes.purchaseinfo import PurchaseInfo
+
+# Bytes read from the file at a time, so an update never holds more than a chunk and one line of appended data
+CHUNK_BYTES = 1024 * 1024
+
+
+class TailLoader(TextLoader):
+    """Loads a text file that is still being written and picks up product lines as they are appended.
+
+    The loader remembers the byte offset of the end of the last complete line it parsed. Each update only
+    reads from that offset, a chunk at a time, so its cost depends on the appended bytes rather than the size
+    of the file, and its memory on the chunk size.
+    New lines are added to the same PurchaseInfo in place.
+
+    A final line without a newline may still be in the middle of being written, so update leaves it until its
+    newline arrives. load_data, update(final=True) and follow, once the file has stopped growing for an interval,
+    also parse it, as files are often finished without a newline. Its offset is kept, so if the file grows again
+    the item is taken back out and the line is parsed again with the rest of it.
+    """
+
+    def __init__(self, compact: bool = False):
+        """
+        Args:
+            compact (bool): Store the purchase information in a CompactPurchaseInfo, for very large files.
+        """
+        super().__init__(compact)
+        self.product_key: Optional[dict[str, str]] = None
+        self.data_path: Optional[str] = None
+        self.purchase_info: Optional[PurchaseInfo] = None
+        self.offset = 0
+        # The item parsed from a final line without a newline, and the size of the file when it was parsed
+        self._trailing: Optional[tuple[Optional[str], str, bool, bool]] = None
+        self._trailing_size = 0
+
+    def load_data(self, product_key: dict[str, str], data_path: str) -> PurchaseInfo:
+        """Loads every complete line of a text file and starts tracking it for updates.
+
+        Args:
+            product_key (dict[str, str]): A key containing all product types and a description of each.
+            data_path (str): A path to the text file.
+
+        Returns:
+            PurchaseInfo: All data needed to print the customer's information, updated in place by update().
+        """
+        purchase_date, customer_name, header_end = self._read_header(data_path)
+        if self.compact:
+            purchase_info = CompactPurchaseInfo(customer_name, purchase_date)
+        else:
+            purchase_info = PurchaseInfo(customer_name, purchase_date, 0, defaultdict(list), defaultdict(set))
+
+        self.product_key = product_key
+        self.data_path = data_path
+        self.purchase_info = purchase_info
+        self.offset = header_end
+        self._trailing = None
+        self.update(final=True)
+        return purchase_info
+
+    def describe(self) -> Optional[tuple]:
+        """Returns None, as the loader tracks the file it loaded for update, which a cached result would skip."""
+        return None
+
+    def update(self, final: bool = False) -> int:
+        """Parses the lines appended since the last update into the tracked PurchaseInfo.
+
+        If the file has shrunk, it is assumed to have been replaced, and the PurchaseInfo is cleared and
+        loaded again from the start of the file.
+
+        Args:
+            final (bool): Also parse a final line that has no newline yet. It is parsed again if the file grows.
+
+        Returns:
+            int: The number of product lines parsed.
+        """
+        if self.purchase_info is None:
+            raise RuntimeError("load_data must be called before update")
+
+        size = os.path.getsize(self.data_path)
+        if self._trailing is not None:
+            if size == self._trailing_size:
+                return 0
+            self._remove_trailing()
+        if size < self.offset:
+            self._restart()
+
+        quantity = self.purchase_info.quantity
+        with open(self.data_path, "rb") as f:
+            f.seek(self.offset)
+            # Only the bytes present when the update started are read, so a fast writer cannot keep it going
+            remaining = size - self.offset
+            partial = b""
+            while remaining > 0:
+                chunk = f.read(min(CHUNK_BYTES, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                data = partial + chunk
+                # A line cut by the end of the chunk is carried over to the next chunk
+                complete_length = data.rfind(b"\n") + 1
+                partial = data[complete_length:]
+                self._parse_bytes(data[:complete_length])
+            if final and partial.strip():
+                self._parse_trailing(partial.decode(FILE_ENCODING), size)
+        return self.purchase_info.quantity - quantity
+
+    def _parse_bytes(self, data: bytes) -> None:
+        """Parses complete product lines and moves the offset past them."""
+        if not data:
+            return
+        lines = io.StringIO(data.decode(FILE_ENCODING), newline=None)
+        self.parse_products(self.product_key, lines, self.purchase_info)
+        self.offset += len(data)
+
+    def _parse_trailing(self, line: str, size: int) -> None:
+        """Adds the item of a final line without a newline, remembering what it added so it can be taken out."""
+        product_type, subtype, product_id = next(self.iter_products(self.product_key, [line]))
+        purchase_info = self.purchase_info
+        purchase_info.quantity += 1
+        new_type = new_subtype = False
+        if product_type is not None:
+            new_type = product_type not in purchase_info.product_type_history
+            purchase_info.product_type_history[product_type].append(product_id)
+            subtypes = purchase_info.subtype_lookup[product_type]
+            new_subtype = subtype not in subtypes
+            subtypes.add(subtype)
+        self._trailing = (product_type, subtype, new_type, new_subtype)
+        self._trailing_size = size
+
+    def _remove_trailing(self) -> None:
+        """Takes the item of the final line back out, before the line is parsed again."""
+        product_type, subtype, new_type, new_subtype = self._trailing
+        purchase_info = self.purchase_info
+        purchase_info.quantity -= 1
+        if new_type:
+            # Removed rather than emptied, so a product type purchased first on this line keeps its place
+            del purchase_info.product_type_history[product_type]
+            del purchase_info.subtype_lookup[product_type]
+        elif product_type is not None:
+            purchase_info.product_type_history[product_type].pop()
+            if new_subtype:
+                purchase_info.subtype_lookup[product_type].discard(subtype)
+        # The most common product type is cached by quantity, which the line parsed again may bring back
+        purchase_info._tracked_quantity = None
+        self._trailing = None
+
+    def follow(self, interval: float = 1.0, stop: Optional[Callable[[], bool]] = None) -> Iterator[PurchaseInfo]:
+        """Polls the file for appended lines and yields the PurchaseInfo each time it changes. Once the file has
+        not grown for a whole interval, a final line without a newline is taken as complete and parsed too.
+
+        Args:
+            interval (float): Seconds to wait between polls.
+            stop (Optional[Callable[[], bool]]): Stops following once this returns True. Follows forever if not given.
+
+        Yields:
+            PurchaseInfo: The tracked purchase information, after each update that added lines.
+        """
+        while stop is None or not stop():
+            size = os.path.getsize(self.data_path)
+            if self.update():
+                yield self.purchase_info
+                continue
+            time.sleep(interval)
+            if os.path.getsize(self.data_path) == size and self.update(final=True):
+                yield self.purchase_info
+
+    def _read_header(self, data_path: str) -> tuple[datetime, str, int]:
+        with open(data_path, "rb") as f:
+            first_line = f.readline()
+            header_end = f.tell()
+        purchase_date, customer_name = parse_header(first_line.decode(FILE_ENCODING))
+        return purchase_date, customer_name, header_end
+
+    def _restart(self) -> None:
+        """Clears the tracked PurchaseInfo in place and rewinds to the first product line."""
+        purchase_date, customer_name, header_end = self._read_header(self.data_path)
+        self.purchase_info.customer_name = customer_name
+        self.purchase_info.purchase_date = purchase_date
+        self.purchase_info.clear()
+        self.offset = header_end
+        self._trailing = None
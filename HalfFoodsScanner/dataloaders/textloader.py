@@ -1,14 +1,45 @@
+import time
 from collections import defaultdict
-from datetime import datetime
+from typing import Iterable, Iterator, Optional, TextIO
 
+from HalfFoodsScanner.dataloaders.correction import CorrectionEngine, classify_products
 from HalfFoodsScanner.dataloaders.dataloader import DataLoader
-from HalfFoodsScanner.dataloaders.helpers import error_checker
+from HalfFoodsScanner.dataloaders.helpers import parse_header
+from HalfFoodsScanner.dataloaders.instrumentation import LoaderStats
+from HalfFoodsScanner.dataloaders.productindex import get_product_key_index
+from HalfFoodsScanner.classes.compactpurchaseinfo import CompactPurchaseInfo
 from HalfFoodsScanner.classes.purchaseinfo import PurchaseInfo
 
 class TextLoader(DataLoader):
     """Loads and parses a text file and returns the customer's purchasing information.
     """
 
+    def __init__(self, compact: bool = False, corrections: Optional[CorrectionEngine] = None,
+                 stats: Optional[LoaderStats] = None):
+        """
+        Args:
+            compact (bool): Store the purchase information in a CompactPurchaseInfo, for very large files.
+            corrections (Optional[CorrectionEngine]): Resolve corrupted product types that are close to several
+                product types by likelihood, instead of taking the first in the product key. Not supported in
+                compact mode, whose ID lists cannot have IDs inserted.
+            stats (Optional[LoaderStats]): Record timings and counters of every load in this object.
+
+        Raises:
+            ValueError: When both compact and corrections are given.
+        """
+        if compact and corrections is not None:
+            raise ValueError("A CorrectionEngine cannot be used in compact mode")
+        self.compact = compact
+        self.corrections = corrections
+        self.stats = stats
+
+    def describe(self) -> Optional[tuple]:
+        """Describes the loader and its correction settings. Compact mode and stats do not change the results."""
+        if self.corrections is None:
+            return super().describe() + (None,)
+        corrections = self.corrections.describe()
+        return None if corrections is None else super().describe() + (corrections,)
+
     def load_data(self, product_key: dict[str, str], data_path: str) -> PurchaseInfo:
         """Loads data from a text file and returns the customer's purchase information. Also performs error checking.
 
@@ -17,41 +48,127 @@ class TextLoader(DataLoader):
             data_path (str): A path to the text file.
 
         Returns:
-            PurchaseInfo: All data needed to print the customer's information. 
+            PurchaseInfo: All data needed to print the customer's information. A CompactPurchaseInfo in compact mode.
         """
+        # Started before the file is opened, so the header time includes opening it
+        start = time.perf_counter()
         with open(data_path) as f:
+            if self.stats is not None:
+                return self._load_stream_instrumented(product_key, f, data_path, self.stats, start)
+            return self.load_stream(product_key, f, data_path)
+
+    def load_stream(self, product_key: dict[str, str], f: TextIO, name: str = "<stream>") -> PurchaseInfo:
+        """Loads data from an open text stream, such as a decompressing reader, and returns the customer's purchase
+        information. Also performs error checking.
+
+        Args:
+            product_key (dict[str, str]): A key containing all product types and a description of each.
+            f (TextIO): The text stream, positioned at the header line.
+            name (str): The name of the stream, recorded in the stats.
+
+        Returns:
+            PurchaseInfo: All data needed to print the customer's information. A CompactPurchaseInfo in compact mode.
+        """
+        if self.stats is not None:
+            return self._load_stream_instrumented(product_key, f, name, self.stats, time.perf_counter())
+
+        # Retrieve customer information from first line
+        purchase_date, customer_name = parse_header(f.readline())
+        if self.compact:
+            purchase_info = CompactPurchaseInfo(customer_name, purchase_date)
+        else:
+            purchase_info = PurchaseInfo(customer_name, purchase_date, 0, defaultdict(list), defaultdict(set))
+
+        # The stream is iterated lazily so only one buffered chunk of the file is held at a time
+        self.parse_products(product_key, f, purchase_info)
+        return purchase_info
+
+    def _load_stream_instrumented(self, product_key: dict[str, str], f: TextIO, name: str,
+                                  stats: LoaderStats, start: float) -> PurchaseInfo:
+        """load_stream, timing the header from start and the product lines separately."""
+        purchase_date, customer_name = parse_header(f.readline())
+        if self.compact:
+            purchase_info = CompactPurchaseInfo(customer_name, purchase_date)
+        else:
+            purchase_info = PurchaseInfo(customer_name, purchase_date, 0, defaultdict(list), defaultdict(set))
+        header_end = time.perf_counter()
+
+        self.parse_products(product_key, f, purchase_info)
+        parse_end = time.perf_counter()
+        # Decompressed bytes for a decompressing reader; streams without a binary buffer are not counted
+        buffer = getattr(f, "buffer", None)
+        bytes_read = buffer.tell() if buffer is not None else 0
+
+        stats.record_file(name, bytes_read, header_end - start, parse_end - header_end)
+        return purchase_info
+
+    def parse_products(self, product_key: dict[str, str], lines: Iterable[str], purchase_info: PurchaseInfo) -> None:
+        """Parses product lines one at a time and adds them to the purchase information. Also performs error checking.
+
+        Args:
+            product_key (dict[str, str]): A key containing all product types and a description of each.
+            lines (Iterable[str]): The product lines, such as an open file positioned after the header.
+            purchase_info (PurchaseInfo): The purchase information to update in place, which may also be a
+                CompactPurchaseInfo.
+        """
+        product_key_index = get_product_key_index(product_key)
+        misses = product_key_index.misses
+
+        if self.corrections is not None:
+            quantity = purchase_info.quantity
+            correction_stats = self.corrections.parse_products(product_key, lines, purchase_info)
+            if self.stats is not None:
+                self.stats.record_lines(purchase_info.quantity - quantity,
+                                        correction_stats.corrected + correction_stats.ambiguous,
+                                        correction_stats.dropped, product_key_index.misses - misses)
+            return
+
+        product_type_history = purchase_info.product_type_history
+        subtype_lookup = purchase_info.subtype_lookup
+
+        product_count = 0
+        dropped_count = 0
+        corrected_count = 0
+
+        # Retrieve Product Information per line
+        # Line format: [ProductType][Subtype][UniqueID]
+        # Product Type is 4 characters, Subtype is 6 characters, UniqueID is 20 characters.
+        for line in lines:
+            product_type = line[:4]
+            subtype = line[4:10]
+            product_id = line[10:].strip()
+            if product_type in product_key:
+                product_type_history[product_type].append(product_id)
+                subtype_lookup[product_type].add(subtype)
             
-            # Retrieve customer information from first line
-            # Line format: [MMDDYYYY][Name]
-            first_line = f.readline()
-            purchase_date = datetime.strptime(first_line[:8], "%m%d%Y")
-            customer_name = first_line[8:].strip()
-
-            product_type_history = defaultdict(list)
-            subtype_lookup = defaultdict(set) 
-
-            product_count = 0
-
-            # Retrieve Product Information per line
-            # Line format: [ProductType][Subtype][UniqueID]
-            # Product Type is 4 characters, Subtype is 6 characters, UniqueID is 20 characters.
-            for line in f.readlines():
-                product_type = line[:4]
-                subtype = line[4:10]
-                product_id = line[10:].strip()
-                if product_type in product_key:
-                    product_type_history[product_type].append(product_id)
-                    subtype_lookup[product_type].add(subtype)
-                
-                # For Question 3, if the product type is off by one character
+            # For Question 3, if the product type is off by one character
+            else:
+                corrected_product_type = product_key_index.correct(product_type)
+                if corrected_product_type is not None:
+                    product_type_history[corrected_product_type].append(product_id)
+                    subtype_lookup[corrected_product_type].add(subtype)
+                    corrected_count += 1
                 else:
-                    for product_key_id in product_key:
-                        if error_checker(product_type, product_key_id):
-                            corrected_product_type = product_key_id
-                            product_type_history[corrected_product_type].append(product_id)
-                            subtype_lookup[corrected_product_type].add(subtype)
-                            break
-                        
-                product_count += 1
-        
-        return PurchaseInfo(customer_name, purchase_date, product_count, product_type_history, subtype_lookup)
+                    dropped_count += 1
+
+            product_count += 1
+
+        purchase_info.quantity += product_count
+        if self.stats is not None:
+            self.stats.record_lines(product_count, corrected_count, dropped_count, product_key_index.misses - misses)
+
+    def iter_products(self, product_key: dict[str, str], lines: Iterable[str]) -> Iterator[tuple[Optional[str], str, str]]:
+        """Parses product lines one at a time and yields each item, for callers that need every item rather than
+        the summary in a PurchaseInfo. Corrects product types the same way as parse_products.
+
+        Args:
+            product_key (dict[str, str]): A key containing all product types and a description of each.
+            lines (Iterable[str]): The product lines, such as an open file positioned after the header.
+
+        Yields:
+            tuple[Optional[str], str, str]: The (corrected) product type, or None if it matches no product type,
+                the subtype and the unique ID of each line.
+        """
+        for _, candidates, subtype, product_id in classify_products(product_key, lines):
+            # The first candidate is the first close enough entry in product key order, as parse_products picks
+            yield (candidates[0] if candidates else None), subtype, product_id
@@ -0,0 +1,95 @@
+from functools import partial
+from itertools import islice
+from typing import Iterable, Iterator, Optional
+
+from HalfFoodsScanner.dataloaders.textloader import TextLoader
+from HalfFoodsScanner.classes.purchaseaggregate import PurchaseAggregate
+from HalfFoodsScanner.jobs.batch import map_unordered
+
+# Files loaded by a worker before it sends its partial aggregate back, so one aggregate is sent per chunk
+# rather than per file
+CHUNK_SIZE = 64
+
+
+def aggregate_chunk(product_key: dict[str, str], data_paths: list[str], approximate: bool = False) -> PurchaseAggregate:
+    """Loads a chunk of customer files and aggregates them. Runs in a worker process. Files that cannot be loaded
+    are counted in failed_files instead of stopping the chunk.
+
+    Args:
+        product_key (dict[str, str]): A key containing all product types and a description of each.
+        data_paths (list[str]): The paths to the customer files.
+        approximate (bool): Count distinct subtypes and IDs with sketches.
+
+    Returns:
+        PurchaseAggregate: The aggregate of the files in the chunk.
+    """
+    loader = TextLoader()
+    aggregate = PurchaseAggregate(approximate)
+    for data_path in data_paths:
+        try:
+            purchase_info = loader.load_data(product_key, data_path)
+        except Exception:
+            aggregate.failed_files += 1
+            continue
+        aggregate.add(purchase_info)
+    return aggregate
+
+
+def aggregate_files(product_key: dict[str, str], data_paths: Iterable[str], workers: Optional[int] = None,
+                    approximate: bool = False, chunk_size: int = CHUNK_SIZE) -> PurchaseAggregate:
+    """Aggregates many customer files across a pool of processes.
+
+    Each worker aggregates a chunk of files, and the partial aggregates are tree-reduced as they arrive: two
+    partials covering the same number of chunks are merged into one covering twice as many, like carrying in
+    binary addition. Only a logarithmic number of partials are held at once, and each merge combines aggregates
+    of similar size.
+
+    Args:
+        product_key (dict[str, str]): A key containing all product types and a description of each.
+        data_paths (Iterable[str]): The paths to the customer files. May be a lazy iterable over millions of files.
+        workers (Optional[int]): The number of worker processes. Defaults to the number of CPUs.
+        approximate (bool): Count distinct subtypes and IDs with sketches.
+        chunk_size (int): The number of files each worker aggregates before returning.
+
+    Returns:
+        PurchaseAggregate: The aggregate of every file.
+    """
+    partials = map_unordered(partial(aggregate_chunk, product_key, approximate=approximate),
+                             _chunks(data_paths, chunk_size), workers)
+    return tree_reduce(partials, PurchaseAggregate(approximate))
+
+
+def tree_reduce(aggregates: Iterable[PurchaseAggregate], empty: PurchaseAggregate) -> PurchaseAggregate:
+    """Merges aggregates pairwise as they arrive.
+
+    Args:
+        aggregates (Iterable[PurchaseAggregate]): The aggregates to merge.
+        empty (PurchaseAggregate): The result when there are no aggregates.
+
+    Returns:
+        PurchaseAggregate: The merge of every aggregate.
+    """
+    # levels[i] is a merge of 2**i aggregates, or None
+    levels: list[Optional[PurchaseAggregate]] = []
+    for aggregate in aggregates:
+        level = 0
+        while level < len(levels) and levels[level] is not None:
+            aggregate = levels[level].merge(aggregate)
+            levels[level] = None
+            level += 1
+        if level == len(levels):
+            levels.append(aggregate)
+        else:
+            levels[level] = aggregate
+
+    result = empty
+    for aggregate in levels:
+        if aggregate is not None:
+            result = result.merge(aggregate)
+    return result
+
+
+def _chunks(items: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
@@ -0,0 +1,137 @@
+import fnmatch
+import glob
+import os
+from functools import partial
+from typing import Callable, Iterable, Iterator, Optional
+
+from HalfFoodsScanner.dataloaders.instrumentation import LoaderStats
+from HalfFoodsScanner.dataloaders.textloader import TextLoader
+from HalfFoodsScanner.classes.purchaseinfo import PurchaseInfo
+
+# Number of files queued per worker, so huge directories are not submitted to the pool all at once
+QUEUE_DEPTH = 4
+
+
+def find_customer_files(target: str, pattern: str = "*.txt") -> list[str]:
+    """Finds the customer files to scan.
+
+    Args:
+        target (str): A directory, whose files matching pattern are scanned, or a glob pattern.
+        pattern (str): Glob pattern the names of the files in a directory must match.
+
+    Returns:
+        list[str]: The paths to the customer files, in sorted order.
+    """
+    if os.path.isdir(target):
+        paths = (os.path.join(target, name) for name in os.listdir(target) if fnmatch.fnmatch(name, pattern))
+    else:
+        paths = glob.iglob(target, recursive=True)
+    return sorted(path for path in paths if os.path.isfile(path))
+
+
+def scan_file(product_key: dict[str, str], data_path: str, instrument: bool = False) -> dict:
+    """Loads a single customer file with the loader of its format and summarises it. Errors are reported in the
+    summary instead of raised so that one malformed file does not stop a batch.
+
+    Args:
+        product_key (dict[str, str]): A key containing all product types and a description of each.
+        data_path (str): A path to the customer file.
+        instrument (bool): Add the text loader's LoaderStats for the file to the summary, under "stats". Files
+            of other formats have empty stats.
+
+    Returns:
+        dict: The summary of the file, or the path and error if the file could not be loaded.
+    """
+    # Imported here, since aggregate, repair and follow use this module without the other formats
+    from HalfFoodsScanner.dataloaders.registry import default_registry
+
+    try:
+        stats = LoaderStats() if instrument else None
+        loader = default_registry()
+        if stats is not None:
+            loader = loader.with_loader("text", TextLoader(stats=stats))
+        purchase_info = loader.load_data(product_key, data_path)
+        summary = summarize(product_key, data_path, purchase_info)
+        if stats is not None:
+            summary["stats"] = stats.as_dict()
+            del summary["stats"]["slowest_files"]
+        return summary
+    except Exception as e:
+        return {"path": data_path, "error": f"{type(e).__name__}: {e}"}
+
+
+def summarize(product_key: dict[str, str], data_path: str, purchase_info: PurchaseInfo) -> dict:
+    """Summarises a customer's purchase information.
+
+    Args:
+        product_key (dict[str, str]): A key containing all product types and a description of each.
+        data_path (str): The path the purchase information was loaded from.
+        purchase_info (PurchaseInfo): The purchase information to summarise.
+
+    Returns:
+        dict: The customer, date, quantity, item count per product type and the most common product type.
+    """
+    most_common = purchase_info.most_common_description(product_key)
+    return {
+        "path": data_path,
+        "customer_name": purchase_info.customer_name,
+        "purchase_date": purchase_info.purchase_date.date().isoformat(),
+        "quantity": purchase_info.quantity,
+        "product_types": {
+            product_type: len(id_list)
+            for product_type, id_list in purchase_info.product_type_history.items()
+        },
+        "most_common": most_common,
+    }
+
+
+def scan_files(product_key: dict[str, str], data_paths: Iterable[str],
+               workers: Optional[int] = None, instrument: bool = False) -> Iterator[dict]:
+    """Scans customer files across a pool of processes and yields each summary as soon as it is ready.
+
+    Args:
+        product_key (dict[str, str]): A key containing all product types and a description of each.
+        data_paths (Iterable[str]): The paths to the customer files.
+        workers (Optional[int]): The number of worker processes. Defaults to the number of CPUs.
+        instrument (bool): Add the loader's stats for each file to its summary.
+
+    Yields:
+        dict: The summary of each file from scan_file, in completion order.
+    """
+    return map_unordered(partial(scan_file, product_key, instrument=instrument), data_paths, workers)
+
+
+def map_unordered(function: Callable, items: Iterable, workers: Optional[int] = None) -> Iterator:
+    """Calls a function on each item across a pool of processes and yields the results in completion order.
+
+    Only a few items per worker are queued at a time, so very long iterables are not submitted all at once.
+    With a single worker the calls run in the current process, which skips the cost of a pool and lets
+    profilers see the work.
+
+    Args:
+        function (Callable): A picklable function taking one item.
+        items (Iterable): The items.
+        workers (Optional[int]): The number of worker processes. Defaults to the number of CPUs.
+
+    Yields:
+        The result of each call, in completion order.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        yield from map(function, items)
+        return
+
+    # Imported only when a pool is used, since it pulls in most of multiprocessing
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+
+    max_pending = workers * QUEUE_DEPTH
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for item in items:
+            pending.add(executor.submit(function, item))
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        for future in as_completed(pending):
+            yield future.result()
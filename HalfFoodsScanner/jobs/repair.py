@@ -0,0 +1,181 @@
+import fnmatch
+import json
+import os
+import shutil
+import tempfile
+from functools import partial
+from typing import Iterable, Iterator, Optional
+
+from HalfFoodsScanner.dataloaders.productindex import get_product_key_index
+from HalfFoodsScanner.jobs.batch import map_unordered
+
+# Suffix of the temporary files corrected files are written to before replacing the original
+TEMP_SUFFIX = ".repair.tmp"
+
+
+def iter_customer_files(root: str, pattern: str = "*.txt") -> Iterator[str]:
+    """Walks a directory tree and yields the customer files in it, without listing the whole tree up front.
+
+    Args:
+        root (str): The top of the directory tree.
+        pattern (str): Glob pattern the file names must match.
+
+    Yields:
+        str: The path to each customer file, in sorted order within each directory.
+    """
+    for dir_path, dir_names, file_names in os.walk(root):
+        dir_names.sort()
+        for file_name in sorted(file_names):
+            if fnmatch.fnmatch(file_name, pattern) and not file_name.endswith(TEMP_SUFFIX):
+                yield os.path.join(dir_path, file_name)
+
+
+def repair_file(product_key: dict[str, str], data_path: str, dry_run: bool = False) -> dict:
+    """Finds corrupted product types in a customer file and writes the corrected file in its place.
+
+    Product types are corrected the same way the loaders correct them. Each line is written to a temporary file
+    next to the original as it is read, so only one line is held in memory. Once the whole file is read, the
+    temporary file is moved over the original if any line was corrected, and removed otherwise, so the original is
+    never left half written. Line endings and every other character are kept as they are.
+
+    Args:
+        product_key (dict[str, str]): A key containing all product types and a description of each.
+        data_path (str): A path to the customer file.
+        dry_run (bool): Only report the corrections, without writing a temporary file or changing the file.
+
+    Returns:
+        dict: The path, the number of product lines, the corrected lines (line number, old and new product type)
+            and the lines whose product type matches nothing. Has an error instead if the file could not be read
+            or written.
+    """
+    product_key_index = get_product_key_index(product_key)
+    corrected = []
+    unresolved = []
+    line_count = 0
+    temp_path = None
+    try:
+        with open(data_path, newline="") as f:
+            if dry_run:
+                target = open(os.devnull, "w", newline="")
+            else:
+                directory, file_name = os.path.split(os.path.abspath(data_path))
+                fd, temp_path = tempfile.mkstemp(dir=directory, prefix=file_name + ".", suffix=TEMP_SUFFIX)
+                target = os.fdopen(fd, "w", newline="")
+            with target:
+                target.write(f.readline())
+                for line_number, line in enumerate(f, start=2):
+                    line_count += 1
+                    product_type = line[:4]
+                    if product_type not in product_key:
+                        corrected_product_type = product_key_index.correct(product_type)
+                        if corrected_product_type is None:
+                            unresolved.append({"line": line_number, "product_type": product_type})
+                        else:
+                            corrected.append({"line": line_number, "from": product_type,
+                                              "to": corrected_product_type})
+                            line = corrected_product_type + line[4:]
+                    target.write(line)
+                if corrected and temp_path is not None:
+                    target.flush()
+                    os.fsync(target.fileno())
+
+        if corrected and temp_path is not None:
+            shutil.copymode(data_path, temp_path)
+            os.replace(temp_path, data_path)
+            temp_path = None
+    except (OSError, ValueError) as e:
+        return {"path": data_path, "error": f"{type(e).__name__}: {e}"}
+    finally:
+        # Nothing was corrected, or the file could not be read or written
+        if temp_path is not None:
+            os.remove(temp_path)
+
+    return {
+        "path": data_path,
+        "lines": line_count,
+        "corrected": corrected,
+        "unresolved": unresolved,
+    }
+
+
+def repair_tree(product_key: dict[str, str], root: str, checkpoint_path: Optional[str] = None,
+                workers: Optional[int] = None, pattern: str = "*.txt", dry_run: bool = False) -> Iterator[dict]:
+    """Repairs every customer file under a directory tree across a pool of processes.
+
+    When a checkpoint file is given, the path of each finished file is appended to it, and files already
+    listed in it are skipped, so an interrupted sweep can be resumed without scanning completed files again.
+
+    Args:
+        product_key (dict[str, str]): A key containing all product types and a description of each.
+        root (str): The top of the directory tree.
+        checkpoint_path (Optional[str]): The checkpoint file.
+        workers (Optional[int]): The number of worker processes. Defaults to the number of CPUs.
+        pattern (str): Glob pattern the customer file names must match.
+        dry_run (bool): Only report the corrections, without changing any file.
+
+    Yields:
+        dict: The report of each file from repair_file, in completion order.
+    """
+    completed = read_checkpoint(checkpoint_path) if checkpoint_path else set()
+    data_paths = (data_path for data_path in iter_customer_files(root, pattern) if data_path not in completed)
+    reports = map_unordered(partial(repair_file, product_key, dry_run=dry_run), data_paths, workers)
+
+    if checkpoint_path is None:
+        yield from reports
+        return
+
+    with open(checkpoint_path, "ab") as checkpoint:
+        # End a line cut short by an interruption, so the next path starts on its own line
+        if checkpoint.tell() > 0:
+            with open(checkpoint_path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    checkpoint.write(b"\n")
+        for report in reports:
+            yield report
+            # Recorded after the report is handed on, so a file is only skipped once its report is out
+            if "error" not in report:
+                checkpoint.write(json.dumps(report["path"]).encode() + b"\n")
+                checkpoint.flush()
+
+
+def read_checkpoint(checkpoint_path: str) -> set[str]:
+    """Reads the paths of the files a previous sweep finished.
+
+    Args:
+        checkpoint_path (str): The checkpoint file. A missing file means no files are finished.
+
+    Returns:
+        set[str]: The finished paths.
+    """
+    completed = set()
+    try:
+        with open(checkpoint_path) as f:
+            for line in f:
+                # A line cut short by an interruption is ignored, so that file is repaired again
+                try:
+                    completed.add(json.loads(line))
+                except ValueError:
+                    pass
+    except FileNotFoundError:
+        pass
+    return completed
+
+
+def summarize_reports(reports: Iterable[dict]) -> dict:
+    """Totals the reports of a sweep.
+
+    Returns:
+        dict: The number of files scanned, repaired and failed, and the number of corrected and unresolved lines.
+    """
+    totals = {"files": 0, "repaired_files": 0, "failed_files": 0, "corrected_lines": 0, "unresolved_lines": 0}
+    for report in reports:
+        totals["files"] += 1
+        if "error" in report:
+            totals["failed_files"] += 1
+            continue
+        if report["corrected"]:
+            totals["repaired_files"] += 1
+        totals["corrected_lines"] += len(report["corrected"])
+        totals["unresolved_lines"] += len(report["unresolved"])
+    return totals
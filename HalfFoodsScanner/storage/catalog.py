@@ -0,0 +1,271 @@
+import json
+import os
+import threading
+import time
+import warnings
+from typing import Iterable, Optional
+
+from HalfFoodsScanner.classes.productcatalog import ProductCatalog
+from HalfFoodsScanner.storage import compiledcatalog
+
+# Length of every product type, fixed by the layout of a product line
+PRODUCT_TYPE_LENGTH = 4
+
+# Number of problems listed in the message of a CatalogError
+MAX_REPORTED_ERRORS = 10
+
+# Default seconds between checks of a catalog source for changes
+CHECK_INTERVAL = 1.0
+
+# Marks the start of a SQLite database
+SQLITE_MAGIC = b"SQLite format 3\x00"
+SQLITE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+
+# Rows are read back in insertion order, which is the product key order
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS product_types (
+    product_type TEXT PRIMARY KEY,
+    description TEXT NOT NULL
+);
+"""
+
+
+class CatalogError(ValueError):
+    """Raised when a catalog source cannot be used. Every problem found is listed in errors."""
+
+    def __init__(self, source: str, errors: list[str]):
+        """
+        Args:
+            source (str): The catalog source.
+            errors (list[str]): A description of each problem.
+        """
+        self.source = source
+        self.errors = errors
+        shown = "; ".join(errors[:MAX_REPORTED_ERRORS])
+        more = f" and {len(errors) - MAX_REPORTED_ERRORS} more" if len(errors) > MAX_REPORTED_ERRORS else ""
+        super().__init__(f"{source} has {len(errors)} problem(s): {shown}{more}")
+
+
+def validate_entries(entries: Iterable[tuple[object, object]], source: str) -> list[tuple[str, str]]:
+    """Checks catalog entries before they are used as a product key.
+
+    Product types must be PRODUCT_TYPE_LENGTH printable ASCII characters without spaces, since they are compared
+    with the start of each product line, and must not repeat. Descriptions must be non-empty text.
+
+    Args:
+        entries (Iterable[tuple[object, object]]): The product types and descriptions, as read from the source.
+        source (str): The catalog source, for the error message.
+
+    Returns:
+        list[tuple[str, str]]: The entries, in the same order.
+
+    Raises:
+        CatalogError: When any entry is invalid, listing every invalid entry.
+    """
+    valid = []
+    seen = set()
+    errors = []
+    for number, (product_type, description) in enumerate(entries, 1):
+        if not (isinstance(product_type, str) and len(product_type) == PRODUCT_TYPE_LENGTH
+                and product_type.isascii() and product_type.isprintable() and " " not in product_type):
+            errors.append(f"entry {number} {product_type!r}: product type must be {PRODUCT_TYPE_LENGTH} "
+                          "printable ASCII characters without spaces")
+        elif product_type in seen:
+            errors.append(f"entry {number} {product_type!r}: duplicate product type")
+        elif not isinstance(description, str) or not description.strip():
+            errors.append(f"entry {number} {product_type!r}: description must be non-empty text")
+        else:
+            seen.add(product_type)
+            valid.append((product_type, description))
+    if errors:
+        raise CatalogError(source, errors)
+    return valid
+
+
+def load_catalog(path: str) -> ProductCatalog:
+    """Loads, validates and compiles a product catalog.
+
+    The format is recognised from the file's first bytes: a catalog compiled with write_compiled_catalog, a SQLite
+    database with a product_types table, or otherwise a JSON object of product types to descriptions.
+
+    Args:
+        path (str): The catalog source.
+
+    Returns:
+        ProductCatalog: The catalog, in the order of the source.
+
+    Raises:
+        CatalogError: When the source has invalid entries or is not in a catalog format.
+    """
+    with open(path, "rb") as f:
+        head = f.read(len(SQLITE_MAGIC))
+
+    if head.startswith(compiledcatalog.MAGIC):
+        catalog = compiledcatalog.read_compiled_catalog(path)
+        validate_entries(catalog.items(), path)
+        return catalog
+    if head.startswith(SQLITE_MAGIC):
+        entries = _read_sqlite(path)
+    else:
+        entries = _read_json(path)
+    return ProductCatalog(validate_entries(entries, path), path)
+
+
+def add_catalog_entry(path: str, product_type: str, description: str) -> None:
+    """Adds a product type to a JSON or SQLite catalog source, which is created if it does not exist. JSON
+    sources are rewritten atomically, so a reader never sees a partial file.
+
+    Args:
+        path (str): The catalog source. A new source is a SQLite database if its extension is one of
+            SQLITE_EXTENSIONS, and JSON otherwise.
+        product_type (str): The product type to add.
+        description (str): A description of the product type.
+
+    Raises:
+        CatalogError: When the new entry is invalid or already in the catalog.
+        ValueError: When the source is a compiled catalog, which is read-only.
+    """
+    try:
+        catalog = load_catalog(path)
+        with open(path, "rb") as f:
+            head = f.read(len(SQLITE_MAGIC))
+    except FileNotFoundError:
+        catalog = ProductCatalog()
+        head = SQLITE_MAGIC if path.lower().endswith(SQLITE_EXTENSIONS) else b""
+
+    if head.startswith(compiledcatalog.MAGIC):
+        raise ValueError(f"{path} is a compiled catalog, add to its source and compile it again")
+    entries = validate_entries([*catalog.items(), (product_type, description)], path)
+
+    if head.startswith(SQLITE_MAGIC):
+        import sqlite3
+
+        connection = sqlite3.connect(path)
+        try:
+            with connection:
+                connection.executescript(SQLITE_SCHEMA)
+                connection.execute("INSERT INTO product_types VALUES (?, ?)", (product_type, description))
+        finally:
+            connection.close()
+        return
+
+    with compiledcatalog.atomic_write(path, "w", encoding="utf-8") as f:
+        json.dump(dict(entries), f, indent=2)
+        f.write("\n")
+
+
+def _read_json(path: str) -> list[tuple[object, object]]:
+    with open(path, encoding="utf-8") as f:
+        # Objects are read as pairs, so duplicate product types are seen by the validation instead of dropped
+        data = json.load(f, object_pairs_hook=tuple)
+    if not isinstance(data, tuple):
+        raise CatalogError(path, ["the file must hold a JSON object of product types to descriptions"])
+    return list(data)
+
+
+def _read_sqlite(path: str) -> list[tuple[object, object]]:
+    import sqlite3
+    from pathlib import Path
+
+    try:
+        # Opened read-only, so a missing database is not created
+        connection = sqlite3.connect(Path(path).absolute().as_uri() + "?mode=ro", uri=True)
+        try:
+            return connection.execute("SELECT product_type, description FROM product_types ORDER BY rowid").fetchall()
+        finally:
+            connection.close()
+    except sqlite3.Error as e:
+        raise CatalogError(path, [f"cannot read the product_types table: {e}"]) from None
+
+
+def _signature(path: str) -> tuple:
+    """The modification time, size and inode of a source, and of its SQLite write-ahead log if it has one."""
+    signature = ()
+    for candidate in (path, path + "-wal"):
+        try:
+            stat = os.stat(candidate)
+        except FileNotFoundError:
+            if candidate == path:
+                raise
+            continue
+        signature += (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+    return signature
+
+
+class CatalogReloader:
+    """Keeps the latest valid version of a catalog source, and reloads it when the source changes.
+
+    current() checks the source for changes at most once per check_interval, so it can be called before every
+    file. A changed source is loaded, validated and compiled into a new ProductCatalog, which then replaces the
+    previous catalog in a single assignment. Callers get either the old or the new catalog, never a partial one,
+    and scans already holding the old catalog carry on with it. Only one caller reloads at a time, and the others
+    are given the current catalog instead of waiting.
+
+    A source that fails to load, such as one caught while it is being written, is reported with a warning and the
+    previous catalog is kept until the source changes again.
+    """
+
+    def __init__(self, path: str, check_interval: float = CHECK_INTERVAL):
+        """
+        Args:
+            path (str): The catalog source.
+            check_interval (float): Minimum seconds between checks of the source for changes.
+
+        Raises:
+            OSError: When the source cannot be read.
+            CatalogError: When the source is not a valid catalog.
+        """
+        self.path = path
+        self.check_interval = check_interval
+        self.reloads = 0
+        # The problem with the source found by the last check, if any
+        self.error: Optional[Exception] = None
+        self._lock = threading.Lock()
+        self._signature = _signature(path)
+        self._catalog = load_catalog(path)
+        self._next_check = time.monotonic() + check_interval
+
+    @property
+    def catalog(self) -> ProductCatalog:
+        """The latest valid catalog, without checking the source."""
+        return self._catalog
+
+    def current(self) -> ProductCatalog:
+        """Returns the latest valid catalog, first reloading it if the check interval has passed and the source has
+        changed."""
+        if time.monotonic() >= self._next_check:
+            self.reload_if_changed()
+        return self._catalog
+
+    def reload_if_changed(self) -> bool:
+        """Reloads the catalog if the source has changed since it was last loaded.
+
+        Returns:
+            bool: Whether a new catalog was loaded.
+        """
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            self._next_check = time.monotonic() + self.check_interval
+            try:
+                signature = _signature(self.path)
+            except OSError as e:
+                # The source may be between being removed and replaced
+                self.error = e
+                return False
+            if signature == self._signature:
+                return False
+
+            self._signature = signature
+            try:
+                catalog = load_catalog(self.path)
+            except (OSError, ValueError) as e:
+                self.error = e
+                warnings.warn(f"Keeping the previous catalog, could not reload {self.path}: {e}")
+                return False
+            self._catalog = catalog
+            self.reloads += 1
+            self.error = None
+            return True
+        finally:
+            self._lock.release()
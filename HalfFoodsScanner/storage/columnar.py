@@ -0,0 +1,336 @@
+import mmap
+import os
+import struct
+from collections.abc import Iterator, Mapping, Sequence
+from datetime import datetime
+from typing import Iterable
+
+from HalfFoodsScanner.classes.purchaseinfo import PurchaseInfo
+from HalfFoodsScanner.storage.compiledcatalog import atomic_write
+
+# Encoding of the strings in the file
+ENCODING = "utf-8"
+
+# Marks the start and end of a columnar file
+MAGIC = b"HFCOLUMN"
+VERSION = 1
+
+# Magic and version
+_FILE_HEADER = struct.Struct("<8sH")
+# Offset and length of the purchase directory, then the magic again
+_FOOTER = struct.Struct("<QQ8s")
+# Quantity, customer name length, date length, number of product types, ID width, subtype width, number of IDs,
+# number of subtypes
+_PURCHASE_HEADER = struct.Struct("<QHHHHHII")
+# Per product type: first ID, number of IDs, first subtype, number of subtypes
+_TYPE_INDEX = struct.Struct("<IIII")
+
+
+def write_purchases(path: str, purchases: Iterable[PurchaseInfo]) -> int:
+    """Writes purchase information to a binary columnar file, which ColumnarFile reads back.
+
+    Each purchase is stored as a header with the customer and date, a dictionary of its product types with the
+    offsets of each product type's IDs and subtypes, and fixed-width ID and subtype columns. The IDs of a product
+    type are stored together, so the dictionary-encoded product type column of the items is the run of each
+    product type in the index. Every ID of a purchase is padded to the width of its longest ID, and likewise for
+    subtypes. The file is written to a temporary file first, so readers never see a partial file.
+
+    Args:
+        path (str): The file to write.
+        purchases (Iterable[PurchaseInfo]): The purchases to store, which may also be CompactPurchaseInfo.
+
+    Returns:
+        int: The number of purchases written.
+
+    Raises:
+        ValueError: When a string is too long for the format, such as a customer name over 65535 bytes.
+    """
+    with atomic_write(path) as f:
+        f.write(_FILE_HEADER.pack(MAGIC, VERSION))
+        offsets = []
+        for purchase_info in purchases:
+            offsets.append(f.tell())
+            f.write(_encode_purchase(purchase_info))
+        directory_offset = f.tell()
+        f.write(struct.pack(f"<{len(offsets)}Q", *offsets))
+        f.write(_FOOTER.pack(directory_offset, len(offsets), MAGIC))
+    return len(offsets)
+
+
+def _encode_purchase(purchase_info: PurchaseInfo) -> bytes:
+    product_type_history = purchase_info.product_type_history
+    subtype_lookup = purchase_info.subtype_lookup
+    product_types = list(product_type_history)
+    product_types.extend(product_type for product_type in subtype_lookup if product_type not in product_type_history)
+
+    id_columns = []
+    subtype_columns = []
+    for product_type in product_types:
+        id_columns.append([product_id.encode(ENCODING) for product_id in product_type_history.get(product_type, ())])
+        subtype_columns.append(sorted(subtype.encode(ENCODING) for subtype in subtype_lookup.get(product_type, ())))
+    id_width = max((len(product_id) for column in id_columns for product_id in column), default=0)
+    subtype_width = max((len(subtype) for column in subtype_columns for subtype in column), default=0)
+
+    customer_name = (purchase_info.customer_name or "").encode(ENCODING)
+    purchase_date = purchase_info.purchase_date.isoformat().encode(ENCODING) if purchase_info.purchase_date else b""
+    parts = [
+        _PURCHASE_HEADER.pack(purchase_info.quantity, _check_length(len(customer_name), 0xFFFF, "customer name"),
+                              len(purchase_date), len(product_types), _check_length(id_width, 0xFFFF, "unique ID"),
+                              _check_length(subtype_width, 0xFFFF, "subtype"),
+                              sum(map(len, id_columns)), sum(map(len, subtype_columns))),
+        customer_name,
+        purchase_date,
+    ]
+
+    # The product type dictionary, each code prefixed with its length
+    for product_type in product_types:
+        code = product_type.encode(ENCODING)
+        parts.append(bytes([_check_length(len(code), 0xFF, "product type")]) + code)
+
+    id_start = 0
+    subtype_start = 0
+    for ids, subtypes in zip(id_columns, subtype_columns):
+        parts.append(_TYPE_INDEX.pack(id_start, len(ids), subtype_start, len(subtypes)))
+        id_start += len(ids)
+        subtype_start += len(subtypes)
+
+    parts.extend(product_id.ljust(id_width, b"\0") for column in id_columns for product_id in column)
+    parts.extend(subtype.ljust(subtype_width, b"\0") for column in subtype_columns for subtype in column)
+    return b"".join(parts)
+
+
+def _check_length(length: int, limit: int, name: str) -> int:
+    if length > limit:
+        raise ValueError(f"A {name} of {length} bytes is too long for the columnar format")
+    return length
+
+
+class ColumnarFile(Sequence):
+    """Reads a file written by write_purchases.
+
+    The file is memory-mapped, and each purchase is a ColumnarPurchase that decodes only what is asked for,
+    so reading counts or subtypes only touches the index and the slices of the columns involved.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): The columnar file.
+
+        Raises:
+            ValueError: When the file is not a columnar file, or was written by a newer version.
+        """
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < _FILE_HEADER.size + _FOOTER.size:
+                raise ValueError(f"{path} is not a columnar file")
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version = _FILE_HEADER.unpack_from(self._mm, 0)
+        directory_offset, count, end_magic = _FOOTER.unpack_from(self._mm, size - _FOOTER.size)
+        if magic != MAGIC or end_magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a columnar file")
+        if version > VERSION:
+            self.close()
+            raise ValueError(f"{path} has columnar format version {version}, only up to {VERSION} is supported")
+        self._offsets = struct.unpack_from(f"<{count}Q", self._mm, directory_offset)
+
+    def close(self) -> None:
+        self._mm.close()
+
+    def __enter__(self) -> "ColumnarFile":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return ColumnarPurchase(self._mm, self._offsets[index])
+
+
+class ColumnarPurchase:
+    """One purchase in a ColumnarFile.
+
+    product_type_history and subtype_lookup are read-only views over the mapped columns, so the report methods
+    of PurchaseInfo work on it directly.
+
+    customer_name: Name of the customer
+    purchase_date: Date when purchase was made
+    quantity: Total quantity of purchase. (Note: includes items purchased with an invalid product type.)
+    product_type_history: For each product type, contains a list of IDs.
+    subtype_lookup: For each product type, a set of subtypes.
+    """
+
+    __slots__ = ("customer_name", "purchase_date", "quantity", "_index", "_ids", "_subtypes", "_most_common",
+                 "_tracked_quantity")
+
+    def __init__(self, mm: mmap.mmap, offset: int):
+        (self.quantity, name_length, date_length, type_count, id_width, subtype_width, id_count,
+         subtype_count) = _PURCHASE_HEADER.unpack_from(mm, offset)
+        position = offset + _PURCHASE_HEADER.size
+        self.customer_name = mm[position:position + name_length].decode(ENCODING)
+        position += name_length
+        purchase_date = mm[position:position + date_length].decode(ENCODING)
+        self.purchase_date = datetime.fromisoformat(purchase_date) if purchase_date else None
+        position += date_length
+
+        product_types = []
+        for _ in range(type_count):
+            length = mm[position]
+            product_types.append(mm[position + 1:position + 1 + length].decode(ENCODING))
+            position += 1 + length
+
+        # Product type -> (first ID, number of IDs, first subtype, number of subtypes)
+        self._index = {product_type: _TYPE_INDEX.unpack_from(mm, position + i * _TYPE_INDEX.size)
+                       for i, product_type in enumerate(product_types)}
+        position += type_count * _TYPE_INDEX.size
+        self._ids = (mm, position, id_width)
+        self._subtypes = (mm, position + id_count * id_width, subtype_width)
+
+        # Filled in by most_common_product_type, from the index
+        self._most_common = None
+        self._tracked_quantity = None
+
+    most_common_product_type = PurchaseInfo.most_common_product_type
+    most_common_description = PurchaseInfo.most_common_description
+    get_basic_purchase_information = PurchaseInfo.get_basic_purchase_information
+    get_advanced_purchase_information = PurchaseInfo.get_advanced_purchase_information
+    iter_advanced_purchase_information = PurchaseInfo.iter_advanced_purchase_information
+    get_subtypes = PurchaseInfo.get_subtypes
+
+    @property
+    def product_type_history(self) -> "_HistoryView":
+        return _HistoryView(self)
+
+    @property
+    def subtype_lookup(self) -> "_SubtypeLookupView":
+        return _SubtypeLookupView(self)
+
+    def product_type_counts(self) -> dict[str, int]:
+        """Returns the number of items of each product type, read from the index alone.
+
+        Returns:
+            dict[str, int]: The item count per product type, in the order product types were first purchased.
+        """
+        return {product_type: entry[1] for product_type, entry in self._index.items() if entry[1]}
+
+    def to_purchase_info(self) -> PurchaseInfo:
+        """Decodes the whole purchase.
+
+        Returns:
+            PurchaseInfo: The same purchase information with plain lists and sets.
+        """
+        return PurchaseInfo(
+            self.customer_name,
+            self.purchase_date,
+            self.quantity,
+            {product_type: list(id_list) for product_type, id_list in self.product_type_history.items()},
+            {product_type: set(subtypes) for product_type, subtypes in self.subtype_lookup.items()},
+        )
+
+    def __eq__(self, other) -> bool:
+        if not hasattr(other, "product_type_history"):
+            return NotImplemented
+        return (self.customer_name == other.customer_name
+                and self.purchase_date == other.purchase_date
+                and self.quantity == other.quantity
+                and {product_type: list(id_list) for product_type, id_list in self.product_type_history.items()}
+                == {product_type: list(id_list) for product_type, id_list in other.product_type_history.items()}
+                and dict(self.subtype_lookup.items()) == dict(other.subtype_lookup.items()))
+
+    def __repr__(self) -> str:
+        return (f"ColumnarPurchase(customer_name={self.customer_name!r}, purchase_date={self.purchase_date!r}, "
+                f"quantity={self.quantity!r}, product_types={len(self._index)})")
+
+
+class _FixedColumn(Sequence):
+    """A slice of a fixed-width column in a mapped file, decoded one value at a time."""
+
+    __slots__ = ("_mm", "_start", "_width", "_count")
+
+    def __init__(self, mm: mmap.mmap, start: int, width: int, count: int):
+        self._mm = mm
+        self._start = start
+        self._width = width
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("column index out of range")
+        start = self._start + index * self._width
+        return self._mm[start:start + self._width].rstrip(b"\0").decode(ENCODING)
+
+    def __iter__(self) -> Iterator[str]:
+        width = self._width
+        if not width:
+            # Every value of the column is empty, and takes no space in the file
+            yield from ("" for _ in range(self._count))
+            return
+        data = self._mm[self._start:self._start + self._count * width]
+        for start in range(0, len(data), width):
+            yield data[start:start + width].rstrip(b"\0").decode(ENCODING)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Sequence):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+class _HistoryView(Mapping):
+    """product_type_history of a ColumnarPurchase."""
+
+    __slots__ = ("_purchase",)
+
+    def __init__(self, purchase: ColumnarPurchase):
+        self._purchase = purchase
+
+    def __getitem__(self, product_type: str) -> _FixedColumn:
+        id_start, id_count, _, _ = self._purchase._index[product_type]
+        if not id_count:
+            raise KeyError(product_type)
+        mm, column_start, width = self._purchase._ids
+        return _FixedColumn(mm, column_start + id_start * width, width, id_count)
+
+    def __iter__(self) -> Iterator[str]:
+        return (product_type for product_type, entry in self._purchase._index.items() if entry[1])
+
+    def __len__(self) -> int:
+        return sum(1 for entry in self._purchase._index.values() if entry[1])
+
+
+class _SubtypeLookupView(Mapping):
+    """subtype_lookup of a ColumnarPurchase."""
+
+    __slots__ = ("_purchase",)
+
+    def __init__(self, purchase: ColumnarPurchase):
+        self._purchase = purchase
+
+    def __getitem__(self, product_type: str) -> frozenset[str]:
+        _, _, subtype_start, subtype_count = self._purchase._index[product_type]
+        if not subtype_count:
+            raise KeyError(product_type)
+        mm, column_start, width = self._purchase._subtypes
+        return frozenset(_FixedColumn(mm, column_start + subtype_start * width, width, subtype_count))
+
+    def __iter__(self) -> Iterator[str]:
+        return (product_type for product_type, entry in self._purchase._index.items() if entry[3])
+
+    def __len__(self) -> int:
+        return sum(1 for entry in self._purchase._index.values() if entry[3])
@@ -0,0 +1,98 @@
+import marshal
+import os
+from contextlib import contextmanager
+from typing import IO, Iterator
+
+from HalfFoodsScanner.classes.productcatalog import ProductCatalog
+from HalfFoodsScanner.dataloaders.productindex import ProductKeyIndex, get_product_key_index
+
+# Marks the start of a compiled catalog
+MAGIC = b"HFCATLOG"
+# Bumped whenever the layout changes, so old files are rejected instead of misread
+VERSION = 1
+
+
+@contextmanager
+def atomic_write(path: str, mode: str = "wb", **kwargs) -> Iterator[IO]:
+    """Opens a temporary file next to path, and moves it over path once the block finishes, so readers never see
+    a partial file. If the block raises, the temporary file is removed and path is left as it was.
+
+    The file gets the permissions of the file it replaces, or the usual permissions of a new file under the
+    umask, rather than the owner-only permissions of a temporary file.
+
+    Args:
+        path (str): The file to write.
+        mode (str): The mode to open the temporary file in, "wb" or "w".
+        **kwargs: Passed on to open, such as the encoding.
+
+    Yields:
+        IO: The open temporary file.
+    """
+    # Only needed to write, and slow enough to import that reading should not pay for it
+    import tempfile
+
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode, **kwargs) as f:
+            yield f
+        try:
+            file_mode = os.stat(path).st_mode & 0o7777
+        except FileNotFoundError:
+            # The umask can only be read by setting it
+            umask = os.umask(0)
+            os.umask(umask)
+            file_mode = 0o666 & ~umask
+        os.chmod(temp_path, file_mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def write_compiled_catalog(path: str, product_key: dict[str, str]) -> int:
+    """Writes a product key together with its correction index, so read_compiled_catalog can load both without
+    parsing a catalog source or computing the index.
+
+    The file is written with marshal, so it can only be read by the Python version that wrote it.
+
+    Args:
+        path (str): The file to write. Replaced atomically if it exists.
+        product_key (dict[str, str]): A key containing all product types and a description of each.
+
+    Returns:
+        int: The number of product types written.
+    """
+    index = get_product_key_index(product_key)
+    payload = marshal.dumps((VERSION, marshal.version, list(product_key.items()), index._patterns))
+    with atomic_write(path) as f:
+        f.write(MAGIC)
+        f.write(payload)
+    return len(product_key)
+
+
+def read_compiled_catalog(path: str) -> ProductCatalog:
+    """Reads a product key written by write_compiled_catalog. The catalog owns the correction index read with
+    it, so the index is not built again and is freed with the catalog.
+
+    Args:
+        path (str): The compiled catalog.
+
+    Returns:
+        ProductCatalog: The product key, in the order it was written.
+
+    Raises:
+        ValueError: When the file is not a compiled catalog, or was written by another version of the format or
+            of Python.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a compiled catalog")
+        try:
+            version, marshal_version, items, patterns = marshal.load(f)
+        except (EOFError, ValueError, TypeError) as e:
+            raise ValueError(f"{path} is not a compiled catalog: {e}") from None
+
+    if version != VERSION or marshal_version != marshal.version:
+        raise ValueError(f"{path} was compiled by another version, compile it again")
+    product_types = tuple(product_type for product_type, _ in items)
+    return ProductCatalog(items, path, ProductKeyIndex(product_types, patterns))
@@ -0,0 +1,217 @@
+import sqlite3
+from collections import defaultdict
+from datetime import date, datetime
+from itertools import islice
+from typing import Iterable, Optional
+
+from HalfFoodsScanner.dataloaders.helpers import parse_header
+from HalfFoodsScanner.dataloaders.textloader import TextLoader
+from HalfFoodsScanner.classes.purchaseinfo import PurchaseInfo
+
+# Rows sent to SQLite per executemany call
+BATCH_SIZE = 10_000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS purchases (
+    id INTEGER PRIMARY KEY,
+    source TEXT,
+    customer_name TEXT NOT NULL,
+    purchase_date TEXT NOT NULL,
+    quantity INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS items (
+    purchase_id INTEGER NOT NULL REFERENCES purchases (id),
+    product_type TEXT,
+    subtype TEXT NOT NULL,
+    product_id TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS product_type_counts (
+    purchase_id INTEGER NOT NULL REFERENCES purchases (id),
+    product_type TEXT NOT NULL,
+    item_count INTEGER NOT NULL,
+    first_item INTEGER NOT NULL,
+    PRIMARY KEY (purchase_id, product_type)
+);
+CREATE TABLE IF NOT EXISTS product_subtypes (
+    purchase_id INTEGER NOT NULL REFERENCES purchases (id),
+    product_type TEXT NOT NULL,
+    subtype TEXT NOT NULL,
+    PRIMARY KEY (purchase_id, product_type, subtype)
+);
+CREATE INDEX IF NOT EXISTS purchases_customer_name ON purchases (customer_name);
+CREATE INDEX IF NOT EXISTS purchases_purchase_date ON purchases (purchase_date);
+CREATE INDEX IF NOT EXISTS items_purchase_id ON items (purchase_id, product_type);
+CREATE INDEX IF NOT EXISTS product_type_counts_product_type ON product_type_counts (product_type);
+CREATE INDEX IF NOT EXISTS product_subtypes_product_type ON product_subtypes (product_type, subtype);
+CREATE INDEX IF NOT EXISTS product_subtypes_subtype ON product_subtypes (subtype);
+"""
+
+
+class SQLitePurchaseStore:
+    """Stores parsed customer files in a SQLite database and answers the report questions with SQL.
+
+    Every item of a file is stored, including items whose product type matches nothing, which have a NULL
+    product type and only count toward the purchase's quantity. Dates are stored as YYYY-MM-DD text.
+
+    When a file is added, its item count per product type and its distinct subtypes are also stored, so
+    the report queries aggregate over those small tables instead of over every item.
+
+    Queries can be narrowed to one purchase, one customer and/or one date; with no filter they cover every
+    stored purchase.
+    """
+
+    def __init__(self, database: str = ":memory:"):
+        """
+        Args:
+            database (str): Path to the SQLite database file, which is created if it does not exist.
+        """
+        self.connection = sqlite3.connect(database)
+        self.connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> "SQLitePurchaseStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def add_file(self, product_key: dict[str, str], data_path: str) -> int:
+        """Parses a customer file and stores every item in one transaction.
+
+        Args:
+            product_key (dict[str, str]): A key containing all product types and a description of each.
+            data_path (str): A path to the text file.
+
+        Returns:
+            int: The id of the stored purchase.
+        """
+        with self.connection:
+            return self._insert_file(product_key, data_path)
+
+    def add_files(self, product_key: dict[str, str], data_paths: Iterable[str]) -> list[int]:
+        """Parses many customer files and stores them all in one transaction.
+
+        Args:
+            product_key (dict[str, str]): A key containing all product types and a description of each.
+            data_paths (Iterable[str]): Paths to the text files.
+
+        Returns:
+            list[int]: The ids of the stored purchases, in the same order as the paths.
+        """
+        with self.connection:
+            return [self._insert_file(product_key, data_path) for data_path in data_paths]
+
+    def product_type_counts(self, purchase_id: Optional[int] = None, customer_name: Optional[str] = None,
+                            purchase_date: Optional[date] = None) -> dict[str, int]:
+        """Returns the number of items of each product type.
+
+        Returns:
+            dict[str, int]: The item count per product type, in the order product types were first stored.
+        """
+        where, parameters = self._filter(purchase_id, customer_name, purchase_date)
+        rows = self.connection.execute(
+            f"""SELECT product_type, SUM(item_count) FROM product_type_counts
+                JOIN purchases ON purchases.id = product_type_counts.purchase_id
+                WHERE TRUE {where}
+                GROUP BY product_type ORDER BY MIN(first_item)""", parameters)
+        return dict(rows.fetchall())
+
+    def most_common_product_type(self, purchase_id: Optional[int] = None, customer_name: Optional[str] = None,
+                                 purchase_date: Optional[date] = None) -> Optional[str]:
+        """Returns the product type with the most items. Ties go to the product type stored first, as in
+        PurchaseInfo.get_advanced_purchase_information.
+
+        Returns:
+            Optional[str]: The most common product type, or None if there are no items with a product type.
+        """
+        where, parameters = self._filter(purchase_id, customer_name, purchase_date)
+        row = self.connection.execute(
+            f"""SELECT product_type FROM product_type_counts
+                JOIN purchases ON purchases.id = product_type_counts.purchase_id
+                WHERE TRUE {where}
+                GROUP BY product_type ORDER BY SUM(item_count) DESC, MIN(first_item) LIMIT 1""", parameters).fetchone()
+        return row[0] if row else None
+
+    def subtypes(self, product_type: str, purchase_id: Optional[int] = None, customer_name: Optional[str] = None,
+                 purchase_date: Optional[date] = None) -> set[str]:
+        """Returns the distinct subtypes of a product type.
+
+        Returns:
+            set[str]: The subtypes, empty if the product type has no items.
+        """
+        where, parameters = self._filter(purchase_id, customer_name, purchase_date)
+        rows = self.connection.execute(
+            f"""SELECT DISTINCT subtype FROM product_subtypes
+                JOIN purchases ON purchases.id = product_subtypes.purchase_id
+                WHERE product_type = ? {where}""", [product_type, *parameters])
+        return {subtype for subtype, in rows}
+
+    def load_purchase(self, purchase_id: int) -> PurchaseInfo:
+        """Reads one stored purchase back as a PurchaseInfo.
+
+        Raises:
+            KeyError: When there is no purchase with that id.
+        """
+        row = self.connection.execute(
+            "SELECT customer_name, purchase_date, quantity FROM purchases WHERE id = ?", (purchase_id,)).fetchone()
+        if row is None:
+            raise KeyError(purchase_id)
+        customer_name, purchase_date, quantity = row
+
+        product_type_history = defaultdict(list)
+        subtype_lookup = defaultdict(set)
+        rows = self.connection.execute(
+            """SELECT product_type, subtype, product_id FROM items
+               WHERE purchase_id = ? AND product_type IS NOT NULL ORDER BY rowid""", (purchase_id,))
+        for product_type, subtype, product_id in rows:
+            product_type_history[product_type].append(product_id)
+            subtype_lookup[product_type].add(subtype)
+        return PurchaseInfo(customer_name, datetime.fromisoformat(purchase_date), quantity,
+                            product_type_history, subtype_lookup)
+
+    def _insert_file(self, product_key: dict[str, str], data_path: str) -> int:
+        loader = TextLoader()
+        with open(data_path) as f:
+            purchase_date, customer_name = parse_header(f.readline())
+            purchase_id = self.connection.execute(
+                "INSERT INTO purchases (source, customer_name, purchase_date, quantity) VALUES (?, ?, ?, 0)",
+                (data_path, customer_name, purchase_date.date().isoformat())).lastrowid
+
+            quantity = 0
+            rows = ((purchase_id, product_type, subtype, product_id)
+                    for product_type, subtype, product_id in loader.iter_products(product_key, f))
+            while batch := list(islice(rows, BATCH_SIZE)):
+                self.connection.executemany(
+                    "INSERT INTO items (purchase_id, product_type, subtype, product_id) VALUES (?, ?, ?, ?)", batch)
+                quantity += len(batch)
+
+        self.connection.execute("UPDATE purchases SET quantity = ? WHERE id = ?", (quantity, purchase_id))
+        self.connection.execute(
+            """INSERT INTO product_type_counts (purchase_id, product_type, item_count, first_item)
+               SELECT purchase_id, product_type, COUNT(*), MIN(rowid) FROM items
+               WHERE purchase_id = ? AND product_type IS NOT NULL GROUP BY product_type""", (purchase_id,))
+        self.connection.execute(
+            """INSERT INTO product_subtypes (purchase_id, product_type, subtype)
+               SELECT DISTINCT purchase_id, product_type, subtype FROM items
+               WHERE purchase_id = ? AND product_type IS NOT NULL""", (purchase_id,))
+        return purchase_id
+
+    def _filter(self, purchase_id: Optional[int], customer_name: Optional[str],
+                purchase_date: Optional[date]) -> tuple[str, list]:
+        """Builds the extra WHERE conditions for the optional query filters."""
+        conditions = []
+        parameters = []
+        if purchase_id is not None:
+            conditions.append("AND purchases.id = ?")
+            parameters.append(purchase_id)
+        if customer_name is not None:
+            conditions.append("AND purchases.customer_name = ?")
+            parameters.append(customer_name)
+        if purchase_date is not None:
+            if isinstance(purchase_date, datetime):
+                purchase_date = purchase_date.date()
+            conditions.append("AND purchases.purchase_date = ?")
+            parameters.append(purchase_date.isoformat())
+        return " ".join(conditions), parameters
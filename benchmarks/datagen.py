@@ -0,0 +1,57 @@
+import random
+import string
+from typing import Optional
+
+# Characters used for generated product types, subtypes and IDs
+ALPHABET = string.ascii_uppercase
+
+
+def generate_product_key(catalog_size: int, seed: int = 0) -> dict[str, str]:
+    """Generates a product key of distinct four letter product types.
+
+    Args:
+        catalog_size (int): The number of product types in the key.
+        seed (int): Seed for the random generator, the same seed always gives the same key.
+
+    Returns:
+        dict[str, str]: The product key, with a generated description for each product type.
+    """
+    rng = random.Random(seed)
+    product_key = {}
+    while len(product_key) < catalog_size:
+        product_type = "".join(rng.choices(ALPHABET, k=4))
+        product_key.setdefault(product_type, f"Product Type {len(product_key)}")
+    return product_key
+
+
+def generate_customer_file(data_path: str, product_key: dict[str, str], lines: int,
+                           corruption_rate: float = 0.0, product_types: Optional[int] = None,
+                           subtypes_per_type: int = 50, seed: int = 0) -> None:
+    """Writes a customer file with generated product lines.
+
+    Args:
+        data_path (str): Where to write the file.
+        product_key (dict[str, str]): The product key the product types are chosen from.
+        lines (int): The number of product lines.
+        corruption_rate (float): The fraction of lines whose product type has one character replaced.
+        product_types (Optional[int]): The number of distinct product types used in the file. Defaults to every
+            product type in the key.
+        subtypes_per_type (int): The number of distinct subtypes used per product type.
+        seed (int): Seed for the random generator, the same arguments and seed always give the same file.
+    """
+    rng = random.Random(seed)
+    used_types = list(product_key)[:product_types]
+    subtypes = {
+        product_type: ["".join(rng.choices(ALPHABET, k=6)) for _ in range(subtypes_per_type)]
+        for product_type in used_types
+    }
+
+    with open(data_path, "w", newline="\n") as f:
+        f.write("05011984Benchmark\n")
+        for _ in range(lines):
+            product_type = rng.choice(used_types)
+            subtype = rng.choice(subtypes[product_type])
+            if rng.random() < corruption_rate:
+                position = rng.randrange(4)
+                product_type = product_type[:position] + rng.choice(ALPHABET) + product_type[position + 1:]
+            f.write(f"{product_type}{subtype}{''.join(rng.choices(ALPHABET, k=20))}\n")
@@ -0,0 +1,196 @@
+"""Benchmarks for the loader hot paths.
+
+Generates a customer file with benchmarks.datagen, times the loaders, the columnar format, error_checker and
+the PurchaseInfo report methods, and writes the results as JSON so runs can be compared across commits:
+
+    python -m benchmarks.run --lines 1000000 --corruption-rate 0.05 --output bench.json
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable
+
+from benchmarks.datagen import ALPHABET, generate_customer_file, generate_product_key
+from HalfFoodsScanner.dataloaders import numpyloader
+from HalfFoodsScanner.dataloaders.helpers import error_checker, parse_header
+from HalfFoodsScanner.dataloaders.mmaploader import MmapLoader
+from HalfFoodsScanner.dataloaders.productindex import ProductKeyIndex
+from HalfFoodsScanner.dataloaders.textloader import TextLoader
+from HalfFoodsScanner.storage.columnar import ColumnarFile, write_purchases
+
+LOADERS = {
+    "TextLoader": TextLoader,
+    "TextLoader(compact)": lambda: TextLoader(compact=True),
+    "MmapLoader": MmapLoader,
+}
+if numpyloader.np is not None:
+    LOADERS["NumpyLoader"] = numpyloader.NumpyLoader
+
+
+def measure(name: str, function: Callable[[], object], repeats: int, items: int) -> dict:
+    """Times a function and measures its memory use.
+
+    Args:
+        name (str): The name of the benchmark.
+        function (Callable[[], object]): The code to benchmark.
+        repeats (int): How many times to time the function. The fastest run is reported.
+        items (int): The number of items (lines, comparisons, ...) handled per call, for the throughput.
+
+    Returns:
+        dict: The benchmark name, fastest time, items per second, peak traced memory and the number of memory
+            blocks still allocated by the result.
+    """
+    timings = []
+    for _ in range(repeats):
+        gc.collect()
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    seconds = min(timings)
+
+    # Memory is measured in a separate run, since tracing slows the code down
+    gc.collect()
+    blocks_before = sys.getallocatedblocks()
+    tracemalloc.start()
+    result = function()
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    gc.collect()
+    allocated_blocks = sys.getallocatedblocks() - blocks_before
+    del result
+
+    return {
+        "name": name,
+        "seconds": seconds,
+        "items": items,
+        "items_per_second": items / seconds if seconds else None,
+        "peak_bytes": peak_bytes,
+        "allocated_blocks": allocated_blocks,
+    }
+
+
+def run(args: argparse.Namespace) -> dict:
+    """Generates the benchmark data and runs every benchmark."""
+    product_key = generate_product_key(args.catalog_size, args.seed)
+    results = []
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        data_path = os.path.join(temp_dir, "Customer.txt")
+        generate_customer_file(data_path, product_key, args.lines, args.corruption_rate, args.product_types,
+                               seed=args.seed)
+
+        for name in args.loaders:
+            loader = LOADERS[name]()
+            results.append(measure(f"{name}.load_data", lambda: loader.load_data(product_key, data_path),
+                                   args.repeats, args.lines))
+
+        purchase_info = TextLoader().load_data(product_key, data_path)
+
+        columnar_path = os.path.join(temp_dir, "Customer.hfcol")
+        results.append(measure("write_purchases", lambda: write_purchases(columnar_path, [purchase_info]),
+                               args.repeats, args.lines))
+        results.append(measure("ColumnarFile.product_type_counts", lambda: _columnar_counts(columnar_path),
+                               args.repeats, args.lines))
+        results.append(measure("ColumnarFile.to_purchase_info", lambda: _columnar_load(columnar_path),
+                               args.repeats, args.lines))
+
+    rng = random.Random(args.seed)
+    codes = ["".join(rng.choices(ALPHABET, k=4)) for _ in range(args.comparisons)]
+    product_types = list(product_key)
+    pairs = [(code, rng.choice(product_types)) for code in codes]
+    results.append(measure("error_checker", lambda: [error_checker(a, b) for a, b in pairs],
+                           args.repeats, len(pairs)))
+    # A new index per run, so the memo of corrections starts empty and the build cost is included
+    results.append(measure("ProductKeyIndex.correct",
+                           lambda: _correct_all(ProductKeyIndex(tuple(product_key)), codes),
+                           args.repeats, len(codes)))
+
+    headers = [f"{rng.randint(1, 12):02}{rng.randint(1, 28):02}{rng.randint(2000, 2030)}Customer{i}\n"
+               for i in range(args.comparisons)]
+    results.append(measure("parse_header", lambda: [parse_header(header) for header in headers],
+                           args.repeats, len(headers)))
+
+    item_count = sum(len(id_list) for id_list in purchase_info.product_type_history.values())
+    results.append(measure("PurchaseInfo.get_basic_purchase_information",
+                           purchase_info.get_basic_purchase_information, args.repeats, 1))
+    results.append(measure("PurchaseInfo.get_advanced_purchase_information",
+                           lambda: purchase_info.get_advanced_purchase_information(product_key),
+                           args.repeats, item_count))
+    results.append(measure("PurchaseInfo.get_subtypes",
+                           lambda: [purchase_info.get_subtypes(product_type) for product_type in product_key],
+                           args.repeats, len(product_key)))
+
+    return {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {
+            "lines": args.lines,
+            "corruption_rate": args.corruption_rate,
+            "catalog_size": args.catalog_size,
+            "product_types": args.product_types,
+            "comparisons": args.comparisons,
+            "repeats": args.repeats,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+
+def _correct_all(index: ProductKeyIndex, codes: list[str]) -> list:
+    return [index.correct(code) for code in codes]
+
+
+def _columnar_counts(columnar_path: str) -> dict:
+    with ColumnarFile(columnar_path) as columnar:
+        return columnar[0].product_type_counts()
+
+
+def _columnar_load(columnar_path: str):
+    with ColumnarFile(columnar_path) as columnar:
+        return columnar[0].to_purchase_info()
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=200_000, help="Product lines in the generated file.")
+    parser.add_argument("--corruption-rate", type=float, default=0.05,
+                        help="Fraction of lines with one character of the product type replaced.")
+    parser.add_argument("--catalog-size", type=int, default=11, help="Product types in the product key.")
+    parser.add_argument("--product-types", type=int, default=None,
+                        help="Distinct product types used in the file. Defaults to the whole catalog.")
+    parser.add_argument("--comparisons", type=int, default=100_000,
+                        help="Codes checked in the error_checker and ProductKeyIndex benchmarks.")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed runs per benchmark, the fastest is reported.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the generated data.")
+    parser.add_argument("--loaders", nargs="+", choices=list(LOADERS), default=list(LOADERS),
+                        help="Loaders to benchmark.")
+    parser.add_argument("--output", help="Write the results to this file instead of standard output.")
+    args = parser.parse_args(argv)
+
+    report = json.dumps(run(args), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
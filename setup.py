@@ -6,4 +6,5 @@ setup(name="HalfFoodsScanner",
       author="Joseph Salmingo",
       author_email="joseph.salmingo@gmail.com",
       url="https://github.com/joooooooooe-star/half-food-scanner",
-      packages=["HalfFoodsScanner"])
+      packages=["HalfFoodsScanner"],
+      extras_require={"numpy": ["numpy"]})
@@ -0,0 +1,56 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from HalfFoodsScanner.__main__ import init_product_key
+from HalfFoodsScanner.classes.purchaseaggregate import PurchaseAggregate
+from HalfFoodsScanner.jobs import aggregate
+
+
+class TestAggregateMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        test_dir = os.path.dirname(__file__)
+        self.data_paths = []
+        for i in range(5):
+            data_path = os.path.join(self.data_dir, f"Customer{i}.txt")
+            shutil.copy(os.path.join(test_dir, "CustomerG.txt" if i % 2 else "CustomerError.txt"), data_path)
+            self.data_paths.append(data_path)
+        self.malformed_path = os.path.join(self.data_dir, "Malformed.txt")
+        with open(self.malformed_path, "w") as f:
+            f.write("not a header\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def test_aggregate_files(self):
+        """Tests that chunked, tree-reduced aggregation counts every file and skips malformed ones"""
+
+        product_key = init_product_key()
+        totals = aggregate.aggregate_files(product_key, self.data_paths + [self.malformed_path], workers=1,
+                                           chunk_size=2)
+        self.assertEqual(5, totals.purchases)
+        self.assertEqual(1, totals.failed_files)
+        self.assertEqual(20, totals.quantity)
+        self.assertEqual([("BEVG", 10), ("CANF", 5), ("FRZN", 5)], totals.top_product_types())
+        self.assertEqual({"2020-01-23": 20}, dict(totals.daily_quantity))
+
+    def test_tree_reduce(self):
+        """Tests that the tree reduction merges every aggregate, and returns the empty aggregate for none"""
+
+        parts = []
+        for i in range(7):
+            part = PurchaseAggregate()
+            part.purchases = 1
+            part.product_type_counts["BEVG"] = i
+            parts.append(part)
+        totals = aggregate.tree_reduce(parts, PurchaseAggregate())
+        self.assertEqual(7, totals.purchases)
+        self.assertEqual(21, totals.product_type_counts["BEVG"])
+        self.assertEqual(PurchaseAggregate(), aggregate.tree_reduce([], PurchaseAggregate()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import asyncio
+import os
+import unittest
+
+from HalfFoodsScanner.dataloaders.asyncloader import AsyncTextLoader
+from HalfFoodsScanner.dataloaders.textloader import TextLoader
+
+
+class TestAsyncTextLoaderMethods(unittest.IsolatedAsyncioTestCase):
+
+    # SETUP
+    product_key = {
+        "BEVG": "Beverages",
+        "CANF": "Canned Foods",
+        "FRZN": "Frozen Foods",
+    }
+    test_dir = os.path.dirname(__file__)
+
+    async def test_load_data_async(self):
+        """Tests that an async load gives the same result as TextLoader"""
+
+        data_path = os.path.join(self.test_dir, "CustomerError.txt")
+        result = await AsyncTextLoader().load_data_async(self.product_key, data_path)
+        self.assertEqual(TextLoader().load_data(self.product_key, data_path), result)
+
+    async def test_iter_load(self):
+        """Tests that many files are loaded concurrently and a failure is returned with its path"""
+
+        data_paths = [os.path.join(self.test_dir, "CustomerG.txt")] * 20
+        data_paths.append(os.path.join(self.test_dir, "Missing.txt"))
+
+        results = [result async for result in AsyncTextLoader(max_concurrency=4).iter_load(
+            self.product_key, data_paths, return_exceptions=True)]
+
+        self.assertEqual(21, len(results))
+        errors = [(path, result) for path, result in results if isinstance(result, Exception)]
+        self.assertEqual(1, len(errors))
+        self.assertTrue(errors[0][0].endswith("Missing.txt"))
+        self.assertIsInstance(errors[0][1], FileNotFoundError)
+
+    async def test_iter_load_bounded(self):
+        """Tests that paths are read as files finish, rather than all before the first file loads"""
+
+        data_path = os.path.join(self.test_dir, "CustomerG.txt")
+        read = 0
+        most_ahead = 0
+
+        def paths():
+            nonlocal read
+            for _ in range(50):
+                read += 1
+                yield data_path
+
+        loaded = 0
+        async for _ in AsyncTextLoader(max_concurrency=2).iter_load(self.product_key, paths()):
+            loaded += 1
+            most_ahead = max(most_ahead, read - loaded)
+        self.assertEqual(50, loaded)
+        self.assertLessEqual(most_ahead, 4)
+
+    async def test_iter_load_raises(self):
+        """Tests that a failure is raised when exceptions are not returned"""
+
+        data_paths = [os.path.join(self.test_dir, "Missing.txt")]
+        with self.assertRaises(FileNotFoundError):
+            async for _ in AsyncTextLoader().iter_load(self.product_key, data_paths):
+                pass
+
+    async def test_event_loop_not_blocked(self):
+        """Tests that other coroutines keep running while files load"""
+
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        ticker_task = asyncio.create_task(ticker())
+        data_paths = [os.path.join(self.test_dir, "CustomerG.txt")] * 50
+        async for _ in AsyncTextLoader().iter_load(self.product_key, data_paths):
+            pass
+        ticker_task.cancel()
+        self.assertGreater(ticks, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
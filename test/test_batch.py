@@ -0,0 +1,74 @@
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+
+from HalfFoodsScanner.__main__ import init_product_key
+from HalfFoodsScanner.dataloaders.textloader import TextLoader
+from HalfFoodsScanner.jobs import batch
+from HalfFoodsScanner.storage.columnar import write_purchases
+
+
+class TestBatchMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        test_dir = os.path.dirname(__file__)
+        for name in ["CustomerG.txt", "CustomerError.txt"]:
+            shutil.copy(os.path.join(test_dir, name), self.data_dir)
+        with open(os.path.join(self.data_dir, "Malformed.txt"), "w") as f:
+            f.write("not a header\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def test_find_customer_files(self):
+        """Tests that directories and glob patterns both find the customer files"""
+
+        self.assertEqual(3, len(batch.find_customer_files(self.data_dir)))
+        self.assertEqual(2, len(batch.find_customer_files(os.path.join(self.data_dir, "Customer*.txt"))))
+
+    def test_scan_file(self):
+        """Tests the summary of a single file"""
+
+        summary = batch.scan_file(init_product_key(), os.path.join(self.data_dir, "CustomerError.txt"))
+        self.assertEqual("Jamie", summary["customer_name"])
+        self.assertEqual("2020-01-23", summary["purchase_date"])
+        self.assertEqual(4, summary["quantity"])
+        self.assertEqual({"BEVG": 2, "CANF": 1, "FRZN": 1}, summary["product_types"])
+        self.assertEqual("Beverages", summary["most_common"])
+
+    def test_other_formats(self):
+        """Tests that compressed and columnar files are scanned the same as text files, and can be picked by pattern"""
+
+        product_key = init_product_key()
+        text_path = os.path.join(self.data_dir, "CustomerError.txt")
+        with open(text_path, "rb") as source, gzip.open(text_path + ".gz", "wb") as target:
+            shutil.copyfileobj(source, target)
+        write_purchases(os.path.join(self.data_dir, "CustomerError.hfcol"),
+                        [TextLoader().load_data(product_key, text_path)])
+
+        self.assertEqual(3, len(batch.find_customer_files(self.data_dir)))
+        data_paths = batch.find_customer_files(self.data_dir, "CustomerError.*")
+        self.assertEqual(3, len(data_paths))
+        expected = batch.scan_file(product_key, text_path)
+        del expected["path"]
+        for summary in batch.scan_files(product_key, data_paths, workers=1, instrument=True):
+            self.assertNotIn("error", summary)
+            stats = summary.pop("stats")
+            self.assertEqual(0 if summary.pop("path").endswith(".hfcol") else 1, stats["files"])
+            self.assertEqual(expected, summary)
+
+    def test_malformed_file_does_not_stop_batch(self):
+        """Tests that a malformed file is reported and the other files are still scanned"""
+
+        summaries = list(batch.scan_files(init_product_key(), batch.find_customer_files(self.data_dir), workers=2))
+        self.assertEqual(3, len(summaries))
+        errors = [summary for summary in summaries if "error" in summary]
+        self.assertEqual(1, len(errors))
+        self.assertTrue(errors[0]["path"].endswith("Malformed.txt"))
+
+
+if __name__ == "__main__":
+    unittest.main()
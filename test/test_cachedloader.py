@@ -0,0 +1,111 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from HalfFoodsScanner.dataloaders.cachedloader import CACHE_SUFFIX, CachedLoader
+from HalfFoodsScanner.dataloaders.correction import CorrectionEngine
+from HalfFoodsScanner.dataloaders.tailloader import TailLoader
+from HalfFoodsScanner.dataloaders.textloader import TextLoader
+
+
+class TestCachedLoaderMethods(unittest.TestCase):
+
+    # SETUP
+    product_key = {
+        "BEVG": "Beverages",
+        "CANF": "Canned Foods",
+        "FRZN": "Frozen Foods",
+    }
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.temp_dir, "cache")
+        self.data_path = os.path.join(self.temp_dir, "Customer.txt")
+        shutil.copy(os.path.join(os.path.dirname(__file__), "CustomerError.txt"), self.data_path)
+
+        self.text_loader = TextLoader()
+        self.text_loader.load_data = mock.Mock(wraps=self.text_loader.load_data)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_repeat_load_uses_cache(self):
+        """Tests that the second load of a file is read from the cache"""
+
+        loader = CachedLoader(self.text_loader, self.cache_dir)
+        first = loader.load_data(self.product_key, self.data_path)
+        second = loader.load_data(self.product_key, self.data_path)
+
+        self.assertEqual(1, self.text_loader.load_data.call_count)
+        self.assertEqual(first, second)
+        self.assertEqual(first.get_advanced_purchase_information(self.product_key),
+                         second.get_advanced_purchase_information(self.product_key))
+
+    def test_file_change_invalidates(self):
+        """Tests that changing the file parses it again"""
+
+        loader = CachedLoader(self.text_loader, self.cache_dir)
+        loader.load_data(self.product_key, self.data_path)
+        with open(self.data_path, "a") as f:
+            f.write("\nCANFAAAAAAXXXXXXXXXXXXXXXXXXXX")
+
+        result = loader.load_data(self.product_key, self.data_path)
+        self.assertEqual(2, self.text_loader.load_data.call_count)
+        self.assertEqual(5, result.quantity)
+
+    def test_product_key_change_invalidates(self):
+        """Tests that adding a product type parses the file again"""
+
+        loader = CachedLoader(self.text_loader, self.cache_dir)
+        loader.load_data(self.product_key, self.data_path)
+        product_key = dict(self.product_key, MISC="Misc")
+
+        loader.load_data(product_key, self.data_path)
+        self.assertEqual(2, self.text_loader.load_data.call_count)
+
+    def test_loader_settings_invalidate(self):
+        """Tests that differently configured loaders sharing a cache directory each get their own results"""
+
+        product_key = {"BEVG": "Beverages", "FRZN": "Frozen Foods", "FRVG": "Fruits and Vegetables"}
+        with open(self.data_path, "w") as f:
+            f.write("01232020Jamie\nFRVNAAAAAAID1\nBEVGBBBBBBID2\nFRVGCCCCCCID3\nFRVGCCCCCCID4\n")
+
+        plain = CachedLoader(TextLoader(), self.cache_dir).load_data(product_key, self.data_path)
+        corrected = CachedLoader(TextLoader(corrections=CorrectionEngine()), self.cache_dir)
+        self.assertEqual(["ID1"], plain.product_type_history["FRZN"])
+        self.assertEqual(["ID1", "ID3", "ID4"], corrected.load_data(product_key, self.data_path)
+                         .product_type_history["FRVG"])
+        self.assertEqual(plain, CachedLoader(TextLoader(), self.cache_dir).load_data(product_key, self.data_path))
+
+        with self.assertRaises(ValueError):
+            CachedLoader(TextLoader(corrections=CorrectionEngine(global_frequencies=True)), self.cache_dir)
+        with self.assertRaises(ValueError):
+            CachedLoader(TailLoader(), self.cache_dir)
+
+    def test_eviction(self):
+        """Tests that the cache is kept within its size limit"""
+
+        loader = CachedLoader(self.text_loader, self.cache_dir, max_bytes=1)
+        loader.load_data(self.product_key, self.data_path)
+        loader.load_data(dict(self.product_key, MISC="Misc"), self.data_path)
+
+        entries = [name for name in os.listdir(self.cache_dir) if name.endswith(CACHE_SUFFIX)]
+        self.assertEqual([], entries)
+
+    def test_corrupt_entry(self):
+        """Tests that a damaged cache entry is parsed again instead of failing"""
+
+        loader = CachedLoader(self.text_loader, self.cache_dir)
+        expected = loader.load_data(self.product_key, self.data_path)
+        for name in os.listdir(self.cache_dir):
+            with open(os.path.join(self.cache_dir, name), "wb") as f:
+                f.write(b"not an entry")
+
+        self.assertEqual(expected, loader.load_data(self.product_key, self.data_path))
+        self.assertEqual(2, self.text_loader.load_data.call_count)
+
+
+if __name__ == "__main__":
+    unittest.main()
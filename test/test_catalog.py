@@ -0,0 +1,125 @@
+import json
+import os
+import pickle
+import sqlite3
+import tempfile
+import unittest
+
+from HalfFoodsScanner.__main__ import init_product_key
+from HalfFoodsScanner.classes.productcatalog import ProductCatalog
+from HalfFoodsScanner.dataloaders.productindex import get_product_key_index
+from HalfFoodsScanner.dataloaders.textloader import TextLoader
+from HalfFoodsScanner.storage.catalog import CatalogError, CatalogReloader, add_catalog_entry, load_catalog
+from HalfFoodsScanner.storage.compiledcatalog import write_compiled_catalog
+
+
+class TestCatalogMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.product_key = init_product_key()
+        self.json_path = os.path.join(self.temp_dir.name, "catalog.json")
+        self.write_json(self.product_key)
+
+    def write_json(self, product_key: dict[str, str]) -> None:
+        with open(self.json_path, "w") as f:
+            json.dump(product_key, f)
+
+    def test_sources(self):
+        """Tests that JSON, SQLite and compiled catalogs load in order and parse the same as a plain product key"""
+
+        sqlite_path = os.path.join(self.temp_dir.name, "catalog.db")
+        for product_type, description in self.product_key.items():
+            add_catalog_entry(sqlite_path, product_type, description)
+        compiled_path = os.path.join(self.temp_dir.name, "catalog.hfc")
+        write_compiled_catalog(compiled_path, self.product_key)
+
+        data_path = os.path.join(os.path.dirname(__file__), "CustomerError.txt")
+        expected = TextLoader().load_data(self.product_key, data_path)
+        for path in (self.json_path, sqlite_path, compiled_path):
+            with self.subTest(path=path):
+                catalog = load_catalog(path)
+                self.assertEqual(list(self.product_key.items()), list(catalog.items()))
+                self.assertIs(catalog.product_key_index, get_product_key_index(catalog))
+                self.assertEqual(expected, TextLoader().load_data(catalog, data_path))
+
+    def test_validation(self):
+        """Tests that every invalid entry is reported, including duplicates in JSON"""
+
+        with open(self.json_path, "w") as f:
+            f.write('{"BEVG": "Beverages", "BEV": "Short", "BEVG": "Again", "CANF": "", "FR Z": "Space"}')
+        with self.assertRaises(CatalogError) as context:
+            load_catalog(self.json_path)
+        self.assertEqual(4, len(context.exception.errors))
+
+        sqlite_path = os.path.join(self.temp_dir.name, "empty.db")
+        sqlite3.connect(sqlite_path).execute("CREATE TABLE other (x)").connection.close()
+        with self.assertRaises(CatalogError):
+            load_catalog(sqlite_path)
+
+    def test_read_only(self):
+        """Tests that catalogs cannot be changed in place, and pickle to an equal catalog"""
+
+        catalog = load_catalog(self.json_path)
+        with self.assertRaises(TypeError):
+            catalog["NEWT"] = "New type"
+        with self.assertRaises(TypeError):
+            catalog.update({"NEWT": "New type"})
+        copy = pickle.loads(pickle.dumps(catalog))
+        self.assertIsInstance(copy, ProductCatalog)
+        self.assertEqual(catalog, copy)
+        self.assertIs(catalog.product_key_index, copy.product_key_index)
+
+    def test_add_entry(self):
+        """Tests that added product types are saved to the source, and invalid or duplicate ones are rejected"""
+
+        add_catalog_entry(self.json_path, "NEWT", "New type")
+        self.assertEqual("New type", load_catalog(self.json_path)["NEWT"])
+        with self.assertRaises(CatalogError):
+            add_catalog_entry(self.json_path, "NEWT", "Again")
+        with self.assertRaises(CatalogError):
+            add_catalog_entry(self.json_path, "TOOLONG", "Long")
+        self.assertEqual(len(self.product_key) + 1, len(load_catalog(self.json_path)))
+
+    def test_add_entry_keeps_mode(self):
+        """Tests that rewriting a JSON source keeps its permissions, and a new source gets the usual ones"""
+
+        os.chmod(self.json_path, 0o644)
+        add_catalog_entry(self.json_path, "NEWT", "New type")
+        self.assertEqual(0o644, os.stat(self.json_path).st_mode & 0o777)
+
+        new_path = os.path.join(self.temp_dir.name, "new.json")
+        umask = os.umask(0o022)
+        try:
+            add_catalog_entry(new_path, "NEWT", "New type")
+        finally:
+            os.umask(umask)
+        self.assertEqual(0o644, os.stat(new_path).st_mode & 0o777)
+
+    def test_reload(self):
+        """Tests that a changed source is reloaded, earlier catalogs are untouched and invalid sources are skipped"""
+
+        reloader = CatalogReloader(self.json_path, check_interval=0)
+        first = reloader.current()
+        self.assertIs(first, reloader.current())
+
+        add_catalog_entry(self.json_path, "NEWT", "New type")
+        second = reloader.current()
+        self.assertIn("NEWT", second)
+        self.assertNotIn("NEWT", first)
+        self.assertEqual(1, reloader.reloads)
+
+        with open(self.json_path, "w") as f:
+            f.write('{"BEVG": ')
+        with self.assertWarns(UserWarning):
+            self.assertIs(second, reloader.current())
+        self.assertIsInstance(reloader.error, ValueError)
+
+        self.write_json({"BEVG": "Beverages"})
+        self.assertEqual({"BEVG": "Beverages"}, reloader.current())
+        self.assertIsNone(reloader.error)
+
+
+if __name__ == '__main__':
+    unittest.main()
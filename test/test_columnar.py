@@ -0,0 +1,96 @@
+import os
+import tempfile
+import unittest
+
+from benchmarks.datagen import generate_customer_file, generate_product_key
+from HalfFoodsScanner.dataloaders.textloader import TextLoader
+from HalfFoodsScanner.classes.compactpurchaseinfo import CompactPurchaseInfo
+from HalfFoodsScanner.storage.columnar import ColumnarFile, write_purchases
+
+
+class TestColumnarMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.product_key = generate_product_key(11, seed=1)
+        self.purchases = []
+        for seed in range(3):
+            data_path = os.path.join(self.temp_dir.name, f"Customer{seed}.txt")
+            generate_customer_file(data_path, self.product_key, 500, corruption_rate=0.1, seed=seed)
+            self.purchases.append(TextLoader().load_data(self.product_key, data_path))
+        self.columnar_path = os.path.join(self.temp_dir.name, "purchases.hfcol")
+
+    def test_round_trip(self):
+        """Tests that every purchase reads back the same as it was written"""
+
+        self.assertEqual(3, write_purchases(self.columnar_path, self.purchases))
+        with ColumnarFile(self.columnar_path) as columnar:
+            self.assertEqual(3, len(columnar))
+            for purchase_info, purchase in zip(self.purchases, columnar):
+                self.assertEqual(purchase_info, purchase.to_purchase_info())
+                self.assertEqual(purchase_info.customer_name, purchase.customer_name)
+                self.assertEqual(list(purchase_info.product_type_history), list(purchase.product_type_history))
+
+    def test_reports(self):
+        """Tests that the report methods and counts match the parsed purchase"""
+
+        purchase_info = self.purchases[0]
+        write_purchases(self.columnar_path, [CompactPurchaseInfo.from_purchase_info(purchase_info)])
+        with ColumnarFile(self.columnar_path) as columnar:
+            purchase = columnar[0]
+            self.assertEqual(purchase_info.get_basic_purchase_information(), purchase.get_basic_purchase_information())
+            self.assertEqual(purchase_info.get_advanced_purchase_information(self.product_key),
+                             purchase.get_advanced_purchase_information(self.product_key))
+            for product_type in list(self.product_key) + ["QQQQ"]:
+                # Subtypes are sets, so the order they are listed in may differ
+                self.assertEqual(set(purchase_info.get_subtypes(product_type).removeprefix("Subtypes: ").split(", ")),
+                                 set(purchase.get_subtypes(product_type).removeprefix("Subtypes: ").split(", ")))
+            self.assertEqual({product_type: len(id_list)
+                              for product_type, id_list in purchase_info.product_type_history.items()},
+                             purchase.product_type_counts())
+            for product_type, id_list in purchase_info.product_type_history.items():
+                self.assertEqual(id_list[-1], purchase.product_type_history[product_type][-1])
+
+    def test_empty_columns(self):
+        """Tests that purchases whose IDs or subtypes are all empty read back as empty strings"""
+
+        product_key = {"BEVG": "Beverages", "CANF": "Canned Foods"}
+        purchases = []
+        for name, lines in (("NoIDs", "BEVGAAAAAA\nBEVGBBBBBB\nCANFAAAAAA\n"), ("NoSubtypes", "BEVG\nBEVG\n")):
+            data_path = os.path.join(self.temp_dir.name, f"{name}.txt")
+            with open(data_path, "w") as f:
+                f.write("01232020Jamie\n" + lines)
+            purchases.append(TextLoader().load_data(product_key, data_path))
+
+        write_purchases(self.columnar_path, purchases)
+        with ColumnarFile(self.columnar_path) as columnar:
+            for purchase_info, purchase in zip(purchases, columnar):
+                self.assertEqual(purchase_info, purchase.to_purchase_info())
+                self.assertEqual(["", ""], list(purchase.product_type_history["BEVG"]))
+
+    def test_mode(self):
+        """Tests that a new columnar file gets the usual permissions, and a replaced one keeps its own"""
+
+        umask = os.umask(0o022)
+        try:
+            write_purchases(self.columnar_path, self.purchases)
+        finally:
+            os.umask(umask)
+        self.assertEqual(0o644, os.stat(self.columnar_path).st_mode & 0o777)
+
+        os.chmod(self.columnar_path, 0o640)
+        write_purchases(self.columnar_path, self.purchases)
+        self.assertEqual(0o640, os.stat(self.columnar_path).st_mode & 0o777)
+
+    def test_not_columnar(self):
+        """Tests that other files are refused"""
+
+        with open(self.columnar_path, "wb") as f:
+            f.write(b"01232020Jamie\n" * 4)
+        with self.assertRaises(ValueError):
+            ColumnarFile(self.columnar_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
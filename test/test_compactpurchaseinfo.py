@@ -0,0 +1,99 @@
+import datetime
+import random
+import string
+import unittest
+from unittest import mock
+
+from HalfFoodsScanner.classes.compactpurchaseinfo import CompactPurchaseInfo
+from HalfFoodsScanner.dataloaders.textloader import TextLoader
+
+
+def add_item(purchase_info: CompactPurchaseInfo, product_type: str, subtype: str, product_id: str) -> None:
+    """Adds an item the way the loaders do"""
+    purchase_info.quantity += 1
+    if product_type is not None:
+        purchase_info.product_type_history[product_type].append(product_id)
+        purchase_info.subtype_lookup[product_type].add(subtype)
+
+
+class TestCompactPurchaseInfoMethods(unittest.TestCase):
+
+    # SETUP
+    product_key = {
+        "BEVG": "Beverages",
+        "BAKE": "Baked Goods",
+        "CANF": "Canned Foods",
+        "FRZN": "Frozen Foods",
+        "GRPA": "Grains/Pastas",
+        "MISC": "Misc",
+    }
+    name_line = "05011984Joseph"
+
+    def load(self, mock_data: str, compact: bool):
+        mock_open = mock.mock_open(read_data=mock_data)
+        with mock.patch("builtins.open", mock_open):
+            return TextLoader(compact=compact).load_data(self.product_key, "filename")
+
+    def test_same_as_purchase_info(self):
+        """Tests that compact storage holds the same information and gives the same reports"""
+
+        # SETUP
+        mock_list = [self.name_line]
+        for _ in range(200):
+            ptype = random.choice(list(self.product_key) + ["FFFF", "GRPX"])
+            stype = "".join(random.choices("ABC", k=6))
+            id = "".join(random.choices(string.ascii_uppercase, k=20))
+            mock_list.append(f"{ptype}{stype}{id}")
+        mock_data = "\n".join(mock_list)
+
+        expected = self.load(mock_data, compact=False)
+        result = self.load(mock_data, compact=True)
+        self.assertIsInstance(result, CompactPurchaseInfo)
+        self.assertEqual(expected, result)
+        self.assertEqual(expected, result.to_purchase_info())
+        self.assertEqual(expected.get_basic_purchase_information(), result.get_basic_purchase_information())
+        self.assertEqual(expected.get_advanced_purchase_information(self.product_key),
+                         result.get_advanced_purchase_information(self.product_key))
+        self.assertEqual("Product Type not found", result.get_subtypes("CNSB"))
+
+    def test_mixed_id_widths(self):
+        """Tests that IDs of different lengths are kept intact"""
+
+        compact = CompactPurchaseInfo("Joseph", datetime.datetime(1984, 5, 1))
+        ids = ["A" * 20, "B" * 20, "C" * 5, "", "D" * 25]
+        for id in ids:
+            add_item(compact, "MISC", "AAAAAA", id)
+        add_item(compact, None, "AAAAAA", "E" * 20)
+
+        self.assertEqual(ids, list(compact.product_type_history["MISC"]))
+        self.assertEqual("D" * 25, compact.product_type_history["MISC"][-1])
+        self.assertEqual({"AAAAAA"}, compact.subtype_lookup["MISC"])
+        self.assertEqual(6, compact.quantity)
+
+    def test_from_purchase_info(self):
+        """Tests copying a PurchaseInfo into compact storage"""
+
+        expected = self.load(f"{self.name_line}\nGRPAAAAAAA{'X' * 20}\nGRPABBBBBB{'Y' * 20}", compact=False)
+        self.assertEqual(expected, CompactPurchaseInfo.from_purchase_info(expected))
+
+    def test_clear(self):
+        """Tests that a cleared purchase drops its stored subtypes, and is the same as a new one once refilled"""
+
+        compact = CompactPurchaseInfo("Joseph", datetime.datetime(1984, 5, 1))
+        for subtype in ("AAAAAA", "BBBBBB", "CCCCCC"):
+            add_item(compact, "MISC", subtype, "X" * 20)
+        compact.clear()
+        self.assertEqual(0, len(compact._subtype_values))
+        self.assertEqual({}, compact._subtype_numbers)
+        self.assertIsNone(compact.most_common_product_type())
+
+        add_item(compact, "BEVG", "DDDDDD", "Y" * 20)
+        expected = CompactPurchaseInfo("Joseph", datetime.datetime(1984, 5, 1))
+        add_item(expected, "BEVG", "DDDDDD", "Y" * 20)
+        self.assertEqual(expected, compact)
+        self.assertEqual(["DDDDDD"], list(compact._subtype_values))
+        self.assertEqual("BEVG", compact.most_common_product_type())
+
+
+if __name__ == "__main__":
+    unittest.main()
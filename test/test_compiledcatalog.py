@@ -0,0 +1,76 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from benchmarks.datagen import generate_product_key
+from HalfFoodsScanner.__main__ import init_product_key, serve
+from HalfFoodsScanner.dataloaders.productindex import get_product_key_index
+from HalfFoodsScanner.storage.compiledcatalog import read_compiled_catalog, write_compiled_catalog
+
+
+class TestCompiledCatalogMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.catalog_path = os.path.join(self.temp_dir.name, "catalog.hfc")
+
+    def test_round_trip(self):
+        """Tests that a compiled catalog reads back in order, and owns its index instead of building a new one"""
+
+        product_key = generate_product_key(200, seed=4)
+        self.assertEqual(200, write_compiled_catalog(self.catalog_path, product_key))
+
+        read_key = read_compiled_catalog(self.catalog_path)
+        self.assertEqual(list(product_key.items()), list(read_key.items()))
+        index = get_product_key_index(read_key)
+        self.assertIs(read_key.product_key_index, index)
+        self.assertIsNot(index, read_compiled_catalog(self.catalog_path).product_key_index)
+        self.assertEqual(0, index.misses)
+        corrupted = "#" + next(iter(product_key))[1:]
+        self.assertEqual(next(iter(product_key)), index.correct(corrupted))
+
+    def test_mode(self):
+        """Tests that a new compiled catalog gets the usual permissions, and a replaced one keeps its own"""
+
+        umask = os.umask(0o022)
+        try:
+            write_compiled_catalog(self.catalog_path, init_product_key())
+        finally:
+            os.umask(umask)
+        self.assertEqual(0o644, os.stat(self.catalog_path).st_mode & 0o777)
+
+        os.chmod(self.catalog_path, 0o640)
+        write_compiled_catalog(self.catalog_path, init_product_key())
+        self.assertEqual(0o640, os.stat(self.catalog_path).st_mode & 0o777)
+
+    def test_not_a_catalog(self):
+        """Tests that files that are not compiled catalogs are rejected"""
+
+        with open(self.catalog_path, "wb") as f:
+            f.write(b"BEVG,Beverages\n")
+        with self.assertRaises(ValueError):
+            read_compiled_catalog(self.catalog_path)
+
+    def test_serve(self):
+        """Tests that serve prints one summary per path read, and reports files that cannot be loaded"""
+
+        test_path = os.path.join(os.path.dirname(__file__), "CustomerG.txt")
+        missing_path = os.path.join(self.temp_dir.name, "Missing.txt")
+        stdout = io.StringIO()
+        with mock.patch("sys.stdin", io.StringIO(f"{test_path}\n\n{missing_path}\n")), \
+                mock.patch("sys.stdout", stdout):
+            exit_code = serve(init_product_key(), cache=False)
+
+        summaries = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual(1, exit_code)
+        self.assertEqual([test_path, missing_path], [summary["path"] for summary in summaries])
+        self.assertEqual(4, summaries[0]["quantity"])
+        self.assertIn("FileNotFoundError", summaries[1]["error"])
+
+
+if __name__ == '__main__':
+    unittest.main()
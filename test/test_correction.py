@@ -0,0 +1,105 @@
+import unittest
+from collections import defaultdict
+
+from HalfFoodsScanner.dataloaders.correction import CorrectionEngine, CorrectionStats
+from HalfFoodsScanner.dataloaders.textloader import TextLoader
+from HalfFoodsScanner.classes.purchaseinfo import PurchaseInfo
+
+
+class TestCorrectionEngineMethods(unittest.TestCase):
+
+    # SETUP
+    product_key = {
+        "BEVG": "Beverages",
+        "FRZN": "Frozen Foods",
+        "FRVG": "Fruits/Vegetables",
+    }
+
+    # FRVN is within two characters of both FRZN and FRVG, QQQQ is close to nothing
+    lines = [
+        "FRVNAAAAAAID00000000000000000001\n",
+        "FRVGBBBBBBID00000000000000000002\n",
+        "BEVGCCCCCCID00000000000000000003\n",
+        "FRVNBBBBBBID00000000000000000004\n",
+        "FRVGBBBBBBID00000000000000000005\n",
+        "QQQQDDDDDDID00000000000000000006\n",
+        "BEVXCCCCCCID00000000000000000007\n",
+    ]
+
+    def parse(self, engine: CorrectionEngine, lines: list[str]) -> PurchaseInfo:
+        purchase_info = PurchaseInfo("Joseph", None, 0, defaultdict(list), defaultdict(set))
+        TextLoader(corrections=engine).parse_products(self.product_key, lines, purchase_info)
+        return purchase_info
+
+    def test_ambiguous_lines_go_to_most_frequent(self):
+        """Tests that ambiguous lines go to the more frequent product type, in file order"""
+
+        engine = CorrectionEngine()
+        purchase_info = self.parse(engine, self.lines)
+
+        self.assertEqual(7, purchase_info.quantity)
+        self.assertEqual(["FRVG", "BEVG"], list(purchase_info.product_type_history))
+        self.assertEqual([f"ID{n:020}" for n in [1, 2, 4, 5]], purchase_info.product_type_history["FRVG"])
+        self.assertEqual([f"ID{n:020}" for n in [3, 7]], purchase_info.product_type_history["BEVG"])
+        self.assertEqual(CorrectionStats(corrected=1, ambiguous=2, dropped=1), engine.stats)
+
+    def test_ambiguous_line_before_exact_line(self):
+        """Tests that a product type first seen on an ambiguous line keeps its place when it is named exactly later"""
+
+        engine = CorrectionEngine()
+        purchase_info = self.parse(engine, [
+            "FRVNAAAAAAID1\n",
+            "BEVGBBBBBBID2\n",
+            "FRVGCCCCCCID3\n",
+            "FRVGCCCCCCID4\n",
+        ])
+
+        self.assertEqual(["FRVG", "BEVG"], list(purchase_info.product_type_history))
+        self.assertEqual(["ID1", "ID3", "ID4"], purchase_info.product_type_history["FRVG"])
+        self.assertEqual(["FRVG", "BEVG"], list(purchase_info.subtype_lookup))
+
+    def test_iter_products_matches_parse_products(self):
+        """Tests that iter_products corrects lines the same way as parse_products without an engine"""
+
+        loader = TextLoader()
+        purchase_info = PurchaseInfo("Joseph", None, 0, defaultdict(list), defaultdict(set))
+        loader.parse_products(self.product_key, self.lines, purchase_info)
+
+        history = defaultdict(list)
+        for product_type, _, product_id in loader.iter_products(self.product_key, self.lines):
+            if product_type is not None:
+                history[product_type].append(product_id)
+        self.assertEqual(purchase_info.product_type_history, history)
+        self.assertEqual(["FRZN", "FRVG", "BEVG"], list(history))
+
+    def test_subtype_catalog(self):
+        """Tests that a known subtype outweighs frequency"""
+
+        engine = CorrectionEngine(subtype_catalog={"FRZN": {"AAAAAA"}, "FRVG": {"BBBBBB"}})
+        purchase_info = self.parse(engine, self.lines)
+
+        self.assertEqual(["FRZN", "FRVG", "BEVG"], list(purchase_info.product_type_history))
+        self.assertEqual(["ID00000000000000000001"], purchase_info.product_type_history["FRZN"])
+        self.assertEqual({"AAAAAA"}, purchase_info.subtype_lookup["FRZN"])
+
+    def test_global_frequencies(self):
+        """Tests that counts from earlier files decide ties in a file with no counts of its own"""
+
+        engine = CorrectionEngine(global_frequencies=True)
+        self.parse(engine, ["FRZNAAAAAAID00000000000000000001\n"] * 3)
+        purchase_info = self.parse(engine, ["FRVNAAAAAAID00000000000000000001\n"])
+        self.assertEqual(["FRZN"], list(purchase_info.product_type_history))
+
+        # Without global frequencies the first product type in the key wins an even tie
+        engine = CorrectionEngine(frequencies={"FRVG": 1})
+        self.assertEqual(["FRVG"], list(self.parse(engine, ["FRVNAAAAAAID00000000000000000001\n"]).product_type_history))
+
+    def test_compact_not_supported(self):
+        """Tests that a CorrectionEngine is refused in compact mode"""
+
+        with self.assertRaises(ValueError):
+            TextLoader(compact=True, corrections=CorrectionEngine())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import os
+import tempfile
+import unittest
+
+from benchmarks.datagen import generate_customer_file, generate_product_key
+from HalfFoodsScanner.dataloaders.textloader import TextLoader
+
+
+class TestDatagenMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+    def generate(self, name: str, product_key: dict[str, str], **kwargs) -> str:
+        data_path = os.path.join(self.temp_dir.name, name)
+        generate_customer_file(data_path, product_key, **kwargs)
+        return data_path
+
+    def test_deterministic(self):
+        """Tests that the same seed always generates the same data"""
+
+        self.assertEqual(generate_product_key(100, seed=3), generate_product_key(100, seed=3))
+        product_key = generate_product_key(100, seed=3)
+        first = self.generate("first.txt", product_key, lines=500, corruption_rate=0.1, seed=3)
+        second = self.generate("second.txt", product_key, lines=500, corruption_rate=0.1, seed=3)
+        with open(first) as f, open(second) as g:
+            self.assertEqual(f.read(), g.read())
+
+    def test_parameters(self):
+        """Tests that the catalog size, line count and distinct product types are respected"""
+
+        product_key = generate_product_key(50)
+        self.assertEqual(50, len(product_key))
+        data_path = self.generate("customer.txt", product_key, lines=1000, product_types=3)
+        result = TextLoader().load_data(product_key, data_path)
+        self.assertEqual(1000, result.quantity)
+        self.assertEqual(set(list(product_key)[:3]), set(result.product_type_history))
+
+
+if __name__ == "__main__":
+    unittest.main()
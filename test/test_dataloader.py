@@ -1,10 +1,14 @@
 import datetime
+import os
 import random
 import string
+import time
 import unittest
 from unittest import mock
 from unittest.mock import patch, mock_open
 
+from HalfFoodsScanner.dataloaders.helpers import MalformedHeaderError, parse_header
+from HalfFoodsScanner.dataloaders.instrumentation import LoaderStats
 from HalfFoodsScanner.dataloaders.textloader import TextLoader
 from HalfFoodsScanner.classes.purchaseinfo import PurchaseInfo
 
@@ -227,6 +231,79 @@ class TestTextLoaderMethods(unittest.TestCase):
                                                        "filename")
             self.assertEqual(100, len(result.product_type_history["GRPA"]))
 
+    def test_streaming_does_not_read_all_lines(self):
+        """Tests that product lines are parsed as they are read instead of all at once"""
+
+        # SETUP
+        mock_list = [self.name_line]
+        for key in self.product_key.keys():
+            subtype = "".join(random.choices(string.ascii_uppercase, k=6))
+            id = "".join(random.choices(string.ascii_uppercase, k=20))
+            mock_list.append(f"{key}{subtype}{id}")
+
+        mock_data = "\n".join(mock_list)
+        my_loader = TextLoader()
+        mock_open = mock.mock_open(read_data=mock_data)
+        with mock.patch("builtins.open", mock_open):
+            result: PurchaseInfo = my_loader.load_data(self.product_key,
+                                                       "filename")
+            mock_open().readlines.assert_not_called()
+            self.assertEqual(11, result.quantity)
+
+    def test_sample_file(self):
+        """Tests the sample file with a corrupted product type"""
+
+        data_path = os.path.join(os.path.dirname(__file__), "CustomerError.txt")
+        result: PurchaseInfo = TextLoader().load_data(self.product_key,
+                                                      data_path)
+        self.assertEqual(4, result.quantity)
+        self.assertEqual("Jamie", result.customer_name)
+        self.assertEqual(["GJHGTFBNGDVZJGDIPXVS", "IHDCZIPWLZJLPDSGNEAH"],
+                         result.product_type_history["BEVG"])
+        self.assertEqual({"DNSKAV"}, result.subtype_lookup["CANF"])
+
+    def test_malformed_header(self):
+        """Tests that headers without a valid MMDDYYYY date are reported as malformed"""
+
+        for name_line in ["", "Joseph", "1232020Jamie", "02302020Jamie", "+1011999Jamie"]:
+            with mock.patch("builtins.open", mock.mock_open(read_data=name_line + "\nFRZNAAAAAAID")):
+                with self.assertRaises(MalformedHeaderError):
+                    TextLoader().load_data(self.product_key, "filename")
+
+        # Still a ValueError, for callers that caught the error strptime raised
+        self.assertTrue(issubclass(MalformedHeaderError, ValueError))
+        self.assertEqual((datetime.datetime(2020, 2, 29), "Jamie"), parse_header("02292020Jamie\n"))
+
+    def test_stats(self):
+        """Tests that a LoaderStats records the line counts, size and timings of each load"""
+
+        data_path = os.path.join(os.path.dirname(__file__), "CustomerError.txt")
+        stats = LoaderStats()
+        loader = TextLoader(stats=stats)
+        expected = TextLoader().load_data(self.product_key, data_path)
+        self.assertEqual(expected, loader.load_data(self.product_key, data_path))
+        loader.load_data(self.product_key, data_path)
+
+        self.assertEqual(2, stats.files)
+        self.assertEqual(2 * os.path.getsize(data_path), stats.bytes_read)
+        self.assertEqual((8, 6, 2, 0), (stats.lines, stats.exact_lines, stats.corrected_lines, stats.dropped_lines))
+        self.assertGreater(stats.parse_seconds, 0)
+        self.assertEqual([data_path, data_path], [path for _, path in stats.slowest_files])
+
+    def test_stats_header_includes_open(self):
+        """Tests that the header time of a file includes opening it"""
+
+        data_path = os.path.join(os.path.dirname(__file__), "CustomerError.txt")
+        stats = LoaderStats()
+
+        def slow_open(*args, **kwargs):
+            time.sleep(0.05)
+            return open(*args, **kwargs)
+
+        with mock.patch("HalfFoodsScanner.dataloaders.textloader.open", slow_open, create=True):
+            TextLoader(stats=stats).load_data(self.product_key, data_path)
+        self.assertGreaterEqual(stats.header_seconds, 0.05)
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,79 @@
+import os
+import random
+import string
+import tempfile
+import unittest
+
+from HalfFoodsScanner.dataloaders.mmaploader import MmapLoader
+from HalfFoodsScanner.dataloaders.textloader import TextLoader
+
+
+class TestMmapLoaderMethods(unittest.TestCase):
+
+    # SETUP
+    product_key = {
+        "BEVG": "Beverages",
+        "BAKE": "Baked Goods",
+        "CANF": "Canned Foods",
+        "CNSB": "Condiments/Spices/Baking",
+        "SNCN": "Snacks/Candy",
+        "DREG": "Dairy/Eggs",
+        "FRZN": "Frozen Foods",
+        "FRVG": "Fruits/Vegetables",
+        "GRPA": "Grains/Pastas",
+        "MTSF": "Meat/Seafood",
+        "MISC": "Misc",
+    }
+    name_line = "05011984Joseph"
+
+    def write_data(self, newline: str) -> str:
+        """Writes a customer file with random and corrupted product lines and returns its path"""
+        lines = [self.name_line]
+        for _ in range(500):
+            ptype = random.choice(list(self.product_key))
+            if random.random() < 0.2:
+                i = random.randrange(4)
+                ptype = ptype[:i] + random.choice(string.ascii_uppercase) + ptype[i + 1:]
+            stype = "".join(random.choices("ABC", k=6))
+            id = "".join(random.choices(string.ascii_uppercase, k=20))
+            lines.append(f"{ptype}{stype}{id}")
+
+        fd, data_path = tempfile.mkstemp(suffix=".txt")
+        with os.fdopen(fd, "w", newline="") as f:
+            f.write(newline.join(lines))
+        self.addCleanup(os.remove, data_path)
+        return data_path
+
+    def assert_same_as_text_loader(self, data_path: str):
+        expected = TextLoader().load_data(self.product_key, data_path)
+        result = MmapLoader().load_data(self.product_key, data_path)
+        self.assertEqual(expected, result)
+        self.assertEqual(list(expected.product_type_history), list(result.product_type_history))
+
+    def test_matches_text_loader(self):
+        """Tests that files parse the same as with TextLoader"""
+
+        self.assert_same_as_text_loader(self.write_data("\n"))
+
+    def test_windows_newlines(self):
+        """Tests that files with Windows newlines parse the same as with TextLoader"""
+
+        self.assert_same_as_text_loader(self.write_data("\r\n"))
+
+    def test_carriage_return_newlines(self):
+        """Tests that files with carriage return newlines parse the same as with TextLoader"""
+
+        self.assert_same_as_text_loader(self.write_data("\r"))
+
+    def test_empty_file(self):
+        """Tests that an empty file is reported as a bad header"""
+
+        fd, data_path = tempfile.mkstemp(suffix=".txt")
+        os.close(fd)
+        self.addCleanup(os.remove, data_path)
+        with self.assertRaises(ValueError):
+            MmapLoader().load_data(self.product_key, data_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
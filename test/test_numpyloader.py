@@ -0,0 +1,84 @@
+import os
+import random
+import string
+import tempfile
+import unittest
+
+from HalfFoodsScanner.dataloaders import numpyloader
+from HalfFoodsScanner.dataloaders.textloader import TextLoader
+
+
+@unittest.skipIf(numpyloader.np is None, "numpy is not installed")
+class TestNumpyLoaderMethods(unittest.TestCase):
+
+    # SETUP
+    product_key = {
+        "BEVG": "Beverages",
+        "BAKE": "Baked Goods",
+        "CANF": "Canned Foods",
+        "CNSB": "Condiments/Spices/Baking",
+        "SNCN": "Snacks/Candy",
+        "DREG": "Dairy/Eggs",
+        "FRZN": "Frozen Foods",
+        "FRVG": "Fruits/Vegetables",
+        "GRPA": "Grains/Pastas",
+        "MTSF": "Meat/Seafood",
+        "MISC": "Misc",
+    }
+    name_line = "05011984Joseph"
+
+    def write_data(self, lines: list[str], newline: str = "\n") -> str:
+        """Writes a customer file and returns its path"""
+        fd, data_path = tempfile.mkstemp(suffix=".txt")
+        with os.fdopen(fd, "w", newline="") as f:
+            f.write(newline.join(lines))
+        self.addCleanup(os.remove, data_path)
+        return data_path
+
+    def random_lines(self, count: int) -> list[str]:
+        """Random product lines, some with corrupted or unknown product types"""
+        lines = [self.name_line]
+        for _ in range(count):
+            ptype = random.choice(list(self.product_key))
+            if random.random() < 0.2:
+                i = random.randrange(4)
+                ptype = ptype[:i] + random.choice(string.ascii_uppercase) + ptype[i + 1:]
+            stype = "".join(random.choices("ABC", k=6))
+            id = "".join(random.choices(string.ascii_uppercase, k=20))
+            lines.append(f"{ptype}{stype}{id}")
+        return lines
+
+    def assert_same_as_text_loader(self, data_path: str):
+        expected = TextLoader().load_data(self.product_key, data_path)
+        result = numpyloader.NumpyLoader().load_data(self.product_key, data_path)
+        self.assertEqual(expected, result)
+        self.assertEqual(list(expected.product_type_history), list(result.product_type_history))
+
+    def test_matches_text_loader(self):
+        """Tests that fixed-width files parse the same as with TextLoader"""
+
+        self.assert_same_as_text_loader(self.write_data(self.random_lines(1000)))
+
+    def test_windows_newlines(self):
+        """Tests that files with Windows newlines parse the same as with TextLoader"""
+
+        self.assert_same_as_text_loader(self.write_data(self.random_lines(100), newline="\r\n"))
+
+    def test_uneven_lines(self):
+        """Tests that files whose lines are not all the same width parse the same as with TextLoader"""
+
+        lines = self.random_lines(100)
+        lines[10] = lines[10][:15]
+        lines[20] = lines[20] + "  "
+        self.assert_same_as_text_loader(self.write_data(lines))
+
+    def test_no_products(self):
+        """Tests a file with only a header"""
+
+        result = numpyloader.NumpyLoader().load_data(self.product_key, self.write_data([self.name_line, ""]))
+        self.assertEqual(0, result.quantity)
+        self.assertEqual("Joseph", result.customer_name)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import random
+import string
+import tempfile
+import unittest
+
+from HalfFoodsScanner.dataloaders.parallelloader import ParallelTextLoader
+from HalfFoodsScanner.dataloaders.textloader import TextLoader
+
+
+class TestParallelTextLoaderMethods(unittest.TestCase):
+
+    # SETUP
+    product_key = {
+        "BEVG": "Beverages",
+        "BAKE": "Baked Goods",
+        "CANF": "Canned Foods",
+        "FRZN": "Frozen Foods",
+        "GRPA": "Grains/Pastas",
+        "MISC": "Misc",
+    }
+    name_line = "05011984Joseph"
+
+    def write_data(self, newline: str) -> str:
+        """Writes a customer file with random and corrupted product lines and returns its path"""
+        lines = [self.name_line]
+        for _ in range(2000):
+            ptype = random.choice(list(self.product_key) + ["FFFF", "GRPX"])
+            stype = "".join(random.choices("ABC", k=6))
+            id = "".join(random.choices(string.ascii_uppercase, k=20))
+            lines.append(f"{ptype}{stype}{id}")
+
+        fd, data_path = tempfile.mkstemp(suffix=".txt")
+        with os.fdopen(fd, "w", newline="") as f:
+            f.write(newline.join(lines))
+        self.addCleanup(os.remove, data_path)
+        return data_path
+
+    def assert_same_as_text_loader(self, data_path: str, loader: ParallelTextLoader):
+        expected = TextLoader().load_data(self.product_key, data_path)
+        result = loader.load_data(self.product_key, data_path)
+        self.assertEqual(expected, result)
+        self.assertEqual(list(expected.product_type_history), list(result.product_type_history))
+
+    def test_split_ranges(self):
+        """Tests that every range starts at the beginning of a line"""
+
+        data_path = self.write_data("\n")
+        loader = ParallelTextLoader(workers=7, min_range_bytes=1)
+        with open(data_path, "rb") as f:
+            header_end = len(f.readline())
+            data = f.read()
+            bounds = loader.split_ranges(f, header_end, header_end + len(data))
+
+        self.assertEqual(8, len(bounds))
+        self.assertEqual(header_end, bounds[0])
+        self.assertEqual(header_end + len(data), bounds[-1])
+        for boundary in bounds[1:-1]:
+            self.assertEqual(ord("\n"), data[boundary - header_end - 1])
+
+    def test_matches_text_loader(self):
+        """Tests that parsing in several processes gives the same result as TextLoader"""
+
+        self.assert_same_as_text_loader(self.write_data("\n"), ParallelTextLoader(workers=3, min_range_bytes=1))
+
+    def test_windows_newlines(self):
+        """Tests that files with Windows newlines give the same result as TextLoader"""
+
+        self.assert_same_as_text_loader(self.write_data("\r\n"), ParallelTextLoader(workers=3, min_range_bytes=1))
+
+    def test_small_file_in_process(self):
+        """Tests that a file too small to split is parsed without worker processes"""
+
+        self.assert_same_as_text_loader(self.write_data("\n"), ParallelTextLoader(workers=3))
+
+
+if __name__ == "__main__":
+    unittest.main()
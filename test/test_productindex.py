@@ -0,0 +1,79 @@
+import random
+import string
+import unittest
+
+from HalfFoodsScanner.dataloaders.helpers import error_checker
+from HalfFoodsScanner.dataloaders.productindex import ProductKeyIndex, get_product_key_index
+
+
+class TestProductKeyIndexMethods(unittest.TestCase):
+
+    # SETUP
+    product_key = {
+        "BEVG": "Beverages",
+        "BAKE": "Baked Goods",
+        "CANF": "Canned Foods",
+        "CNSB": "Condiments/Spices/Baking",
+        "SNCN": "Snacks/Candy",
+        "DREG": "Dairy/Eggs",
+        "FRZN": "Frozen Foods",
+        "FRVG": "Fruits/Vegetables",
+        "GRPA": "Grains/Pastas",
+        "MTSF": "Meat/Seafood",
+        "MISC": "Misc",
+    }
+
+    def linear_correction(self, product_type: str):
+        """The correction made by scanning the product key in order"""
+        for product_key_id in self.product_key:
+            if error_checker(product_type, product_key_id):
+                return product_key_id
+        return None
+
+    def test_matches_linear_scan(self):
+        """Tests that the index corrects random codes the same way as scanning the key"""
+
+        index = ProductKeyIndex(tuple(self.product_key))
+        codes = ["".join(random.choices(string.ascii_uppercase, k=4)) for _ in range(2000)]
+        for key in self.product_key:
+            for i in range(4):
+                codes.append(key[:i] + "X" + key[i + 1:])
+        for code in codes:
+            self.assertEqual(self.linear_correction(code), index.correct(code), code)
+
+    def test_tie_uses_product_key_order(self):
+        """Tests that the first entry in the key wins when several are close enough"""
+
+        # FRZN and FRVG are both within two characters of FRVN
+        index = ProductKeyIndex(tuple(self.product_key))
+        self.assertEqual("FRZN", index.correct("FRVN"))
+        self.assertEqual("FRZN", index.correct("FRVN"))
+
+    def test_candidates_match_linear_scan(self):
+        """Tests that the candidates are every close enough entry, in product key order"""
+
+        index = ProductKeyIndex(tuple(self.product_key))
+        codes = ["".join(random.choices(string.ascii_uppercase, k=4)) for _ in range(2000)] + ["FRVN", "QQQQ"]
+        for code in codes:
+            expected = tuple(key for key in self.product_key if error_checker(code, key))
+            self.assertEqual(expected, index.candidates(code), code)
+        self.assertEqual(("FRZN", "FRVG"), index.candidates("FRVN"))
+
+    def test_no_match(self):
+        """Tests that codes far from every product type are not corrected"""
+
+        index = ProductKeyIndex(tuple(self.product_key))
+        self.assertIsNone(index.correct("QQQQ"))
+        self.assertIsNone(index.correct("BEV"))
+
+    def test_rebuilt_when_key_changes(self):
+        """Tests that adding a product type is picked up by the index"""
+
+        product_key = dict(self.product_key)
+        self.assertIsNone(get_product_key_index(product_key).correct("QQQX"))
+        product_key["QQQQ"] = "Test"
+        self.assertEqual("QQQQ", get_product_key_index(product_key).correct("QQQX"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+
+from benchmarks.datagen import generate_customer_file, generate_product_key
+from HalfFoodsScanner.dataloaders.textloader import TextLoader
+from HalfFoodsScanner.classes.hyperloglog import HyperLogLog
+from HalfFoodsScanner.classes.purchaseaggregate import PurchaseAggregate
+
+
+class TestPurchaseAggregateMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.product_key = generate_product_key(11, seed=2)
+        self.purchases = []
+        for seed in range(4):
+            data_path = os.path.join(self.temp_dir.name, f"Customer{seed}.txt")
+            generate_customer_file(data_path, self.product_key, 300, corruption_rate=0.1, seed=seed)
+            self.purchases.append(TextLoader().load_data(self.product_key, data_path))
+
+    def test_merge_is_associative(self):
+        """Tests that merging in any grouping or order gives the same totals as adding one purchase at a time"""
+
+        for approximate in [False, True]:
+            expected = PurchaseAggregate(approximate)
+            for purchase_info in self.purchases:
+                expected.add(purchase_info)
+
+            parts = [PurchaseAggregate.from_purchase_info(purchase_info, approximate) for purchase_info in self.purchases]
+            left = parts[0].merge(parts[1])
+            right = parts[3].merge(parts[2])
+            self.assertEqual(expected, left.merge(right))
+
+    def test_totals(self):
+        """Tests the counts, distinct subtypes and daily quantity against the purchases"""
+
+        aggregate = PurchaseAggregate()
+        for purchase_info in self.purchases:
+            aggregate.add(purchase_info)
+
+        self.assertEqual(4, aggregate.purchases)
+        self.assertEqual(1200, aggregate.quantity)
+        counts = {}
+        for purchase_info in self.purchases:
+            for product_type, id_list in purchase_info.product_type_history.items():
+                counts[product_type] = counts.get(product_type, 0) + len(id_list)
+        self.assertEqual(counts, dict(aggregate.product_type_counts))
+        self.assertEqual(max(counts.values()), aggregate.top_product_types(1)[0][1])
+        self.assertEqual(1200, sum(aggregate.daily_quantity.values()))
+        self.assertIsNone(aggregate.distinct_ids())
+
+    def test_mixed_modes_refused(self):
+        """Tests that exact and approximate aggregates cannot be merged"""
+
+        with self.assertRaises(ValueError):
+            PurchaseAggregate().merge(PurchaseAggregate(approximate=True))
+
+
+class TestHyperLogLogMethods(unittest.TestCase):
+
+    def test_estimate(self):
+        """Tests that estimates are close and merged sketches count the union"""
+
+        first = HyperLogLog()
+        first.update(f"PRODUCT{i:013}" for i in range(20000))
+        second = HyperLogLog()
+        second.update(f"PRODUCT{i:013}" for i in range(10000, 30000))
+        second.update(f"PRODUCT{i:013}" for i in range(10000, 11000))
+
+        self.assertAlmostEqual(20000, first.count(), delta=20000 * 0.05)
+        self.assertAlmostEqual(20000, second.count(), delta=20000 * 0.05)
+        self.assertAlmostEqual(30000, first.merge(second).count(), delta=30000 * 0.05)
+
+        small = HyperLogLog()
+        small.update(["A", "B", "C", "A"])
+        self.assertEqual(3, small.count())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+from collections import defaultdict
+
+from HalfFoodsScanner.classes.compactpurchaseinfo import CompactPurchaseInfo
+from HalfFoodsScanner.classes.purchaseinfo import PurchaseInfo
+
+
+def add_item(purchase_info: PurchaseInfo, product_type: str, subtype: str, product_id: str) -> None:
+    """Adds an item the way the loaders do"""
+    purchase_info.quantity += 1
+    if product_type is not None:
+        purchase_info.product_type_history[product_type].append(product_id)
+        purchase_info.subtype_lookup[product_type].add(subtype)
+
+
+class TestPurchaseInfoMethods(unittest.TestCase):
+
+    # SETUP
+    product_key = {
+        "BEVG": "Beverages",
+        "FRZN": "Frozen Foods",
+        "MISC": "Misc",
+    }
+
+    def new_purchase_info(self) -> PurchaseInfo:
+        return PurchaseInfo("Joseph", None, 0, defaultdict(list), defaultdict(set))
+
+    def test_most_common_follows_items(self):
+        """Tests that the most common product type follows each added item, with ties going to the first purchased"""
+
+        for purchase_info in [self.new_purchase_info(), CompactPurchaseInfo("Joseph", None)]:
+            self.assertIsNone(purchase_info.most_common_product_type())
+            add_item(purchase_info, "FRZN", "AAAAAA", "ID1")
+            add_item(purchase_info, "BEVG", "AAAAAA", "ID2")
+            self.assertEqual("FRZN", purchase_info.most_common_product_type())
+            add_item(purchase_info, "BEVG", "AAAAAA", "ID3")
+            self.assertEqual("BEVG", purchase_info.most_common_product_type())
+            add_item(purchase_info, "FRZN", "AAAAAA", "ID4")
+            add_item(purchase_info, None, "AAAAAA", "ID5")
+            self.assertEqual("FRZN", purchase_info.most_common_product_type())
+            self.assertEqual(5, purchase_info.quantity)
+
+    def test_most_common_after_clear(self):
+        """Tests that the most common product type is worked out again after a bulk change and after clearing"""
+
+        purchase_info = self.new_purchase_info()
+        add_item(purchase_info, "FRZN", "AAAAAA", "ID1")
+        self.assertEqual("FRZN", purchase_info.most_common_product_type())
+        purchase_info.product_type_history["MISC"].extend(["ID2", "ID3"])
+        purchase_info.quantity += 2
+        self.assertEqual("MISC", purchase_info.most_common_product_type())
+
+        purchase_info.clear()
+        self.assertIsNone(purchase_info.most_common_product_type())
+
+    def test_streamed_report_matches(self):
+        """Tests that the streamed report joins up to the full report, whatever the page size"""
+
+        purchase_info = self.new_purchase_info()
+        for i in range(25):
+            add_item(purchase_info, list(self.product_key)[i % 3], "AAAAAA", f"ID{i}")
+        report, most_common = purchase_info.get_advanced_purchase_information(self.product_key)
+        self.assertEqual("Beverages", most_common)
+        self.assertTrue(report.startswith("Beverages -- 9 items: ID0, ID3, ID6"))
+        for page_size in [1, 2, 1000]:
+            pieces = list(purchase_info.iter_advanced_purchase_information(self.product_key, page_size))
+            self.assertEqual(report, "".join(pieces))
+
+
+if __name__ == '__main__':
+    unittest.main()
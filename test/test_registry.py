@@ -0,0 +1,83 @@
+import bz2
+import gzip
+import lzma
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from benchmarks.datagen import generate_customer_file, generate_product_key
+from HalfFoodsScanner.dataloaders.registry import LoaderRegistry, register_builtin_loaders
+from HalfFoodsScanner.dataloaders.textloader import TextLoader
+from HalfFoodsScanner.storage.columnar import write_purchases
+
+
+class TestLoaderRegistryMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.product_key = generate_product_key(11, seed=1)
+        self.data_path = os.path.join(self.temp_dir.name, "Customer.txt")
+        generate_customer_file(self.data_path, self.product_key, 2000, corruption_rate=0.1, seed=3)
+        self.expected = TextLoader().load_data(self.product_key, self.data_path)
+
+        self.registry = LoaderRegistry()
+        register_builtin_loaders(self.registry)
+
+    def compress(self, opener, name: str) -> str:
+        path = os.path.join(self.temp_dir.name, name)
+        with open(self.data_path, "rb") as source, opener(path, "wb") as target:
+            shutil.copyfileobj(source, target)
+        return path
+
+    def test_compressed_text(self):
+        """Tests that gzip, bz2 and xz files load the same as the uncompressed file, named or not"""
+
+        for opener, name in ((gzip.open, "Customer.txt.gz"), (bz2.open, "Customer.txt.bz2"),
+                             (lzma.open, "Customer.txt.xz"), (gzip.open, "Customer.dat")):
+            with self.subTest(name=name):
+                path = self.compress(opener, name)
+                compression, loader_format = self.registry.detect(path)
+                self.assertIsNotNone(compression)
+                self.assertEqual("text", loader_format.name)
+                self.assertEqual(self.expected, self.registry.load_data(self.product_key, path))
+
+    def test_columnar(self):
+        """Tests that columnar files are recognised by their magic bytes, and cannot be read compressed"""
+
+        columnar_path = os.path.join(self.temp_dir.name, "Customer.bin")
+        write_purchases(columnar_path, [self.expected])
+        self.assertEqual((None, self.registry.formats[1]), self.registry.detect(columnar_path))
+        self.assertEqual(self.expected, self.registry.load_data(self.product_key, columnar_path))
+
+        with open(columnar_path, "rb") as source, gzip.open(columnar_path + ".gz", "wb") as target:
+            shutil.copyfileobj(source, target)
+        with self.assertRaises(ValueError):
+            self.registry.load_data(self.product_key, columnar_path + ".gz")
+
+    def test_entry_points(self):
+        """Tests that plugins register formats through entry points, and a broken plugin only warns"""
+
+        plugin = mock.Mock()
+        plugin.name = "upper"
+        plugin.load.return_value = lambda r: r.register("upper", TextLoader, extensions=(".UPR",))
+        broken = mock.Mock()
+        broken.name = "broken"
+        broken.load.side_effect = ImportError("missing module")
+
+        with mock.patch("importlib.metadata.entry_points", return_value=[plugin, broken]):
+            with self.assertWarns(UserWarning):
+                self.registry.load_entry_points()
+
+        self.assertEqual(["text", "columnar", "upper"], [f.name for f in self.registry.formats])
+        upper_path = os.path.join(self.temp_dir.name, "Customer.upr")
+        shutil.copy(self.data_path, upper_path)
+        self.assertEqual("upper", self.registry.detect(upper_path)[1].name)
+        with self.assertRaises(ValueError):
+            self.registry.register("upper", TextLoader)
+
+
+if __name__ == '__main__':
+    unittest.main()
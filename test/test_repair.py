@@ -0,0 +1,81 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from HalfFoodsScanner.__main__ import init_product_key
+from HalfFoodsScanner.dataloaders.textloader import TextLoader
+from HalfFoodsScanner.jobs import repair
+
+
+class TestRepairMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        test_dir = os.path.dirname(__file__)
+        os.mkdir(os.path.join(self.data_dir, "store"))
+        shutil.copy(os.path.join(test_dir, "CustomerError.txt"), os.path.join(self.data_dir, "store"))
+        shutil.copy(os.path.join(test_dir, "CustomerG.txt"), self.data_dir)
+        self.error_path = os.path.join(self.data_dir, "store", "CustomerError.txt")
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def test_iter_customer_files(self):
+        """Tests that files in nested directories are found"""
+
+        self.assertEqual([os.path.join(self.data_dir, "CustomerG.txt"), self.error_path],
+                         list(repair.iter_customer_files(self.data_dir)))
+
+    def test_repair_file(self):
+        """Tests that the corrupted product type is reported and written back, and nothing else changes"""
+
+        product_key = init_product_key()
+        expected = TextLoader().load_data(product_key, self.error_path)
+        with open(self.error_path, "rb") as f:
+            original = f.read()
+
+        report = repair.repair_file(product_key, self.error_path)
+        self.assertEqual(4, report["lines"])
+        self.assertEqual([{"line": 2, "from": "BENG", "to": "BEVG"}], report["corrected"])
+        self.assertEqual([], report["unresolved"])
+
+        with open(self.error_path, "rb") as f:
+            self.assertEqual(original.replace(b"BENG", b"BEVG"), f.read())
+        self.assertEqual(expected, TextLoader().load_data(product_key, self.error_path))
+
+        inode = os.stat(self.error_path).st_ino
+        self.assertEqual([], repair.repair_file(product_key, self.error_path)["corrected"])
+        # A file with nothing to correct is left in place, and its temporary file is removed
+        self.assertEqual(inode, os.stat(self.error_path).st_ino)
+        self.assertEqual(["CustomerError.txt"], os.listdir(os.path.dirname(self.error_path)))
+
+    def test_dry_run(self):
+        """Tests that a dry run reports corrections without changing the file"""
+
+        with open(self.error_path, "rb") as f:
+            original = f.read()
+        report = repair.repair_file(init_product_key(), self.error_path, dry_run=True)
+        self.assertEqual(1, len(report["corrected"]))
+        with open(self.error_path, "rb") as f:
+            self.assertEqual(original, f.read())
+
+    def test_resume_from_checkpoint(self):
+        """Tests that files recorded in the checkpoint are skipped, and a cut short last line is ignored"""
+
+        product_key = init_product_key()
+        checkpoint_path = os.path.join(self.data_dir, "checkpoint.jsonl")
+        with open(checkpoint_path, "w") as f:
+            f.write(json.dumps(os.path.join(self.data_dir, "CustomerG.txt")) + "\n" + '"/cut/sho')
+
+        reports = list(repair.repair_tree(product_key, self.data_dir, checkpoint_path, workers=1))
+        self.assertEqual([self.error_path], [report["path"] for report in reports])
+        self.assertEqual({"files": 1, "repaired_files": 1, "failed_files": 0, "corrected_lines": 1,
+                          "unresolved_lines": 0}, repair.summarize_reports(reports))
+        self.assertIn(self.error_path, repair.read_checkpoint(checkpoint_path))
+        self.assertEqual([], list(repair.repair_tree(product_key, self.data_dir, checkpoint_path, workers=1)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import datetime
+import os
+import random
+import string
+import tempfile
+import unittest
+
+from HalfFoodsScanner.dataloaders.textloader import TextLoader
+from HalfFoodsScanner.storage.sqlitestore import SQLitePurchaseStore
+
+
+class TestSQLitePurchaseStoreMethods(unittest.TestCase):
+
+    # SETUP
+    product_key = {
+        "BEVG": "Beverages",
+        "BAKE": "Baked Goods",
+        "CANF": "Canned Foods",
+        "FRZN": "Frozen Foods",
+        "GRPA": "Grains/Pastas",
+        "MISC": "Misc",
+    }
+
+    def write_data(self, name_line: str, count: int) -> str:
+        """Writes a customer file with random and corrupted product lines and returns its path"""
+        lines = [name_line]
+        for _ in range(count):
+            ptype = random.choice(list(self.product_key) + ["FFFF", "GRPX"])
+            stype = "".join(random.choices("ABC", k=6))
+            id = "".join(random.choices(string.ascii_uppercase, k=20))
+            lines.append(f"{ptype}{stype}{id}")
+
+        fd, data_path = tempfile.mkstemp(suffix=".txt")
+        with os.fdopen(fd, "w") as f:
+            f.write("\n".join(lines))
+        self.addCleanup(os.remove, data_path)
+        return data_path
+
+    def setUp(self):
+        self.store = SQLitePurchaseStore()
+        self.addCleanup(self.store.close)
+        self.first_path = self.write_data("05011984Joseph", 300)
+        self.second_path = self.write_data("01232020Jamie", 200)
+        self.first_id, self.second_id = self.store.add_files(self.product_key, [self.first_path, self.second_path])
+
+    def test_matches_purchase_info(self):
+        """Tests that the SQL reports agree with a parsed PurchaseInfo"""
+
+        expected = TextLoader().load_data(self.product_key, self.first_path)
+        counts = {product_type: len(id_list) for product_type, id_list in expected.product_type_history.items()}
+
+        self.assertEqual(counts, self.store.product_type_counts(purchase_id=self.first_id))
+        self.assertEqual(expected, self.store.load_purchase(self.first_id))
+        _, most_common = expected.get_advanced_purchase_information(self.product_key)
+        self.assertEqual(most_common, self.product_key[self.store.most_common_product_type(purchase_id=self.first_id)])
+        self.assertEqual(expected.subtype_lookup["GRPA"], self.store.subtypes("GRPA", purchase_id=self.first_id))
+
+    def test_filters(self):
+        """Tests narrowing queries by customer and date, and querying every purchase"""
+
+        first = self.store.product_type_counts(customer_name="Joseph")
+        second = self.store.product_type_counts(purchase_date=datetime.date(2020, 1, 23))
+        everything = self.store.product_type_counts()
+
+        self.assertEqual(self.store.product_type_counts(purchase_id=self.first_id), first)
+        self.assertEqual(self.store.product_type_counts(purchase_id=self.second_id), second)
+        for product_type, count in everything.items():
+            self.assertEqual(first.get(product_type, 0) + second.get(product_type, 0), count)
+        self.assertEqual({}, self.store.product_type_counts(customer_name="Nobody"))
+        self.assertIsNone(self.store.most_common_product_type(customer_name="Nobody"))
+
+    def test_quantity_includes_invalid_products(self):
+        """Tests that items matching no product type are stored and counted in the quantity"""
+
+        self.assertEqual(300, self.store.load_purchase(self.first_id).quantity)
+
+    def test_missing_purchase(self):
+        """Tests that reading an unknown purchase raises KeyError"""
+
+        with self.assertRaises(KeyError):
+            self.store.load_purchase(12345)
+
+
+if __name__ == "__main__":
+    unittest.main()
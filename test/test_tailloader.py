@@ -0,0 +1,136 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from HalfFoodsScanner.dataloaders import tailloader
+from HalfFoodsScanner.dataloaders.tailloader import TailLoader
+from HalfFoodsScanner.dataloaders.textloader import TextLoader
+
+
+class TestTailLoaderMethods(unittest.TestCase):
+
+    # SETUP
+    product_key = {
+        "BEVG": "Beverages",
+        "CANF": "Canned Foods",
+        "FRZN": "Frozen Foods",
+    }
+
+    def setUp(self):
+        fd, self.data_path = tempfile.mkstemp(suffix=".txt")
+        os.close(fd)
+        self.addCleanup(os.remove, self.data_path)
+        self.write("05011984Joseph\nBEVGAAAAAA" + "A" * 20 + "\n")
+
+    def write(self, data: str, mode: str = "a"):
+        with open(self.data_path, mode, newline="") as f:
+            f.write(data)
+
+    def test_update_parses_appended_lines(self):
+        """Tests that appended lines are added to the same PurchaseInfo"""
+
+        loader = TailLoader()
+        result = loader.load_data(self.product_key, self.data_path)
+        self.assertEqual(1, result.quantity)
+
+        self.write("CANFBBBBBB" + "B" * 20 + "\nFRZXCCCCCC" + "C" * 20 + "\n")
+        self.assertEqual(2, loader.update())
+        self.assertEqual(0, loader.update())
+
+        self.assertEqual(3, result.quantity)
+        self.assertEqual(TextLoader().load_data(self.product_key, self.data_path), result)
+        self.assertEqual("Beverages", result.get_advanced_purchase_information(self.product_key)[1])
+
+        self.write("FRZNDDDDDD" + "D" * 20 + "\nFRZNEEEEEE" + "E" * 20 + "\n")
+        loader.update()
+        self.assertEqual("Frozen Foods", result.get_advanced_purchase_information(self.product_key)[1])
+
+    def test_partial_line_waits_for_newline(self):
+        """Tests that a line still being written is only parsed once it is complete"""
+
+        loader = TailLoader()
+        result = loader.load_data(self.product_key, self.data_path)
+
+        self.write("CANFBBBBBB" + "B" * 10)
+        self.assertEqual(0, loader.update())
+        self.write("B" * 10 + "\n")
+        self.assertEqual(1, loader.update())
+        self.assertEqual(["B" * 20], result.product_type_history["CANF"])
+
+    def test_final_update(self):
+        """Tests that a final update parses a last line without a newline"""
+
+        loader = TailLoader()
+        result = loader.load_data(self.product_key, self.data_path)
+        self.write("CANFBBBBBB" + "B" * 20)
+        self.assertEqual(1, loader.update(final=True))
+        self.assertEqual(TextLoader().load_data(self.product_key, self.data_path), result)
+
+    def test_small_chunks(self):
+        """Tests that lines split across chunks are carried over to the next chunk and parsed once"""
+
+        loader = TailLoader()
+        result = loader.load_data(self.product_key, self.data_path)
+        self.write("CANFBBBBBB" + "B" * 20 + "\r\nFRZXCCCCCC" + "C" * 20 + "\nFRZNDDDDDD" + "D" * 20 + "\nCANF")
+
+        with mock.patch.object(tailloader, "CHUNK_BYTES", 7):
+            self.assertEqual(3, loader.update())
+            self.assertEqual(0, loader.update())
+            self.write("EEEEEE" + "E" * 20 + "\n")
+            self.assertEqual(1, loader.update())
+        self.assertEqual(TextLoader().load_data(self.product_key, self.data_path), result)
+
+    def test_file_without_final_newline(self):
+        """Tests that a finished file without a final newline loads the same as with TextLoader"""
+
+        data_path = os.path.join(os.path.dirname(__file__), "CustomerG.txt")
+        result = TailLoader().load_data(self.product_key, data_path)
+        self.assertEqual(4, result.quantity)
+        self.assertEqual(TextLoader().load_data(self.product_key, data_path), result)
+
+    def test_idle_final_line_parsed_again(self):
+        """Tests that follow parses a final line once the file stops growing, and again once it is finished"""
+
+        for compact in (False, True):
+            with self.subTest(compact=compact):
+                self.write("05011984Joseph\nBEVGAAAAAA" + "A" * 20 + "\n", mode="w")
+                loader = TailLoader(compact)
+                result = loader.load_data(self.product_key, self.data_path)
+                self.write("CANFBBBBBB" + "B" * 10)
+                self.assertEqual(0, loader.update())
+
+                updates = loader.follow(interval=0.01)
+                self.assertEqual(["B" * 10], list(next(updates).product_type_history["CANF"]))
+                self.assertEqual(0, loader.update(final=True))
+
+                self.write("B" * 10 + "\nFRZNCCCCCC" + "C" * 20 + "\n")
+                self.assertEqual(2, loader.update())
+                self.assertEqual(3, result.quantity)
+                self.assertEqual(["B" * 20], list(result.product_type_history["CANF"]))
+                self.assertEqual(TextLoader().load_data(self.product_key, self.data_path), result)
+
+    def test_replaced_file(self):
+        """Tests that a file that shrinks is loaded again from the start"""
+
+        loader = TailLoader()
+        result = loader.load_data(self.product_key, self.data_path)
+        self.write("06021990Jamie\n", mode="w")
+        loader.update()
+        self.assertEqual("Jamie", result.customer_name)
+        self.assertEqual(0, result.quantity)
+        self.assertEqual({}, dict(result.product_type_history))
+
+    def test_follow(self):
+        """Tests that following yields after lines are appended"""
+
+        loader = TailLoader()
+        loader.load_data(self.product_key, self.data_path)
+        self.write("CANFBBBBBB" + "B" * 20 + "\n")
+
+        updates = loader.follow(interval=0.01)
+        self.assertEqual(2, next(updates).quantity)
+
+
+if __name__ == "__main__":
+    unittest.main()